@@ -7,10 +7,37 @@ import json  # Used for loading configuration from JSON files
 import pygame  # The main Pygame library for game development
 import random  # Used for generating random numbers
 import os  # Used for handling file paths
+import sys  # Used for locating bundled files in frozen builds
 import math  # Used for mathematical operations
-from typing import List, Dict, Tuple  # Used for type hinting
+import collections  # Used for bounded caches
+import queue  # Used for handing work to background threads
+import threading  # Used for off-thread background rendering
+import time  # Used for high resolution frame timing
+import argparse  # Used for command line options
+from typing import List, Dict, Optional, Tuple  # Used for type hinting
 import warnings
 
+try:
+    import numpy as np  # Used for the vectorized star field
+except ImportError:  # Stars fall back to one circle per star
+    np = None
+
+from config_validator import ConfigValidator, QUALITY_PRESET_NAMES  # Validates config.json values
+from game_state import GameState, EVENT_CORRECT, EVENT_WRONG, EVENT_LEVEL_UP, EVENT_GAME_OVER  # Pygame-free rules model
+from score_store import ScoreStore  # Persistent high scores and session results
+from telemetry import Telemetry  # Structured gameplay event log
+from profiling import FrameProfiler, Histogram, LatencyTracker, format_report  # Frame timing and input latency
+from asset_pack import AssetPack, DEFAULT_PACK_NAME, ENCODING_RGBA  # Memory-mapped asset bundle
+from layout_engine import GAME_LAYOUT_BOXES, game_layout  # Declarative, memoized screen layout
+from text_layout import wrap_text  # Word wrapping from cached word widths
+from quality import QUALITY_LEVELS, QUALITY_PRESETS, QualityController  # Frame-time driven quality presets
+from particle_budget import ParticleBudget, PRIORITY_EXPLOSION, PRIORITY_SMOKE, PRIORITY_SPARKLE  # Global particle cap
+from scheduler import FrameScheduler, PRIORITY_LOW, PRIORITY_NORMAL  # Deferrable work in the frame's slack
+from recorder import FrameRecorder, RECORDING_FORMATS  # Background frame recording
+from replay_buffer import ReplayBuffer  # Ring of recent frames for instant replay
+from save_state import GameSnapshot, delete_snapshot, read_snapshot, write_snapshot  # Save and resume
+from input_log import InputLogWriter, SessionWatcher  # Compact binary input logs for replays
+
 warnings.filterwarnings("ignore", message="pkg_resources is deprecated as an API", category=UserWarning)
 
 
@@ -27,46 +54,58 @@ TRAIN_SPACING = 80  # Spacing between trains
 RAILROAD_TIE_SPACING = 30  # Spacing between railroad ties
 RAILROAD_HEIGHT = 240  # Height of the railroad
 RAIL_THICKNESS = 5  # Thickness of the rails
-PARTICLE_COUNT = 20  # Number of particles in visual effects
-EXPLOSION_PARTICLE_COUNT = 30  # Number of particles in explosions
 COMBO_BASE_FONT_SIZE = 48  # Base font size for combo messages
 COMBO_SUPER_THRESHOLD = 5  # Combo count to trigger "SUPER" message
-TRANSITION_SPEED = 500  # Speed of theme transitions
-TREE_COUNT = 5  # Number of trees in the background
-CLOUD_COUNT = 3  # Number of clouds in the background
-STAR_COUNT = 50  # Number of stars in the background
 BUILDING_COUNT = 6  # Number of skyline buildings
 HOUSE_COUNT = 4  # Number of houses in the background
 UI_PADDING = 20  # Padding for UI elements
 UI_LINE_HEIGHT = 40  # Line height for UI elements
+WRAP_CACHE_SIZE = 64  # Wrapped text blocks kept between layouts
+LABEL_CACHE_SIZE = 128  # Static HUD labels kept per glyph atlas
+GLYPH_ATLAS_CACHE_SIZE = 16  # Font and color pairs with a glyph atlas
 INSTRUCTION_HEIGHT = 60  # Height of the instruction text background
-GLOW_MAX = 100  # Maximum glow radius for buttons
-GLOW_MIN = 20  # Minimum glow radius for buttons
 
 # Particle Physics: Define ranges and values for particle behavior
-PARTICLE_SIZE_RANGE = (4, 8)  # Range of particle sizes
-PARTICLE_VELOCITY_RANGE = (-30, 30)  # Range of particle velocities
-PARTICLE_GRAVITY = 15  # Gravity applied to particles
 PARTICLE_ALPHA_DECAY_RANGE = (0.5, 1.5)  # Range of alpha decay rates for particles
 
 # Smoke Particle Settings: Define behavior for smoke particles
 SMOKE_VELOCITY_X = (-5, 5)  # X velocity range for smoke particles
 SMOKE_VELOCITY_Y = (-10, -5)  # Y velocity range for smoke particles
 SMOKE_GRAVITY = 2  # Gravity applied to smoke particles
-SMOKE_EMISSION_CHANCE = 0.3  # Chance for smoke emission
 
 # Star Settings: Define properties for stars in the background
 STAR_SIZE_RANGE = (1, 3)  # Range of star sizes
 STAR_BRIGHTNESS_RANGE = (150, 255)  # Range of star brightness
+STAR_TWINKLE_RATE_RANGE = (0.5, 2.0)  # Twinkle speeds in radians per second
+STAR_TWINKLE_FLOOR = 0.55  # Dimmest point of a twinkle as a fraction of full brightness
+STAR_TWINKLE_LEVELS = 16  # Brightness steps; a star is only redrawn when its step changes
+TWINKLE_TABLE_SIZE = 1024  # Entries in the sine-to-step lookup table, a power of two
+STAR_HIDDEN = 255  # Drawn step of a star that is not on the sky
+
+
+def twinkle_table():
+    """Twinkle step for each of TWINKLE_TABLE_SIZE phase angles, built on first use."""
+    global TWINKLE_TABLE
+    if TWINKLE_TABLE is None:
+        angles = np.arange(TWINKLE_TABLE_SIZE) * (math.tau / TWINKLE_TABLE_SIZE)
+        TWINKLE_TABLE = ((STAR_TWINKLE_LEVELS - 1) * 0.5 * (1.0 + np.sin(angles)) + 0.5).astype(np.uint8)
+    return TWINKLE_TABLE
+
+
+TWINKLE_TABLE = None
+
+
+def star_stamp(radius):
+    """Pixel offsets pygame.draw.circle fills for a small radius."""
+    limit = radius * radius - radius / 2
+    return [(dx, dy) for dx in range(-radius, radius) for dy in range(-radius, radius)
+            if (dx + 0.5) ** 2 + (dy + 0.5) ** 2 <= limit]
 
 # Cloud Settings: Define properties for clouds in the background
 CLOUD_VELOCITY_RANGE = (0.5, 1.5)  # Range of cloud velocities
 CLOUD_HEIGHT_RANGE = (50, 150)  # Range of cloud heights
 CLOUD_SEGMENT_SIZES = [20, 25, 20]  # Sizes of cloud segments
-
-# Initialize Pygame and fonts module
-pygame.init()  # Initialize Pygame
-pygame.font.init()  # Initialize the font module
+PARALLAX_CACHE_SIZE = 4  # Window sizes whose parallax strips are kept
 
 DISPLAY_FLAGS = getattr(pygame, "RESIZABLE", 0)
 
@@ -78,158 +117,14 @@ def set_window_mode(size: Tuple[int, int]) -> pygame.Surface:
     except TypeError:
         return pygame.display.set_mode(size)
 
-# Configuration validation class: Validates configuration settings
-class ConfigValidator:
-    # Validates a color value
-    @staticmethod
-    def validate_color(color):
-        if not isinstance(color, list) or len(color) != 3:
-            return False
-        return all(isinstance(v, int) and 0 <= v <= 255 for v in color)
-
-    # Validates window settings
-    @staticmethod
-    def validate_window(config):
-        window = config.get('window', {})
-        defaults = {'width': 1280, 'height': 720, 'title': 'Train Color Matching Game'}
-        
-        width = window.get('width', defaults['width'])
-        height = window.get('height', defaults['height'])
-        title = window.get('title', defaults['title'])
-
-        if not isinstance(width, int) or width < 800:
-            width = defaults['width']
-        if not isinstance(height, int) or height < 600:
-            height = defaults['height']
-        if not isinstance(title, str):
-            title = defaults['title']
-
-        return {'width': width, 'height': height, 'title': title}
-
-    # Validates color settings
-    @staticmethod
-    def validate_colors(config):
-        colors = config.get('colors', {})
-        defaults = {
-            'white': [255, 255, 255],
-            'black': [0, 0, 0],
-            'red': [255, 0, 0],
-            'blue': [0, 0, 255],
-            'green': [0, 255, 0],
-            'gray': [128, 128, 128],
-            'yellow': [255, 255, 0]
-        }
-
-        validated = {}
-        for color_name, default_value in defaults.items():
-            color = colors.get(color_name, default_value)
-            if not ConfigValidator.validate_color(color):
-                color = default_value
-            validated[color_name] = color
-
-        return validated
-
-    # Validates game settings
-    @staticmethod
-    def validate_game_settings(config):
-        game = config.get('game', {})
-        defaults = {
-            'initial_train_speed': 5,
-            'initial_max_trains': 10,
-            'level_up_threshold': 5,
-            'max_trains_cap': 15
-        }
-
-        validated = {}
-        for key, default_value in defaults.items():
-            value = game.get(key, default_value)
-            if not isinstance(value, (int, float)) or value <= 0:
-                value = default_value
-            validated[key] = value
-
-        return validated
-
-    # Validates train settings
-    @staticmethod
-    def validate_train_settings(config):
-        train = config.get('train', {})
-        defaults = {
-            'width': 60,
-            'height': 30,
-            'wheel_radius': 5
-        }
-
-        validated = {}
-        for key, default_value in defaults.items():
-            value = train.get(key, default_value)
-            if not isinstance(value, (int, float)) or value <= 0:
-                value = default_value
-            validated[key] = value
-
-        return validated
-
-    # Validates parallax settings
-    @staticmethod
-    def validate_parallax(config):
-        parallax = config.get('parallax', {})
-        defaults = {
-            'cloud_speed': 10,
-            'tree_speed': 30,
-            'cloud_offset_y': 100,
-            'tree_offset_y': 200
-        }
-
-        validated = {}
-        for key, default_value in defaults.items():
-            value = parallax.get(key, default_value)
-            if not isinstance(value, (int, float)):
-                value = default_value
-            validated[key] = value
-
-        return validated
-
-    # Validates the entire configuration
-    @staticmethod
-    def validate_config(config):
-        if not isinstance(config, dict):
-            config = {}
-
-        return {
-            'window': ConfigValidator.validate_window(config),
-            'colors': ConfigValidator.validate_colors(config),
-            'game': ConfigValidator.validate_game_settings(config),
-            'train': ConfigValidator.validate_train_settings(config),
-            'parallax': ConfigValidator.validate_parallax(config)
-        }
-
-def wrap_text(text: str, font, max_width: int) -> List[str]:
-    """Wraps *text* into lines that do not exceed *max_width* pixels."""
-    if font is None:
-        raise ValueError("A font instance is required for text wrapping")
-    if max_width <= 0:
-        raise ValueError("Maximum width must be a positive integer")
-
-    if not text:
-        return []
+RENDER_SIZE = None  # Size of the offscreen scene surface while render scaling is active
 
-    words = text.split()
-    if not words:
-        return []
-
-    lines: List[str] = []
-    current_line = words[0]
-
-    for word in words[1:]:
-        candidate = f"{current_line} {word}"
-        width, _ = font.size(candidate)
-        if width <= max_width or not current_line:
-            current_line = candidate
-        else:
-            lines.append(current_line)
-            current_line = word
-
-    lines.append(current_line)
-    return lines
+def scene_size() -> Tuple[int, int]:
+    """Size of the surface the scene is drawn on, which is smaller than the window when render scaling."""
+    if RENDER_SIZE is not None:
+        return RENDER_SIZE
+    surface = pygame.display.get_surface()
+    return surface.get_size() if surface else (WIDTH, HEIGHT)
 
 
 def calculate_accuracy(correct_attempts: int, total_attempts: int) -> float:
@@ -271,11 +166,41 @@ def load_config():
 # Load configuration
 CONFIG = load_config()
 
+# Initialize Pygame and fonts module; the mixer buffer must be requested before init
+pygame.mixer.pre_init(CONFIG['audio']['frequency'], -16, 2, CONFIG['audio']['buffer_size'])
+pygame.init()  # Initialize Pygame
+pygame.font.init()  # Initialize the font module
+
 # Initialize constants from config
 WIDTH = CONFIG["window"]["width"]  # Window width
 HEIGHT = CONFIG["window"]["height"]  # Window height
 WINDOW_TITLE = CONFIG["window"]["title"]  # Window title
 
+# Effects and scenery from config
+PARTICLE_COUNT = CONFIG["particles"]["count"]  # Number of particles in visual effects
+EXPLOSION_PARTICLE_COUNT = CONFIG["particles"]["explosion_count"]  # Number of particles in explosions
+PARTICLE_SIZE_RANGE = (CONFIG["particles"]["size_min"], CONFIG["particles"]["size_max"])  # Range of particle sizes
+PARTICLE_VELOCITY_RANGE = (CONFIG["particles"]["velocity_min"], CONFIG["particles"]["velocity_max"])  # Range of particle velocities
+PARTICLE_GRAVITY = CONFIG["particles"]["gravity"]  # Gravity applied to particles
+SMOKE_EMISSION_CHANCE = CONFIG["particles"]["smoke_emission_chance"]  # Chance for smoke emission
+PARTICLE_BUDGET_CAP = CONFIG["particles"]["budget"]  # Most particles alive at once across every effect
+SMOKE_TIME_SCALE = 6.0  # Smoke ages 0.1 s per frame at 60 fps, as it did when trains advanced it per frame
+TREE_COUNT = CONFIG["visual"]["tree_count"]  # Number of trees in the background
+CLOUD_COUNT = CONFIG["visual"]["cloud_count"]  # Number of clouds in the background
+GLOW_MAX = CONFIG["visual"]["glow_max"]  # Maximum glow radius for buttons
+GLOW_MIN = CONFIG["visual"]["glow_min"]  # Minimum glow radius for buttons
+TRANSITION_SPEED = CONFIG["visual"]["transition_speed"]  # Speed of theme transitions
+
+# Effect scales of the active quality preset, updated in place when the preset changes
+QUALITY = dict(QUALITY_PRESETS[QUALITY_LEVELS[0]])
+
+# Scales an effect's particle count by the active quality preset
+def effect_count(count):
+    return int(round(count * QUALITY['particles']))
+
+# Shared by every particle emitter; the game updates it once per frame
+PARTICLE_BUDGET = ParticleBudget(PARTICLE_BUDGET_CAP)
+
 # Colors from config
 WHITE = tuple(CONFIG["colors"]["white"])  # White color
 BLACK = tuple(CONFIG["colors"]["black"])  # Black color
@@ -286,6 +211,62 @@ FONTS_DIR = os.path.join(ASSETS_DIR, "fonts")  # Fonts directory
 SOUNDS_DIR = os.path.join(ASSETS_DIR, "music")  # Sounds directory
 IMAGES_DIR = os.path.join(ASSETS_DIR, "images")  # Images directory
 
+# Opens the packed asset bundle if one ships with the game
+def open_asset_pack():
+    search_dirs = []
+    if getattr(sys, 'frozen', False):
+        search_dirs.append(os.path.dirname(sys.executable))  # Beside a one-file build, so it is never extracted
+        search_dirs.append(getattr(sys, '_MEIPASS', ''))  # Bundled inside the build
+    search_dirs.append('')  # Working directory
+    for directory in search_dirs:
+        path = os.path.join(directory, DEFAULT_PACK_NAME)
+        if not os.path.isfile(path):
+            continue
+        try:
+            return AssetPack(path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not open asset pack {path}: {e}. Loading loose asset files.")
+    return None
+
+ASSET_PACK = open_asset_pack()  # None when assets are loaded from the assets directory
+
+# Returns what pygame should load an asset from: a packed file object or the plain path
+def asset_source(path):
+    if ASSET_PACK is not None and path in ASSET_PACK:
+        return ASSET_PACK.open(path)
+    return path
+
+# Loads an image, using pre-decoded pixels from the asset pack when available
+def load_image(path):
+    if ASSET_PACK is not None and path in ASSET_PACK:
+        entry = ASSET_PACK.entry(path)
+        if entry['encoding'] == ENCODING_RGBA:
+            return pygame.image.frombuffer(ASSET_PACK.view(path), (entry['width'], entry['height']), 'RGBA')
+        return pygame.image.load(ASSET_PACK.open(path), os.path.basename(path))
+    return pygame.image.load(path)
+
+game_fonts = {}  # Point size -> loaded game font
+
+# Returns the game font at a point size, loading each size once
+def load_game_font(size):
+    font = game_fonts.get(size)
+    if font is None:
+        try:
+            font = pygame.font.Font(asset_source(FONT_PATH), size)
+        except Exception:
+            print(f"Warning: Could not load font {FONT_PATH}, using system default")
+            font = pygame.font.Font(None, size)
+        game_fonts[size] = font
+    return font
+
+# Score storage
+SCORES_DB_PATH = "scores.db"  # SQLite database for high scores and sessions
+LEADERBOARD_SIZE = 5  # Number of top scores shown on the menu
+
+# Instant replay
+REPLAY_HOTKEY = pygame.K_F9  # Saves the last seconds of play
+RESUME_KEY = pygame.K_r  # Resumes the saved game from the menu
+
 # Set up the display
 screen = set_window_mode((WIDTH, HEIGHT))  # Create the display
 pygame.display.set_caption(WINDOW_TITLE)  # Set the window title
@@ -369,20 +350,63 @@ def draw_vertical_gradient(surface: pygame.Surface, top_color: Tuple[int, int, i
         pygame.draw.line(surface, color, (0, y), (width, y))
 
 
-def draw_glass_panel(surface: pygame.Surface, rect: pygame.Rect, theme: Dict[str, Tuple[int, int, int]]) -> None:
-    """Draw a frosted glass style panel using the active *theme*."""
-    panel = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
+def render_glass_panel(size: Tuple[int, int], theme: Dict[str, Tuple[int, int, int]]) -> pygame.Surface:
+    """Render a frosted glass style panel of *size* for *theme*."""
+    width, height = size
+    panel = pygame.Surface((width, height), pygame.SRCALPHA)
     fill_color = theme.get('canvas_fill', (255, 255, 255, 160))
     border_color = theme.get('canvas_border', (255, 255, 255, 200))
     pygame.draw.rect(panel, fill_color, panel.get_rect(), border_radius=18)
     pygame.draw.rect(panel, border_color, panel.get_rect(), width=2, border_radius=18)
 
     highlight_alpha = theme.get('glass_highlight')
-    if highlight_alpha and rect.width > 24:
-        highlight = pygame.Surface((rect.width - 24, 12), pygame.SRCALPHA)
+    if highlight_alpha and width > 24:
+        highlight = pygame.Surface((width - 24, 12), pygame.SRCALPHA)
         highlight.fill(highlight_alpha)
         panel.blit(highlight, (12, 12))
+    return panel
+
+GLASS_PANEL_CACHE_SIZE = 48  # Rendered glass panels kept across themes and sizes
+glass_panel_cache = collections.OrderedDict()  # (theme name, width, height) -> panel, least recent first
+
+def cache_glass_panel(theme_name: str, size: Tuple[int, int], panel: pygame.Surface) -> None:
+    key = (theme_name, size[0], size[1])
+    glass_panel_cache[key] = panel
+    glass_panel_cache.move_to_end(key)
+    if len(glass_panel_cache) > GLASS_PANEL_CACHE_SIZE:
+        glass_panel_cache.popitem(last=False)
+
+COMBO_PULSE = 0.2  # Extra scale at the peak of the combo pop
+COMBO_KEYFRAMES = 9  # Pre-scaled frames between rest and peak size
+COMBO_FRAME_CACHE_SIZE = 24  # Combo texts whose frames are kept
+combo_frame_cache = collections.OrderedDict()  # (text, font size, color) -> keyframes, least recent first
+
+def combo_keyframes(text: str, font_size: int, color: Tuple[int, int, int]) -> List[pygame.Surface]:
+    """Scaled renders of a combo text from rest size up to the peak of its pulse."""
+    key = (text, font_size, tuple(color))
+    frames = combo_frame_cache.get(key)
+    if frames is None:
+        base_surface = load_game_font(font_size).render(text, True, color)
+        frames = []
+        for step in range(COMBO_KEYFRAMES):
+            scale = 1.0 + COMBO_PULSE * step / (COMBO_KEYFRAMES - 1)
+            scaled_size = (int(base_surface.get_width() * scale), int(base_surface.get_height() * scale))
+            frames.append(pygame.transform.scale(base_surface, scaled_size))
+        combo_frame_cache[key] = frames
+        if len(combo_frame_cache) > COMBO_FRAME_CACHE_SIZE:
+            combo_frame_cache.popitem(last=False)
+    combo_frame_cache.move_to_end(key)
+    return frames
 
+def draw_glass_panel(surface: pygame.Surface, rect: pygame.Rect, theme: Dict[str, Tuple[int, int, int]]) -> None:
+    """Draw a frosted glass style panel using the active *theme*."""
+    key = (theme['name'], rect.width, rect.height)
+    panel = glass_panel_cache.get(key)
+    if panel is None:
+        panel = render_glass_panel((rect.width, rect.height), theme)
+        cache_glass_panel(theme['name'], (rect.width, rect.height), panel)
+    else:
+        glass_panel_cache.move_to_end(key)
     surface.blit(panel, rect.topleft)
 
 # Game states: Define possible game states
@@ -397,51 +421,135 @@ TRAIN_COLORS = [RED, BLUE, GREEN]  # List of train colors
 FONT_PATH = os.path.join(FONTS_DIR, "RobotoCondensed-Italic-VariableFont_wght.ttf")  # Font path
 
 # Initialize the font: Load the font or use a default font
-try:
-    game_font = pygame.font.Font(FONT_PATH, 36)  # Load the font
-except:
-    print("Warning: Custom font not found. Using system default.")  # Print a warning if the font is not found
-    game_font = pygame.font.Font(None, 36)  # Use a default font
+game_font = load_game_font(36)
+
+# Sound definitions: name -> (file in SOUNDS_DIR, channel group)
+SOUND_FILES = {
+    'correct': ('General_sound_effect.mp3', 'gameplay'),  # Correct sound
+    'wrong': ('Suspenseful Music.mp3', 'gameplay'),  # Wrong sound
+    'click': ('Button sounds.mp3', 'ui'),  # Click sound
+    'game_over': ('Cutscene Music.mp3', 'gameplay'),  # Game over sound
+    'background': ('Menu Music.mp3', 'music'),  # Background music
+    'button_hover': ('UI opening sounds.mp3', 'ui'),  # Button hover sound
+    'level_up': ('MC Level Up.mp3', 'gameplay'),  # Level up sound
+    'victory': ('Victory Music.mp3', 'gameplay'),  # Victory sound
+    'item_pickup': ('Item Pickup.mp3', 'gameplay'),  # Item pickup sound
+    'confirmation': ('Confirmation Sounds (in UI).mp3', 'ui')  # Confirmation sound
+}
+SOUND_GROUPS = ('music', 'ui', 'gameplay')  # Channel groups in reservation order
+BACKGROUND_VOLUME = 0.5  # Background music volume
 
 # Sound manager class to handle game sounds
 class SoundManager:
+    """Plays sounds on reserved channel groups with per-sound voice limits.
+
+    Every mixer channel is reserved and split into music, UI and gameplay
+    groups, so a burst of gameplay sounds can never take the channel of a
+    UI click or the music. When a sound reaches its voice limit, or its
+    group has no free channel, the oldest voice is stopped and reused.
+    Muting keeps the music position and simply stops scheduling new voices.
+    """
+
     # Initializes the sound manager
-    def __init__(self):
-        try:
-            self.sounds = {
-                'correct': pygame.mixer.Sound(os.path.join(SOUNDS_DIR, 'General_sound_effect.mp3')),  # Correct sound
-                'wrong': pygame.mixer.Sound(os.path.join(SOUNDS_DIR, 'Suspenseful Music.mp3')),  # Wrong sound
-                'click': pygame.mixer.Sound(os.path.join(SOUNDS_DIR, 'Button sounds.mp3')),  # Click sound
-                'game_over': pygame.mixer.Sound(os.path.join(SOUNDS_DIR, 'Cutscene Music.mp3')),  # Game over sound
-                'background': pygame.mixer.Sound(os.path.join(SOUNDS_DIR, 'Menu Music.mp3')),  # Background music
-                'button_hover': pygame.mixer.Sound(os.path.join(SOUNDS_DIR, 'UI opening sounds.mp3')),  # Button hover sound
-                'level_up': pygame.mixer.Sound(os.path.join(SOUNDS_DIR, 'MC Level Up.mp3')),  # Level up sound
-                'victory': pygame.mixer.Sound(os.path.join(SOUNDS_DIR, 'Victory Music.mp3')),  # Victory sound
-                'item_pickup': pygame.mixer.Sound(os.path.join(SOUNDS_DIR, 'Item Pickup.mp3')),  # Item pickup sound
-                'confirmation': pygame.mixer.Sound(os.path.join(SOUNDS_DIR, 'Confirmation Sounds (in UI).mp3'))  # Confirmation sound
-            }
-            self.sounds['background'].set_volume(0.5)  # Set background music volume
-            self.sounds['background'].play(-1)  # Play background music on loop
-        except:
-            print("Warning: Sound files not found. Running without sound.")  # Print a warning if sound files are not found
-            self.sounds = {}  # Initialize an empty sound dictionary
+    def __init__(self, settings=None):
+        settings = settings if settings is not None else CONFIG['audio']
+        self.sounds = {}  # Loaded sounds by name
         self.muted = False  # Initialize muted state
+        self.voice_limit = settings['voice_limit']
+        self.voice_limits = dict(settings['voice_limits'])
+        self.groups = {}  # Group name -> (channels, voices); a voice is (start time, sound name)
+        self.stolen_voices = 0  # Voices stopped early to make room
+        self.schedule_times = Histogram()  # Time spent inside play() in ms
+        self.buffer_latency_ms = 0.0
+
+        mixer_settings = pygame.mixer.get_init() if hasattr(pygame.mixer, 'get_init') else None
+        if not mixer_settings:
+            print("Warning: Audio mixer unavailable. Running without sound.")
+            return
+        frequency = mixer_settings[0]
+        self.buffer_latency_ms = settings['buffer_size'] / frequency * 1000.0
+
+        counts = {group: settings[f'{group}_channels'] for group in SOUND_GROUPS}
+        total_channels = sum(counts.values())
+        pygame.mixer.set_num_channels(total_channels)
+        pygame.mixer.set_reserved(total_channels)  # Keep Sound.play() from picking our channels
+        first = 0
+        for group in SOUND_GROUPS:
+            channels = [pygame.mixer.Channel(index) for index in range(first, first + counts[group])]
+            self.groups[group] = (channels, [None] * len(channels))
+            first += counts[group]
+
+        missing = []
+        for name, (file_name, _) in SOUND_FILES.items():
+            try:
+                self.sounds[name] = pygame.mixer.Sound(asset_source(os.path.join(SOUNDS_DIR, file_name)))
+            except (pygame.error, FileNotFoundError):
+                missing.append(file_name)
+        if missing:
+            print(f"Warning: Sound files not found: {', '.join(missing)}")
+
+        if 'background' in self.sounds:
+            self.sounds['background'].set_volume(BACKGROUND_VOLUME)  # Set background music volume
+            channels, voices = self.groups['music']
+            channels[0].play(self.sounds['background'], loops=-1)  # Play background music on loop
+            voices[0] = (time.perf_counter(), 'background')
 
     # Plays a sound
     def play(self, sound_name):
-        if not self.muted and sound_name in self.sounds:  # Check if not muted and sound exists
-            try:
-                self.sounds[sound_name].play()  # Play the sound
-            except:
-                pass
+        if self.muted or sound_name not in self.sounds:  # Muted managers schedule no new voices
+            return
+        started = time.perf_counter()
+        channels, voices = self.groups[SOUND_FILES[sound_name][1]]
+        index, steal = self._pick_channel(sound_name, channels, voices)
+        if steal:
+            channels[index].stop()
+            self.stolen_voices += 1
+        channels[index].play(self.sounds[sound_name])
+        voices[index] = (started, sound_name)
+        self.schedule_times.add((time.perf_counter() - started) * 1000.0)
+
+    def _pick_channel(self, sound_name, channels, voices):
+        """Return (channel index, whether a playing voice must be stolen)."""
+        limit = self.voice_limits.get(sound_name, self.voice_limit)
+        free = oldest = oldest_same = None
+        same_count = 0
+        for index, channel in enumerate(channels):
+            voice = voices[index]
+            if voice is not None and not channel.get_busy():
+                voices[index] = voice = None
+            if voice is None:
+                if free is None:
+                    free = index
+                continue
+            if voice[1] == sound_name:
+                same_count += 1
+                if oldest_same is None or voice[0] < voices[oldest_same][0]:
+                    oldest_same = index
+            if oldest is None or voice[0] < voices[oldest][0]:
+                oldest = index
+        if same_count >= limit:
+            return oldest_same, True
+        if free is not None:
+            return free, False
+        return oldest, True
 
     # Toggles mute state
     def toggle_mute(self):
         self.muted = not self.muted  # Toggle muted state
-        if self.muted:
-            pygame.mixer.pause()  # Pause all sounds
-        else:
-            pygame.mixer.unpause()  # Unpause all sounds
+        for channel in self.groups.get('music', ([], []))[0]:
+            channel.set_volume(0.0 if self.muted else 1.0)  # Silence music without losing its position
+
+    def stats(self):
+        """Voice usage and play-call latency for profiling reports."""
+        busy = {group: sum(1 for channel in channels if channel.get_busy()) for group, (channels, _) in self.groups.items()}
+        schedule = self.schedule_times.summary()
+        return {
+            'buffer_latency_ms': round(self.buffer_latency_ms, 3),
+            'play_call_ms': schedule,
+            'estimated_play_to_audio_ms': round(self.buffer_latency_ms + schedule['mean'], 3),
+            'stolen_voices': self.stolen_voices,
+            'busy_channels': busy
+        }
 
 # Particle class for visual effects
 class Particle:
@@ -526,7 +634,7 @@ class Button:
         self.text = text  # Text
         self.color = color  # Color
         self.text_color = text_color  # Text color
-        self.font = pygame.font.Font(FONT_PATH, 36)  # Font
+        self.font = load_game_font(36)  # Font
 
     # Draws the button
     def draw(self, screen):
@@ -553,25 +661,30 @@ class ModernButton(Button):
         self.hover = False  # Hover state
         self.original_y = y  # Original Y position
         self.animation_offset = 0  # Animation offset
-        self.particles = []  # Particles
+        self.particles = PARTICLE_BUDGET.emitter('sparkle', PRIORITY_SPARKLE)  # Particles
         self.theme = theme  # Theme
         self.glow_radius = 0  # Glow radius
         self.glow_direction = 1  # Glow direction
         self.sound_manager = sound_manager  # Sound manager
-        self.font = pygame.font.Font(FONT_PATH, 36)  # Font
+        self.font = load_game_font(36)  # Font shared by every button, so they share one glyph atlas
         self.base_color = color  # Preserve the intended color
+        self.shadow_surface = None  # Shadow, rebuilt only when the size or theme changes
+        self.shadow_key = None
 
     # Draws the modern button
     def draw(self, screen):
-        shadow_surface = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)  # Create a surface for the shadow
-        pygame.draw.rect(shadow_surface, self.theme['shadow'], 
-                        (0, 0, self.rect.width, self.rect.height), border_radius=10)  # Draw the shadow
-        screen.blit(shadow_surface, (self.rect.x, self.rect.y + 5))  # Blit the shadow to the screen
+        shadow_key = (self.rect.width, self.rect.height, tuple(self.theme['shadow']))
+        if shadow_key != self.shadow_key:  # Build the shadow once per size and theme
+            self.shadow_surface = pygame.Surface((self.rect.width, self.rect.height), pygame.SRCALPHA)  # Create a surface for the shadow
+            pygame.draw.rect(self.shadow_surface, self.theme['shadow'],
+                            (0, 0, self.rect.width, self.rect.height), border_radius=10)  # Draw the shadow
+            self.shadow_key = shadow_key
+        screen.blit(self.shadow_surface, (self.rect.x, self.rect.y + 5))  # Blit the shadow to the screen
 
         hover_offset = 3 if self.hover else 0  # Hover offset
 
-        if self.hover:
-            glow_color = (255, 255, 255, int(self.glow_radius))  # Glow color
+        if self.hover and QUALITY['glow'] > 0:  # Lower quality presets dim or skip the glow
+            glow_color = (255, 255, 255, int(self.glow_radius * QUALITY['glow']))  # Glow color
             glow_surface = pygame.Surface((self.rect.width + 20, self.rect.height + 20), pygame.SRCALPHA)  # Create a surface for the glow
             pygame.draw.rect(glow_surface, glow_color, (0, 0, self.rect.width + 20, self.rect.height + 20), border_radius=10)  # Draw the glow
             screen.blit(glow_surface, (self.rect.x - 10, self.rect.y - hover_offset - self.animation_offset - 10))  # Blit the glow to the screen
@@ -581,7 +694,7 @@ class ModernButton(Button):
                          self.rect.width, self.rect.height), 
                         border_radius=10)  # Draw the rectangle
 
-        text_surface = self.font.render(self.text, True, self.theme['text'])  # Render the text
+        text_surface = glyph_atlas(self.font, self.theme['text']).label(self.text)  # Cached text
         text_rect = text_surface.get_rect(center=self.rect.center)  # Get the text rectangle
         text_rect.y -= hover_offset + self.animation_offset  # Adjust the text position
         screen.blit(text_surface, text_rect)  # Blit the text to the screen
@@ -615,10 +728,6 @@ class ModernButton(Button):
             self.glow_radius = 0  # Reset the glow radius
             self.glow_direction = 1  # Reset the glow direction
 
-        self.particles = [p for p in self.particles if p.lifetime > 0]  # Remove dead particles
-        for particle in self.particles:  # Update the particles
-            particle.update(dt)
-
     # Handles hover events
     def handle_hover(self, pos):
         is_hovering = self.rect.collidepoint(pos)  # Check if the mouse is hovering over the button
@@ -628,8 +737,8 @@ class ModernButton(Button):
 
     # Creates particles
     def create_particles(self):
-        for _ in range(PARTICLE_COUNT):  # Create particles
-            self.particles.append(Particle(
+        for _ in range(effect_count(PARTICLE_COUNT)):  # Create particles
+            self.particles.emit(Particle(
                 self.rect.centerx,   # X position
                 self.rect.centery,   # Y position
                 self.color   # Color
@@ -637,10 +746,20 @@ class ModernButton(Button):
 
 # Train renderer class to handle train drawing
 class TrainRenderer:
+    window_glow = None  # Night-time window glow, shared by every train
+
     # Initializes the train renderer
     def __init__(self, train):
         self.train = train  # Train
 
+    # Returns the window glow, drawing it the first time it is needed
+    @classmethod
+    def glow_surface(cls):
+        if cls.window_glow is None:
+            cls.window_glow = pygame.Surface((20, 20), pygame.SRCALPHA)  # Create a surface for the glow
+            pygame.draw.circle(cls.window_glow, (255, 255, 0, 100), (10, 10), 8)  # Draw the glow
+        return cls.window_glow
+
     # Draws the train
     def draw(self, screen, is_dark_mode=False):
         pygame.draw.rect(screen, self.train.color, 
@@ -653,9 +772,8 @@ class TrainRenderer:
         
         window_color = (255, 255, 200) if is_dark_mode else (200, 200, 200)  # Window color
         if is_dark_mode:  # If dark mode is enabled
+            glow_surf = self.glow_surface()
             for window_x in [self.train.x + 25, self.train.x + 45]:  # For each window
-                glow_surf = pygame.Surface((20, 20), pygame.SRCALPHA)  # Create a surface for the glow
-                pygame.draw.circle(glow_surf, (255, 255, 0, 100), (10, 10), 8)  # Draw the glow
                 screen.blit(glow_surf, (window_x - 5, self.train.y))  # Blit the glow to the screen
         
         pygame.draw.rect(screen, window_color, (self.train.x + 25, self.train.y + 5, 10, 10))  # Draw the first window
@@ -679,7 +797,7 @@ class Train:
         self.moving = False  # Moving state
         self.move_direction = "left"  # Move direction
         self.speed = CONFIG['game']['initial_train_speed']  # Movement speed
-        self.smoke_particles = []  # Smoke particles
+        self.smoke_particles = PARTICLE_BUDGET.emitter('smoke', PRIORITY_SMOKE, SMOKE_TIME_SCALE)  # Smoke particles
         self.renderer = TrainRenderer(self)  # Train renderer
         self.bounds_width = WIDTH  # Default movement bounds
 
@@ -696,22 +814,96 @@ class Train:
             elif self.move_direction == "right":  # If the train is moving right
                 self.x += step  # Move right
 
-            self.emit_smoke()  # Emit smoke
-
-            for particle in self.smoke_particles:  # Update the smoke particles
-                particle.update(0.1)  # Update the particle
-
-            self.smoke_particles = [p for p in self.smoke_particles if p.lifetime > 0]  # Remove dead particles
+            self.update_smoke()  # Emit smoke
 
             bounds = getattr(self, 'bounds_width', WIDTH)
             if self.x + self.width < 0 or self.x > bounds:  # If the train is out of bounds
                 self.moving = False  # Stop moving
         return self.moving  # Return the moving state
 
+    # Emits new smoke while moving; the particle budget advances existing smoke
+    def update_smoke(self):
+        self.emit_smoke()  # Emit smoke
+
     # Emits smoke
     def emit_smoke(self):
-        if random.random() < SMOKE_EMISSION_CHANCE:  # If the smoke emission chance is met
-            self.smoke_particles.append(SmokeParticle(self.x + 10, self.y - 10, GRAY))  # Add a smoke particle
+        if random.random() < SMOKE_EMISSION_CHANCE * QUALITY['smoke']:  # If the smoke emission chance is met
+            self.smoke_particles.emit(SmokeParticle(self.x + 10, self.y - 10, GRAY))  # Add a smoke particle
+
+# Pre-rendered digits and HUD symbols for one font and color
+class GlyphAtlas:
+    GLYPHS = "0123456789x%:.-+"
+
+    def __init__(self, font, color):
+        self.font = font
+        self.color = color
+        self.glyphs = {char: font.render(char, True, color) for char in self.GLYPHS}
+        self.labels = {}  # Static text, rendered once
+        self.lines = {}  # Template -> (values, composed surface) of its last draw
+
+    def label(self, text):
+        surface = self.labels.get(text)
+        if surface is None:
+            if len(self.labels) >= LABEL_CACHE_SIZE:
+                self.labels.clear()
+            surface = self.labels[text] = self.font.render(text, True, self.color)
+        return surface
+
+    # Splits a "Score: {}" style template into cached labels and glyph-composed values
+    def surfaces(self, template, values):
+        pieces = template.split("{}")
+        surfaces = []
+        for index, piece in enumerate(pieces):
+            if piece:
+                surfaces.append(self.label(piece))
+            if index < len(values):
+                value = str(values[index])
+                if all(char in self.glyphs for char in value):
+                    surfaces.extend(self.glyphs[char] for char in value)
+                else:
+                    surfaces.append(self.label(value))
+        return surfaces
+
+    # Composes the filled-in template, recomposing only when its values change
+    def line(self, template, values):
+        cached = self.lines.get(template)
+        if cached is not None and cached[0] == values:
+            return cached[1]
+        surfaces = self.surfaces(template, values)
+        width = sum(surface.get_width() for surface in surfaces)
+        height = max((surface.get_height() for surface in surfaces), default=0)
+        line = pygame.Surface((max(1, width), max(1, height)), pygame.SRCALPHA)
+        x = 0
+        for surface in surfaces:
+            line.blit(surface, (x, 0))
+            x += surface.get_width()
+        if len(self.lines) >= LABEL_CACHE_SIZE:
+            self.lines.clear()
+        self.lines[template] = (values, line)
+        return line
+
+    def width(self, template, *values):
+        return self.line(template, values).get_width()
+
+    # Blits the filled-in template and returns its width
+    def draw(self, screen, position, template, *values):
+        line = self.line(template, values)
+        screen.blit(line, position)
+        return line.get_width()
+
+
+glyph_atlases = {}
+
+
+# Returns the shared atlas of a font and color, building it on first use
+def glyph_atlas(font, color):
+    key = (font, tuple(color))
+    atlas = glyph_atlases.get(key)
+    if atlas is None:
+        if len(glyph_atlases) >= GLYPH_ATLAS_CACHE_SIZE:
+            glyph_atlases.clear()
+        atlas = glyph_atlases[key] = GlyphAtlas(font, color)
+    return atlas
 
 # Message class for displaying messages on the screen
 class Message:
@@ -721,8 +913,9 @@ class Message:
         self.color = color  # Color
         self.duration = duration  # Duration
         self.start_time = pygame.time.get_ticks()  # Start time
-        self.font = pygame.font.Font(FONT_PATH, 48)  # Font
+        self.font = load_game_font(48)  # Font
         self.alpha = 255  # Alpha value
+        self.surface = None  # Rendered on first draw, then only its alpha changes
         
     # Checks if the message should be removed
     def should_remove(self):
@@ -731,11 +924,11 @@ class Message:
     # Draws the message
     def draw(self, screen):
         if self.alpha > 0:  # If the alpha value is greater than 0
-            text_surface = self.font.render(self.text, True, self.color)  # Render the text
+            if self.surface is None:
+                self.surface = self.font.render(self.text, True, self.color)  # Render the text once
+            text_surface = self.surface
             text_surface.set_alpha(self.alpha)  # Set the alpha value
-            surface = pygame.display.get_surface()
-            width = surface.get_width() if surface else WIDTH
-            height = surface.get_height() if surface else HEIGHT
+            width, height = scene_size()
             text_rect = text_surface.get_rect(center=(width // 2, height // 2))  # Get the text rectangle
             screen.blit(text_surface, text_rect)  # Blit the text to the screen
 
@@ -745,10 +938,18 @@ class Message:
 
 # Parallax layer class for creating parallax scrolling effects
 class ParallaxLayer:
+    """Scrolling image strip scaled to the window height.
+
+    For every window size the image is scaled once and tiled into a strip
+    one tile wider than the window, so drawing is a single blit of the
+    visible slice. Strips for the most recent sizes are kept so switching
+    back and forth between windowed and fullscreen does not rescale.
+    """
+
     # Initializes a parallax layer
-    def __init__(self, image_path, speed, offset_y=0):
+    def __init__(self, image_path, speed, offset_y=0, cache_size=PARALLAX_CACHE_SIZE):
         try:
-            self.image = pygame.image.load(image_path).convert_alpha()  # Load the image
+            self.image = load_image(image_path).convert_alpha()  # Load the image
             self.valid = True  # Set valid to True
         except (pygame.error, FileNotFoundError) as e:  # If the image is not found
             print(f"Warning: Could not load image {image_path}: {e}")  # Print a warning
@@ -758,23 +959,56 @@ class ParallaxLayer:
         
         self.x = 0  # X position
         self.offset_y = offset_y  # Store the vertical offset
-        self.y = HEIGHT - self.image.get_height() + offset_y  # Y position
-        self.speed = speed  # Speed
+        self.speed = speed  # Speed in pixels per second at the configured window height
+        self.cache_size = cache_size
+        self.strips = collections.OrderedDict()  # (width, height) -> (strip, tile width), least recent first
+        self.strip_builds = 0  # Number of strips scaled and tiled so far
+        self.resize(WIDTH, HEIGHT)
+
+    # Selects (building if needed) the strip for a window size
+    def resize(self, width, height):
+        self.scale = height / CONFIG["window"]["height"]  # Images are authored for the configured window height
+        self.y = height - round(self.image.get_height() * self.scale) + round(self.offset_y * self.scale)  # Y position
+        self.view_width = width
+        if not self.valid:
+            return
+        key = (width, height)
+        if key in self.strips:
+            self.strips.move_to_end(key)
+        else:
+            self.strips[key] = self.build_strip(width)
+            self.strip_builds += 1
+            if len(self.strips) > self.cache_size:
+                self.strips.popitem(last=False)  # Drop the least recently used size
+        self.strip, self.tile_width = self.strips[key]
+        self.x %= -self.tile_width  # Keep the scroll position inside one tile
+
+    def build_strip(self, width):
+        tile_width = max(1, round(self.image.get_width() * self.scale))
+        tile_height = max(1, round(self.image.get_height() * self.scale))
+        tile = self.image
+        if (tile_width, tile_height) != self.image.get_size():
+            tile = pygame.transform.smoothscale(self.image, (tile_width, tile_height))
+        tiles = -(-width // tile_width) + 1  # Enough tiles to cover the window plus one for scrolling
+        strip = pygame.Surface((tile_width * tiles, tile_height), pygame.SRCALPHA).convert_alpha()
+        for index in range(tiles):
+            strip.blit(tile, (index * tile_width, 0))
+        return strip, tile_width
 
     # Updates the parallax layer
     def update(self, dt):
         if not self.valid:  # If the layer is not valid
             return  # Return
-        self.x -= self.speed * dt  # Update the X position
-        if (self.x <= -self.image.get_width()):  # If the layer is out of bounds
-            self.x = 0  # Reset the X position
+        self.x -= self.speed * self.scale * dt  # Update the X position
+        if self.x <= -self.tile_width:  # If a whole tile has scrolled past
+            self.x += self.tile_width  # Wrap without a visible jump
 
     # Draws the parallax layer
     def draw(self, screen):
         if not self.valid:  # If the layer is not valid
             return  # Return
-        screen.blit(self.image, (self.x, self.y))  # Blit the image to the screen
-        screen.blit(self.image, (self.x + self.image.get_width(), self.y))  # Blit the image to the screen
+        visible = pygame.Rect(int(-self.x), 0, self.view_width, self.strip.get_height())
+        screen.blit(self.strip, (0, self.y), visible)  # Blit the visible slice of the strip
 
 # Game class to handle game logic
 class Game:
@@ -811,7 +1045,7 @@ class Game:
         self.train_speed = self.base_train_speed  # Set initial train speed
         self.max_trains = self.base_max_trains  # Set initial max trains
         self.train_positions = []  # Placeholder before game reset
-        self.explosion_particles = []  # Initialize explosion particles
+        self.explosion_particles = PARTICLE_BUDGET.emitter('explosion', PRIORITY_EXPLOSION)  # Initialize explosion particles
         self.combo_count = 0  # Initialize combo count
         self.combo_message = None  # Initialize combo message
         self.correct_matches = 0  # Track number of correct selections
@@ -823,7 +1057,7 @@ class Game:
         self.create_background()  # Create background
         self.current_train_index = 0  # Initialize current train index
 
-        self.font = pygame.font.Font(FONT_PATH, 36)  # Set font
+        self.font = load_game_font(36)  # Set font
         self.parallax_layers = [
             ParallaxLayer(os.path.join(IMAGES_DIR, "cloud_layer.png"), 10),
             ParallaxLayer(os.path.join(IMAGES_DIR, "tree_layer.png"), 30)
@@ -840,8 +1074,7 @@ class Game:
 
     # Adds a message
     def add_message(self, text, color, duration=1.0):
-        self.messages = [msg for msg in self.messages if not msg.should_remove()]  # Remove old messages
-        self.messages.append(Message(text, color, duration))  # Add new message
+        self.messages.append(Message(text, color, duration))  # Add new message; update removes expired ones
 
     # Resets the game
     def reset_game(self):
@@ -850,7 +1083,7 @@ class Game:
         self.score = 0  # Initialize score
         self.current_train_index = 0  # Initialize current train index
         self.all_trains_moving = False  # Initialize all trains moving state
-        self.explosion_particles = []  # Initialize explosion particles
+        self.explosion_particles.clear()  # Clear explosion particles
         self.level = 1  # Initialize level
         self.train_speed = self.base_train_speed  # Initialize train speed from config
         self.max_trains = self.base_max_trains  # Initialize max trains from config
@@ -897,7 +1130,7 @@ class Game:
 
     # Draws the menu
     def draw_menu(self, screen):
-        title_font = pygame.font.Font(FONT_PATH, 64)  # Set title font
+        title_font = load_game_font(64)  # Set title font
         title_text = title_font.render("Train Color Matcher", True, self.theme['text'])  # Render title text
         title_rect = title_text.get_rect(center=(WIDTH//2, HEIGHT//4))  # Get title rectangle
         screen.blit(title_text, title_rect)  # Blit title text
@@ -905,7 +1138,7 @@ class Game:
         self.start_button.draw(screen)  # Draw start button
         self.quit_button.draw(screen)  # Draw quit button
 
-        version_font = pygame.font.Font(FONT_PATH, 16)  # Set version font
+        version_font = load_game_font(16)  # Set version font
         version_text = version_font.render("v1.1 | Built by dundd - Feb 2025", True, self.theme['text'])  # Render version text
         version_rect = version_text.get_rect(bottomleft=(10, HEIGHT - 10))  # Get version rectangle
         screen.blit(version_text, version_rect)  # Blit version text
@@ -926,28 +1159,17 @@ class Game:
         for message in self.messages:  # Draw messages
             message.draw(screen)
 
-        font = pygame.font.Font(FONT_PATH, 36)  # Set font
-        
+        atlas = glyph_atlas(self.font, self.theme['text'])  # Counters are composed from cached glyphs
         remaining_trains = len(self.track_trains) - self.current_train_index  # Calculate remaining trains
-        progress_text = font.render(f'Remaining Trains: {remaining_trains}', True, self.theme['text'])  # Render progress text
-        score_text = font.render(f'Score: {self.score}', True, self.theme['text'])  # Render score text
-        level_text = font.render(f'Level: {self.level}', True, self.theme['text'])  # Render level text
         accuracy = calculate_accuracy(
             self.correct_matches,
             self.correct_matches + self.incorrect_matches
         )
-        accuracy_text = font.render(f'Accuracy: {accuracy:.0f}%', True, self.theme['text'])  # Render accuracy text
-        combo_text = font.render(
-            f'Combo: x{self.combo_count} (Best x{self.max_combo})',
-            True,
-            self.theme['text']
-        )  # Render combo text
-
-        screen.blit(progress_text, (10, 10))  # Blit progress text
-        screen.blit(score_text, (10, 40))  # Blit score text
-        screen.blit(level_text, (10, 70))  # Blit level text
-        screen.blit(accuracy_text, (10, 100))  # Blit accuracy text
-        screen.blit(combo_text, (10, 130))  # Blit combo text
+        atlas.draw(screen, (10, 10), 'Remaining Trains: {}', remaining_trains)  # Draw progress
+        atlas.draw(screen, (10, 40), 'Score: {}', self.score)  # Draw score
+        atlas.draw(screen, (10, 70), 'Level: {}', self.level)  # Draw level
+        atlas.draw(screen, (10, 100), 'Accuracy: {}%', f'{accuracy:.0f}')  # Draw accuracy
+        atlas.draw(screen, (10, 130), 'Combo: x{} (Best x{})', self.combo_count, self.max_combo)  # Draw combo
 
         self.mute_button.draw(screen)  # Draw mute button
 
@@ -959,7 +1181,7 @@ class Game:
 
     # Draws the game over screen
     def draw_game_over(self, screen):
-        font = pygame.font.Font(FONT_PATH, 64)  # Set font
+        font = load_game_font(64)  # Set font
         game_over_text = font.render("Game Over!", True, self.theme['text'])  # Render game over text
         score_text = font.render(f"Final Score: {self.score}", True, self.theme['text'])  # Render score text
         accuracy = calculate_accuracy(
@@ -979,7 +1201,7 @@ class Game:
     # Handles click events
     def handle_click(self, pos):
         if self.mute_button.is_clicked(pos):  # If the mute button is clicked
-            self.sound_manager.muted = not self.sound_manager.muted  # Toggle mute state
+            self.sound_manager.toggle_mute()  # Toggle mute state
             self.update_mute_button_label()  # Refresh mute button label
             return True
 
@@ -1046,45 +1268,45 @@ class Game:
             for layer in self.parallax_layers:  # Update parallax layers
                 layer.update(dt)
 
-            for train in self.track_trains:  # Update track trains
-                if train.moving:
-                    train.move()
-
-            if self.all_trains_moving and all(not train.moving for train in self.track_trains):  # If all trains are moving and stopped
-                self.state = GAME_OVER  # Set state to GAME_OVER
-                self.high_score = max(self.high_score, self.score)  # Update high score
-                self.sound_manager.play('game_over')  # Play game over sound
-
-            if self.score >= self.level * self.level_up_threshold:  # If the score meets the level up threshold
-                self.level_up()  # Level up
+            self.update_trains()  # Move trains, then check for game over and level up
 
             for message in self.messages:  # Update messages
                 message.update(dt)
             self.messages = [msg for msg in self.messages if not msg.should_remove()]  # Remove old messages
 
-            for particle in self.explosion_particles:  # Update explosion particles
-                particle.update(dt)
-            self.explosion_particles = [p for p in self.explosion_particles if p.lifetime > 0]  # Remove old particles
-
             if self.combo_message:  # Update combo message
                 self.combo_message.update(dt)
                 if self.combo_message.should_remove():
                     self.combo_message = None
 
+    # Moves the track trains and applies the game over and level up rules
+    def update_trains(self):
+        for train in self.track_trains:  # Update track trains
+            if train.moving:
+                train.move()
+
+        if self.all_trains_moving and all(not train.moving for train in self.track_trains):  # If all trains are moving and stopped
+            self.state = GAME_OVER  # Set state to GAME_OVER
+            self.high_score = max(self.high_score, self.score)  # Update high score
+            self.sound_manager.play('game_over')  # Play game over sound
+
+        if self.score >= self.level * self.level_up_threshold:  # If the score meets the level up threshold
+            self.level_up()  # Level up
+
     # Levels up the game
     def level_up(self):
         self.level += 1  # Increment level
         self.sound_manager.play('level_up')  # Play level up sound
         self.add_message(f"Level Up! {self.level}", self.theme['primary'], 1.5)  # Add level up message
-        self.train_speed += 1  # Increment train speed
-        self.max_trains = min(self.max_trains + 2, self.max_trains_cap)  # Increment max trains with cap
+        self.train_speed += CONFIG['game']['level_speed_step']  # Increment train speed
+        self.max_trains = min(self.max_trains + CONFIG['game']['level_train_step'], self.max_trains_cap)  # Increment max trains with cap
         self.initialize_trains()  # Initialize trains
         self.sound_manager.play('victory')  # Play victory sound
 
     # Creates an explosion
     def create_explosion(self, x, y, color):
-        for _ in range(30):  # Create explosion particles
-            self.explosion_particles.append(ExplosionParticle(x, y, color))
+        for _ in range(effect_count(EXPLOSION_PARTICLE_COUNT)):  # Create explosion particles
+            self.explosion_particles.emit(ExplosionParticle(x, y, color))
 
     # Updates the combo message
     def update_combo_message(self):
@@ -1119,8 +1341,7 @@ class Cloud:
     # Updates the cloud
     def update(self, dt):
         self.x += self.velocity * dt  # Update X position
-        surface = pygame.display.get_surface()
-        limit = surface.get_width() if surface else WIDTH
+        limit = scene_size()[0]
         if self.x > limit + 100:  # If the cloud is out of bounds
             self.x = -100  # Reset X position
 
@@ -1132,19 +1353,115 @@ class Cloud:
         pygame.draw.circle(screen, WHITE, (base_x + 20, base_y + 10), 25)  # Draw the second segment
         pygame.draw.circle(screen, WHITE, (base_x + 40, base_y), 20)  # Draw the third segment
 
-# Star class for drawing stars in the background
-class Star:
-    # Initializes a star
-    def __init__(self, x, y):
-        self.x = x  # X position
-        self.y = y  # Y position
-        self.size = random.randint(1, 3)  # Set size
-        self.brightness = random.randint(150, 255)  # Set brightness
+# Twinkling star field kept in NumPy arrays and written into the cached background's pixels
+class StarField:
+    def __init__(self, count, width, height, seed=None):
+        self.count = count
+        self.time = 0.0
+        self.visible = count  # Stars shown at the current quality preset
+        self.background = None  # Background the private sky was copied from
+        if np is not None:
+            rng = np.random.default_rng(seed)
+            self.u = rng.random(count)  # Horizontal position as a fraction of the width
+            self.v = rng.random(count)  # Vertical position as a fraction of the upper half
+            self.radius = rng.integers(STAR_SIZE_RANGE[0], STAR_SIZE_RANGE[1] + 1, count)
+            self.base = rng.integers(STAR_BRIGHTNESS_RANGE[0], STAR_BRIGHTNESS_RANGE[1] + 1, count)
+            self.phase = rng.random(count) * math.tau
+            self.rate = rng.uniform(*STAR_TWINKLE_RATE_RANGE, count)
+        else:
+            random_source = random.Random(seed)
+            self.u = [random_source.random() for _ in range(count)]
+            self.v = [random_source.random() for _ in range(count)]
+            self.radius = [random_source.randint(*STAR_SIZE_RANGE) for _ in range(count)]
+            self.base = [random_source.randint(*STAR_BRIGHTNESS_RANGE) for _ in range(count)]
+            self.phase = [random_source.random() * math.tau for _ in range(count)]
+            self.rate = [random_source.uniform(*STAR_TWINKLE_RATE_RANGE) for _ in range(count)]
+        self.resize(width, height)
+
+    # Places the stars in the upper half of a window, keeping every star fully inside it
+    def resize(self, width, height):
+        self.width = width
+        self.height = height
+        margin = STAR_SIZE_RANGE[1]
+        span_x = max(1, width - 2 * margin)
+        span_y = max(1, height // 2 - margin)
+        if np is None:
+            self.x = [margin + int(u * span_x) for u in self.u]
+            self.y = [margin + int(v * span_y) for v in self.v]
+        else:
+            self.x = margin + (self.u * span_x).astype(np.intp)
+            self.y = margin + (self.v * span_y).astype(np.intp)
+        self.background = None
 
-    # Draws the star
-    def draw(self, screen):
-        color = (self.brightness, self.brightness, self.brightness)  # Set color
-        pygame.draw.circle(screen, color, (self.x, self.y), self.size)  # Draw the star
+    def update(self, dt):
+        self.time += dt
+
+    # Twinkle step of every star, 0 (dimmest) to STAR_TWINKLE_LEVELS - 1
+    def levels(self):
+        if np is None:
+            steps = STAR_TWINKLE_LEVELS - 1
+            return [int(steps * 0.5 * (1.0 + math.sin(phase + self.time * rate)) + 0.5)
+                    for phase, rate in zip(self.phase, self.rate)]
+        scale = TWINKLE_TABLE_SIZE / math.tau
+        angles = ((self.phase + self.time * self.rate) * scale).astype(np.intp)
+        return twinkle_table()[angles & (TWINKLE_TABLE_SIZE - 1)]
+
+    def brightness(self, levels):
+        if np is None:
+            return [int(base * (STAR_TWINKLE_FLOOR + (1.0 - STAR_TWINKLE_FLOOR) * level / (STAR_TWINKLE_LEVELS - 1)))
+                    for base, level in zip(self.base, levels)]
+        return (self.base * (STAR_TWINKLE_FLOOR + (1.0 - STAR_TWINKLE_FLOOR) * levels / (STAR_TWINKLE_LEVELS - 1))).astype(np.uint8)
+
+    # Shows only a fraction of the stars, for lower quality presets
+    def set_density(self, fraction):
+        self.visible = int(round(self.count * fraction))
+
+    # Copies a background into the private sky surface and precomputes each star's pixel indices
+    # and its pixel value at every twinkle step
+    def bind(self, background):
+        self.sky = background.copy()
+        row = self.sky.get_pitch() // 4
+        red_shift, green_shift, blue_shift, _ = self.sky.get_shifts()
+        steps = np.arange(STAR_TWINKLE_LEVELS)
+        gray = (self.base[:, np.newaxis] * (STAR_TWINKLE_FLOOR + (1.0 - STAR_TWINKLE_FLOOR) * steps / (STAR_TWINKLE_LEVELS - 1))).astype(np.uint32)
+        self.step_pixels = (gray << red_shift) | (gray << green_shift) | (gray << blue_shift) | np.uint32(self.sky.get_masks()[3])
+        # Every stamp is padded to the largest one by repeating its first pixel, so one scatter draws any mix of sizes
+        stamp_width = len(star_stamp(STAR_SIZE_RANGE[1]))
+        offsets = np.zeros((STAR_SIZE_RANGE[1] + 1, stamp_width), dtype=np.intp)
+        for radius in range(STAR_SIZE_RANGE[0], STAR_SIZE_RANGE[1] + 1):
+            stamp = [dy * row + dx for dx, dy in star_stamp(radius)]
+            offsets[radius] = stamp + stamp[:1] * (stamp_width - len(stamp))
+        self.pixel_indices = (self.y * row + self.x)[:, np.newaxis] + offsets[self.radius]
+        pixels = np.frombuffer(self.sky.get_buffer(), np.uint32)
+        self.under = pixels[self.pixel_indices]  # Sky behind each star, for erasing hidden stars
+        del pixels
+        self.drawn_levels = np.full(self.count, STAR_HIDDEN, dtype=np.uint8)  # Nothing drawn yet
+        self.drawn_visible = 0
+        self.background = background
+
+    # Blits the background with the stars over it; only stars whose twinkle step changed are rewritten
+    def draw(self, screen, background):
+        levels = self.levels()
+        if np is None or not self.count or background.get_bytesize() != 4 or background.get_size() != (self.width, self.height):
+            screen.blit(background, (0, 0))
+            for x, y, radius, value in list(zip(self.x, self.y, self.radius, self.brightness(levels)))[:self.visible]:
+                pygame.draw.circle(screen, (value, value, value), (int(x), int(y)), int(radius))
+            return
+        if background is not self.background:
+            self.bind(background)
+        pixels = np.frombuffer(self.sky.get_buffer(), np.uint32)
+        if self.visible < self.drawn_visible:  # Erase stars hidden since the last frame
+            hidden = slice(self.visible, self.drawn_visible)
+            pixels[self.pixel_indices[hidden]] = self.under[hidden]
+            self.drawn_levels[:] = STAR_HIDDEN  # Redraw the rest, which may overlap an erased star
+        self.drawn_visible = self.visible
+        visible_levels = levels[:self.visible]
+        changed = np.flatnonzero(visible_levels != self.drawn_levels[:self.visible])
+        if changed.size:
+            self.drawn_levels[changed] = visible_levels[changed]
+            pixels[self.pixel_indices[changed]] = self.step_pixels[changed, visible_levels[changed]][:, np.newaxis]
+        del pixels  # Unlocks the sky
+        screen.blit(self.sky, (0, 0))
 
 # Building and house background elements
 class Building:
@@ -1261,11 +1578,155 @@ class House:
 
 
 
+def game_state_field(name: str) -> property:
+    """Expose attribute *name* of ``self.game_state`` as a read/write property."""
+    return property(
+        lambda self: getattr(self.game_state, name),
+        lambda self, value: setattr(self.game_state, name, value)
+    )
+
+
+# Renders the gradient, ties and rails behind the trains
+def render_background(size, theme, track_origin_x, track_y):
+    width, height = size
+    background = pygame.Surface(size)  # Opaque, so the per-frame blit is a plain copy
+    gradient = theme.get('background_gradient')
+    if gradient:
+        draw_vertical_gradient(background, gradient[0], gradient[1])
+    else:
+        background.fill(theme['background'])
+
+    rail_color = theme.get('rail_color', theme['text'])
+    for x in range(track_origin_x - 20, width, 40):
+        pygame.draw.rect(background, theme['track'], (x, track_y + 30, 20, 20), border_radius=4)
+
+    pygame.draw.line(background, rail_color, (0, track_y + 25), (width, track_y + 25), 5)
+    pygame.draw.line(background, rail_color, (0, track_y + 55), (width, track_y + 55), 5)
+    return background
+
+# Renders everything a theme needs before it can be shown: background and glass panels
+def render_theme_scene(size, theme, track_origin_x, track_y, panel_sizes=()):
+    return {
+        'background': render_background(size, theme, track_origin_x, track_y),
+        'panels': {panel_size: render_glass_panel(panel_size, theme) for panel_size in panel_sizes}
+    }
+
+# Approximate pixel memory held by a theme scene, in bytes
+def theme_scene_bytes(scene):
+    surfaces = [scene['background'], *scene['panels'].values()]
+    return sum(surface.get_width() * surface.get_height() * surface.get_bytesize() for surface in surfaces)
+
+# Background builder that renders theme scenes on a worker thread
+class BackgroundBuilder:
+    """Renders a scene for every theme off the main thread.
+
+    Every request bumps a generation counter and renders the listed themes
+    in order, so the visible theme comes first and the others are ready
+    before the player switches to them. The worker skips requests that were
+    superseded while it was busy, and `collect` drops scenes whose
+    generation is no longer current, so a burst of resizes costs one render.
+    """
+
+    def __init__(self, threaded=True):
+        self.generation = 0  # Generation of the latest request
+        self.builds = 0  # Theme scenes rendered
+        self.discarded = 0  # Requests skipped or scenes dropped as stale
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._results = {}  # Theme name -> (generation, scene) waiting to be collected
+        self._thread = None
+        if threaded:
+            self._thread = threading.Thread(target=self._run, name="background-builder", daemon=True)
+            self._thread.start()
+
+    # Queues scene renders for *themes* and returns the request's generation
+    def request(self, size, themes, track_origin_x, track_y, panel_sizes=()):
+        self.generation += 1
+        job = (self.generation, size, list(themes), track_origin_x, track_y, tuple(panel_sizes))
+        if self._thread is None:
+            self._build(job)
+        else:
+            self._jobs.put(job)
+        return self.generation
+
+    def _build(self, job):
+        generation, size, themes, track_origin_x, track_y, panel_sizes = job
+        for theme in themes:
+            if generation != self.generation:
+                return  # Superseded part way through; the newer request renders every theme again
+            scene = render_theme_scene(size, theme, track_origin_x, track_y, panel_sizes)
+            self.builds += 1
+            with self._lock:
+                self._results[theme['name']] = (generation, scene)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            while job is not None and not self._jobs.empty():
+                newer = self._jobs.get_nowait()  # Only the newest request matters
+                if newer is not None:
+                    self.discarded += 1
+                job = newer
+            if job is None:
+                return
+            self._build(job)
+
+    # Returns the finished scenes of the current generation by theme name
+    def collect(self):
+        with self._lock:
+            results, self._results = self._results, {}
+        scenes = {}
+        for name, (generation, scene) in results.items():
+            if generation == self.generation:
+                scenes[name] = scene
+            else:
+                self.discarded += 1
+        return scenes
+
+    # Blocks until the current generation of *theme_name* has been rendered
+    def wait(self, theme_name, timeout=2.0):
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            with self._lock:
+                result = self._results.get(theme_name)
+            if result is not None and result[0] == self.generation:
+                return True
+            time.sleep(0.001)
+        return False
+
+    def close(self, timeout=2.0):
+        if self._thread is None:
+            return
+        self._jobs.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
 # Modern game class with additional features
 class ModernGame(Game):
-    """Modern presentation of the game with responsive layouts and dynamic themes."""
+    """Modern presentation of the game with responsive layouts and dynamic themes.
+
+    Match rules, scoring and leveling live in a pygame-free `GameState`; this
+    class feeds it player actions, advances it once per frame and renders it.
+    """
+
+    score = game_state_field('score')
+    level = game_state_field('level')
+    train_speed = game_state_field('train_speed')
+    max_trains = game_state_field('max_trains')
+    current_train_index = game_state_field('current_train_index')
+    all_trains_moving = game_state_field('all_trains_moving')
+    combo_count = game_state_field('combo_count')
+    max_combo = game_state_field('max_combo')
+    correct_matches = game_state_field('correct_matches')
+    incorrect_matches = game_state_field('incorrect_matches')
 
     def __init__(self):
+        self.game_state = GameState(
+            CONFIG['game'],
+            rng=random,
+            train_width=CONFIG['train']['width'],
+            bounds_width=WIDTH
+        )
         self.themes = [LIGHT_THEME, DARK_THEME, LIQUID_GLASS_THEME]
         self.theme_index = 0
         self.pending_theme_index = None
@@ -1273,6 +1734,8 @@ class ModernGame(Game):
         self.window_width = WIDTH
         self.window_height = HEIGHT
         self.layout: Dict[str, pygame.Rect] = {}
+        self.hud_two_column = False  # Whether the stats and the timeline sit side by side in the HUD
+        self.hud_layout_text_width = 0  # Stats text width the HUD layout was computed for
         self.instruction_text = "Match the trains starting from the left!"
         self.motivation_quote = "Stay fluid and focused?�the right color keeps the cargo on track."
         self.timeline_entries: List[Dict[str, object]] = []
@@ -1287,9 +1750,35 @@ class ModernGame(Game):
         self.selection_y = int(self.window_height * 0.72)
         self.selection_spacing = TRAIN_SPACING
         self.dark_mode = False  # Legacy toggle for night elements
+        self.layout_engine = game_layout(CONFIG['train']['width'], len(TRAIN_COLORS), UI_PADDING, MUTE_BUTTON_SIZE)
+        self.wrapped_text: Dict[Tuple[str, str, int], List[str]] = {}
+        self.scheduler = FrameScheduler(1000.0 / CONFIG['quality']['target_fps'])
         self.recalculate_layout(self.window_width, self.window_height)
         super().__init__()
 
+        self.score_store = ScoreStore(SCORES_DB_PATH, LEADERBOARD_SIZE)
+        telemetry_settings = CONFIG['telemetry']
+        self.telemetry = Telemetry(
+            telemetry_settings['directory'],
+            enabled=telemetry_settings['enabled'],
+            buffer_capacity=telemetry_settings['buffer_capacity'],
+            max_file_bytes=telemetry_settings['max_file_bytes'],
+            backup_count=telemetry_settings['backup_count']
+        )
+        self.frame_outlier_seconds = telemetry_settings['frame_outlier_ms'] / 1000.0
+        self.input_latency = LatencyTracker()  # Enabled by the frame profiler
+        self.background_builder = BackgroundBuilder()
+        self.instant_replay = InstantReplay(CONFIG['replay']) if CONFIG['replay']['enabled'] else None
+        self.theme_scenes = {}  # Theme name -> pre-built scene for the current layout
+        self.scene_key = None  # Layout the theme scenes were requested for
+        self.fade_frame = None  # Copy of the last old-theme frame during a cross-fade
+        self.fade_frame_visible = False
+        self.high_score = max(self.high_score, self.score_store.high_score())
+        save_settings = CONFIG['save']
+        self.save_path = save_settings['path'] if save_settings['enabled'] else None
+        self.saved_game = None  # Offered on the menu until it is resumed or a new game replaces it
+        self.resumed_from = None  # Save this session last resumed, for input logs
+
         self.theme_button = ModernButton(
             self.layout['theme_button'].x,
             self.layout['theme_button'].y,
@@ -1301,18 +1790,19 @@ class ModernGame(Game):
             self.sound_manager
         )
         self.create_modern_buttons()
+        self.load_progress()
 
-        self.hud_font = pygame.font.Font(FONT_PATH, 32)
-        self.quote_font = pygame.font.Font(FONT_PATH, 24)
-        self.timeline_font = pygame.font.Font(FONT_PATH, 24)
-        self.instruction_font = pygame.font.Font(FONT_PATH, 30)
+        self.hud_font = load_game_font(32)
+        self.quote_font = load_game_font(24)
+        self.timeline_font = load_game_font(24)
+        self.instruction_font = load_game_font(30)
 
         self.recalculate_layout(self.window_width, self.window_height)
         self.refresh_button_palette()
 
         self.trees = [Tree(random.randint(50, self.window_width - 50), self.window_height - 100) for _ in range(TREE_COUNT)]
         self.clouds = [Cloud(random.randint(0, self.window_width), random.randint(*CLOUD_HEIGHT_RANGE)) for _ in range(CLOUD_COUNT)]
-        self.stars = [Star(random.randint(0, self.window_width), random.randint(0, self.window_height // 2)) for _ in range(STAR_COUNT)]
+        self.star_field = StarField(CONFIG['visual']['star_count'], self.window_width, self.window_height, random.getrandbits(32))
         self.generate_structures()
 
         try:
@@ -1331,6 +1821,10 @@ class ModernGame(Game):
         except KeyError as e:
             print(f"Warning: Missing parallax configuration: {e}")
             self.parallax_layers = []
+        for layer in self.parallax_layers:
+            layer.resize(self.window_width, self.window_height)
+        self.set_quality_preset(CONFIG['quality']['preset'])
+        self.request_background()  # Pre-build every theme while the menu is up
 
     def create_buttons(self):
         """Override base button creation to use the modern components."""
@@ -1338,161 +1832,28 @@ class ModernGame(Game):
         pass
 
     def recalculate_layout(self, width: int, height: int) -> None:
-        width = max(width, MIN_WINDOW_WIDTH)
-        height = max(height, MIN_WINDOW_HEIGHT)
-        self.window_width = width
-        self.window_height = height
-
-        max_trains = getattr(self, 'max_trains', CONFIG['game']['initial_max_trains'])
-        spacing_min = CONFIG['train']['width'] + 40
-        available_track_width = max(width - UI_PADDING * 4, spacing_min)
-        self.train_spacing = max(spacing_min, available_track_width // max(1, max_trains))
-        self.track_origin_x = UI_PADDING * 2
-        self.track_y = int(height * 0.35)
-
-        self.selection_y = int(height * 0.72)
-        self.selection_spacing = max(spacing_min, int(width * 0.18))
-        total_selection_span = self.selection_spacing * (len(TRAIN_COLORS) - 1)
-        self.selection_origin_x = int(width // 2 - total_selection_span / 2 - CONFIG['train']['width'] / 2)
-
-        hud_width = max(400, int(width * 0.32))
-        hud_height = max(240, int(height * 0.4))
-        hud_rect = pygame.Rect(
-            width - hud_width - UI_PADDING,
-            UI_PADDING,
-            hud_width,
-            min(hud_height, height - UI_PADDING * 2 - 120)
-        )
-        instruction_width = min(int(width * 0.6), width - UI_PADDING * 2)
-        instruction_rect = pygame.Rect(
-            width // 2 - instruction_width // 2,
-            height - 90,
-            instruction_width,
-            70
-        )
-
-        theme_button_width = 120
-        theme_button_height = 44
-        button_offset = 16
-        theme_button_left = max(UI_PADDING, hud_rect.left - theme_button_width - button_offset)
-        theme_button_rect = pygame.Rect(
-            theme_button_left,
-            hud_rect.top + button_offset,
-            theme_button_width,
-            theme_button_height
-        )
-        mute_x = theme_button_rect.left + (theme_button_rect.width - MUTE_BUTTON_SIZE) // 2
-        mute_rect = pygame.Rect(
-            mute_x,
-            theme_button_rect.bottom + 10,
-            MUTE_BUTTON_SIZE,
-            MUTE_BUTTON_SIZE
-        )
-
-        menu_panel_width = min(int(width * 0.6), width - UI_PADDING * 2)
-        menu_panel_rect = pygame.Rect(
-            width // 2 - menu_panel_width // 2,
-            int(height * 0.18),
-            menu_panel_width,
-            int(height * 0.5)
-        )
-        button_width = min(360, max(260, int(menu_panel_rect.width * 0.65)))
-        button_height = 60
-        start_rect = pygame.Rect(
-            width // 2 - button_width // 2,
-            menu_panel_rect.bottom - button_height * 2 - 30,
-            button_width,
-            button_height
-        )
-        quit_rect = pygame.Rect(
-            start_rect.x,
-            start_rect.bottom + 20,
-            button_width,
-            button_height
-        )
-        play_again_rect = pygame.Rect(start_rect)
-
-        stats_lines = self._build_stats_lines()
-        wrap_width = max(220, hud_rect.width - 40)
-        if hasattr(self, 'instruction_font'):
-            self.instruction_lines = wrap_text(
-                self.instruction_text,
-                self.instruction_font,
-                max(120, instruction_rect.width - 40)
-            )
-        else:
-            self.instruction_lines = [self.instruction_text]
-
-        if hasattr(self, 'quote_font'):
-            menu_wrap_width = max(220, menu_panel_rect.width - 80)
-            hud_quote_wrap = min(240, max(200, hud_rect.width - 200))
-            self.menu_quote_lines = wrap_text(self.motivation_quote, self.quote_font, menu_wrap_width)
-            self.default_hud_quote_lines = wrap_text(self.motivation_quote, self.quote_font, hud_quote_wrap)
-        else:
-            self.menu_quote_lines = [self.motivation_quote]
-            self.default_hud_quote_lines = [self.motivation_quote]
-
-        heading_top = hud_rect.top + 16
-        available_width = hud_rect.width - 40
-        column_gap = 24
-        timeline_min_width = 120
-        text_padding = 8
-        stats_width = 0
-        if hasattr(self, 'timeline_font'):
-            stats_width = max((self.timeline_font.size(line)[0] for line in stats_lines), default=0)
-        quote_width = 0
-        if hasattr(self, 'quote_font') and self.default_hud_quote_lines:
-            quote_width = max((self.quote_font.size(line)[0] for line in self.default_hud_quote_lines), default=0)
-        heading_width = self.hud_font.size("Mission Stats")[0] if hasattr(self, 'hud_font') else 0
-        base_stats_width = max(stats_width, quote_width, heading_width)
-        desired_stats_width = max(200, base_stats_width + text_padding)
-        can_two_column = available_width >= timeline_min_width + column_gap + desired_stats_width
-
-        if can_two_column:
-            stats_column_width = min(desired_stats_width, available_width - timeline_min_width - column_gap)
-            timeline_width = available_width - stats_column_width - column_gap
-            timeline_height = max(120, hud_rect.height - 32)
-            stats_left = hud_rect.left + 20
-            stats_right = stats_left + stats_column_width
-            timeline_left = max(stats_right + column_gap, hud_rect.right - 20 - timeline_width)
-            timeline_right_limit = hud_rect.right - 20
-            timeline_width = min(timeline_width, max(timeline_min_width, timeline_right_limit - timeline_left))
-            timeline_rect = pygame.Rect(
-                timeline_left,
-                heading_top,
-                timeline_width,
-                timeline_height
-            )
-            if timeline_rect.width < timeline_min_width:
-                can_two_column = False
-            else:
-                if timeline_rect.bottom > hud_rect.bottom - 16:
-                    timeline_rect.height = max(96, hud_rect.bottom - 16 - timeline_rect.top)
-                self.layout['scroll_rect'] = timeline_rect
-                if hasattr(self, 'timeline_font'):
-                    self.timeline_wrap_width = max(120, timeline_rect.width - 32)
-        if not can_two_column:
-            scroll_rect = self._compute_scroll_rect(hud_rect, stats_lines, self.default_hud_quote_lines)
-            self.layout['scroll_rect'] = scroll_rect
-            if hasattr(self, 'timeline_font'):
-                self.timeline_wrap_width = max(120, scroll_rect.width - 32)
-
-        self.layout['hud_two_column'] = can_two_column
-
-        self.layout['hud_rect'] = hud_rect
-        self.layout['instruction_rect'] = instruction_rect
-        self.layout['theme_button'] = theme_button_rect
-        self.layout['mute_button'] = mute_rect
-        self.layout['menu_panel'] = menu_panel_rect
-        self.layout['start_button'] = start_rect
-        self.layout['quit_button'] = quit_rect
-        self.layout['play_again_button'] = play_again_rect
+        self.window_width = max(width, MIN_WINDOW_WIDTH)
+        self.window_height = max(height, MIN_WINDOW_HEIGHT)
+        layout = self.compute_layout()
+
+        self.apply_hud_layout(layout)
+        self.train_spacing = layout['train_spacing']
+        self.track_origin_x = layout['track_origin_x']
+        self.track_y = layout['track_y']
+        self.selection_y = layout['selection_y']
+        self.selection_spacing = layout['selection_spacing']
+        self.selection_origin_x = layout['selection_origin_x']
+        for name in GAME_LAYOUT_BOXES:
+            self.layout[name] = pygame.Rect(layout[name])
+        self.instruction_lines = self.wrap_lines(self.instruction_text, 'instruction_font', layout['instruction_wrap_width'])
+        self.menu_quote_lines = self.wrap_lines(self.motivation_quote, 'quote_font', layout['menu_quote_wrap_width'])
 
         if hasattr(self, 'mute_button'):
-            self.mute_button.rect = pygame.Rect(mute_rect)
+            self.mute_button.rect = pygame.Rect(self.layout['mute_button'])
             self.mute_button.set_colors(self.theme['button'], self.theme['text'])
 
         if hasattr(self, 'theme_button'):
+            theme_button_rect = self.layout['theme_button']
             self.theme_button.apply_layout(
                 theme_button_rect.x,
                 theme_button_rect.y,
@@ -1503,9 +1864,10 @@ class ModernGame(Game):
         if hasattr(self, 'start_button'):
             self.update_button_layout()
 
+        self.game_state.set_track_layout(self.track_origin_x, self.train_spacing, self.window_width)
         if hasattr(self, 'track_trains'):
             for index, train in enumerate(self.track_trains):
-                train.x = self.track_origin_x + index * self.train_spacing
+                train.x = self.game_state.track_x[index]
                 train.y = self.track_y
                 train.bounds_width = self.window_width
         if hasattr(self, 'selection_trains'):
@@ -1516,7 +1878,50 @@ class ModernGame(Game):
 
 
         if hasattr(self, 'buildings'):
-            self.update_structures_layout()
+            self.defer_structures_layout()
+
+    def compute_layout(self, hud_text_width: Optional[int] = None) -> Dict[str, object]:
+        """Layout for the current window; memoized by the layout engine."""
+        return self.layout_engine.compute(
+            width=self.window_width,
+            height=self.window_height,
+            max_trains=getattr(self, 'max_trains', CONFIG['game']['initial_max_trains']),
+            hud_text_width=self.hud_text_width() if hud_text_width is None else hud_text_width,
+            line_heights=self.layout_line_heights()
+        )
+
+    def apply_hud_layout(self, layout: Dict[str, object]) -> None:
+        """Keep the parts of *layout* that depend on the HUD stats text width."""
+        self.hud_layout_text_width = layout['hud_text_width']
+        self.hud_two_column = layout['hud_two_column']
+        self.layout['scroll_rect'] = pygame.Rect(layout['scroll_rect'])
+        self.timeline_wrap_width = layout['timeline_wrap_width']
+
+    def hud_text_width(self, stats_fields: Optional[List[Tuple[str, tuple]]] = None) -> int:
+        if not hasattr(self, 'hud_font'):
+            return 0
+        stats_fields = self._build_stats_fields() if stats_fields is None else stats_fields
+        atlas = glyph_atlas(self.timeline_font, self.theme['text'])
+        stats_width = max((atlas.width(template, *values) for template, values in stats_fields), default=0)
+        return max(stats_width, glyph_atlas(self.hud_font, self.theme['text']).label("Mission Stats").get_width())
+
+    def layout_line_heights(self) -> Tuple[int, int]:
+        if not hasattr(self, 'hud_font'):
+            return UI_LINE_HEIGHT, UI_LINE_HEIGHT
+        return self.hud_font.get_linesize(), self.timeline_font.get_linesize()
+
+    def wrap_lines(self, text: str, font_name: str, width: int) -> List[str]:
+        """Wrap *text* with the named font, reusing earlier results for the same width."""
+        font = getattr(self, font_name, None)
+        if font is None:
+            return [text]
+        key = (text, font_name, width)
+        lines = self.wrapped_text.get(key)
+        if lines is None:
+            if len(self.wrapped_text) >= WRAP_CACHE_SIZE:
+                self.wrapped_text.clear()
+            lines = self.wrapped_text[key] = wrap_text(text, font, width)
+        return lines
 
     def update_button_layout(self) -> None:
         start_rect = self.layout['start_button']
@@ -1567,6 +1972,10 @@ class ModernGame(Game):
 
         self.update_structures_layout()
 
+    def defer_structures_layout(self) -> None:
+        """Reposition the skyline once the frame has slack; repeated requests merge into one."""
+        self.scheduler.submit('structures', self.update_structures_layout, PRIORITY_NORMAL, 100, coalesce=True)
+
     def update_structures_layout(self) -> None:
         if not hasattr(self, 'buildings'):
             return
@@ -1591,7 +2000,8 @@ class ModernGame(Game):
         for house in getattr(self, 'houses', []):
             house.reposition(self.window_width, self.window_height, suburb_base)
 
-    def _build_stats_lines(self) -> List[str]:
+    def _build_stats_fields(self) -> List[Tuple[str, tuple]]:
+        """HUD stats as (template, values) pairs drawn through the glyph atlas."""
         score = getattr(self, 'score', 0)
         high_score = getattr(self, 'high_score', 0)
         current_index = getattr(self, 'current_train_index', 0)
@@ -1604,38 +2014,14 @@ class ModernGame(Game):
         combo = getattr(self, 'combo_count', 0)
         best_combo = getattr(self, 'max_combo', 0)
         return [
-            f"Score: {score}",
-            f"High Score: {high_score}",
-            f"Remaining: {remaining}",
-            f"Level: {level}",
-            f"Accuracy: {accuracy:.0f}%",
-            f"Combo: x{combo} (Best x{best_combo})"
+            ("Score: {}", (score,)),
+            ("High Score: {}", (high_score,)),
+            ("Remaining: {}", (remaining,)),
+            ("Level: {}", (level,)),
+            ("Accuracy: {}%", (f"{accuracy:.0f}",)),
+            ("Combo: x{} (Best x{})", (combo, best_combo))
         ]
 
-    def _compute_scroll_rect(self, hud_rect: pygame.Rect, stats_lines: List[str], quote_lines: List[str]) -> pygame.Rect:
-        heading_height = self.hud_font.get_linesize() if hasattr(self, 'hud_font') else UI_LINE_HEIGHT
-        stats_line_height = self.timeline_font.get_linesize() if hasattr(self, 'timeline_font') else UI_LINE_HEIGHT
-        quote_line_height = self.quote_font.get_linesize() if hasattr(self, 'quote_font') else int(UI_LINE_HEIGHT * 0.9)
-        content_top = hud_rect.top + 16 + heading_height + 16
-        content_top += len(stats_lines) * stats_line_height
-        if quote_lines:
-            content_top += 12 + len(quote_lines) * quote_line_height
-        timeline_top = content_top + 12
-        inner_padding = 16
-        min_height = max(96, stats_line_height * 4)
-        available_height = hud_rect.bottom - inner_padding - timeline_top
-        if available_height < min_height:
-            timeline_top = max(hud_rect.top + heading_height + 32, hud_rect.bottom - inner_padding - min_height)
-            available_height = hud_rect.bottom - inner_padding - timeline_top
-        scroll_height = max(min_height, available_height)
-        scroll_width = max(80, hud_rect.width - inner_padding * 2)
-        return pygame.Rect(
-            hud_rect.left + inner_padding,
-            timeline_top,
-            scroll_width,
-            scroll_height
-        )
-
     def next_theme_label(self) -> str:
         return self.themes[(self.theme_index + 1) % len(self.themes)]['name']
 
@@ -1651,15 +2037,29 @@ class ModernGame(Game):
         self.quit_button = ModernButton(quit_rect.x, quit_rect.y, quit_rect.width, quit_rect.height, "Quit", self.theme['error'], self.theme, self.sound_manager)
         self.play_again_button = ModernButton(play_again_rect.x, play_again_rect.y, play_again_rect.width, play_again_rect.height, "Play Again", self.theme['primary'], self.theme, self.sound_manager)
 
+    def reset_game(self):
+        self.game_state.reset()
+        self.explosion_particles.clear()
+        self.combo_message = None
+        self.last_time = pygame.time.get_ticks()
+        self.session_start_ticks = self.last_time
+        self.build_train_views()
+
     def initialize_trains(self):
+        self.game_state.initialize_trains()
+        self.build_train_views()
+
+    def build_train_views(self) -> None:
+        """Create the drawable trains for the track currently dealt by the game state."""
+        state = self.game_state
         self.track_trains = []
-        for index in range(self.max_trains):
-            color = random.choice(TRAIN_COLORS)
-            x = self.track_origin_x + index * self.train_spacing
-            train = Train(x, self.track_y, color)
+        for index, color_index in enumerate(state.track_colors):
+            train = Train(state.track_x[index], self.track_y, TRAIN_COLORS[color_index])
             train.speed = self.train_speed
+            train.moving = state.moving[index]
             train.bounds_width = self.window_width
             self.track_trains.append(train)
+        self.track_generation = state.track_generation
 
         self.selection_trains = []
         for index, color in enumerate(TRAIN_COLORS):
@@ -1670,52 +2070,94 @@ class ModernGame(Game):
 
     def add_message(self, text, color, duration=1.0):
         super().add_message(text, color, duration)
-        self.timeline_entries.append({
+        entry = {
             'time': pygame.time.get_ticks(),
             'text': text,
             'color': tuple(color)
-        })
+        }
+        self.scheduler.submit('timeline', lambda: self.append_timeline_entry(entry), PRIORITY_NORMAL, 100)
+
+    def append_timeline_entry(self, entry):
+        """Wrap a message into the timeline log; deferred because the log is not urgent."""
+        self.wrap_lines(entry['text'], 'timeline_font', getattr(self, 'timeline_wrap_width', 120))
+        self.timeline_entries.append(entry)
         self.timeline_entries = self.timeline_entries[-16:]
         self.scroll_offset = self.timeline_content_height + 100
 
     def handle_keyboard_input(self, event):
-        if self.state == PLAYING:
+        if event.key == REPLAY_HOTKEY and self.instant_replay is not None:
+            self.save_instant_replay()
+        elif self.state == MENU:
+            if event.key == RESUME_KEY and self.saved_game is not None:
+                self.resume_saved_game()
+        elif self.state == PLAYING:
             if event.key == pygame.K_LEFT:
                 self.selected_train_index = (self.selected_train_index - 1) % len(self.selection_trains)
+                self.input_latency.tag('select')
             elif event.key == pygame.K_RIGHT:
                 self.selected_train_index = (self.selected_train_index + 1) % len(self.selection_trains)
+                self.input_latency.tag('select')
             elif event.key in (pygame.K_SPACE, pygame.K_RETURN):
                 self.match_train()
 
+    # Saves the instant-replay ring in the background and says so on the timeline
+    def save_instant_replay(self):
+        frames = self.instant_replay.save()
+        if frames:
+            self.telemetry.emit('replay_saved', frames=frames, level=self.level, score=self.score)
+            self.add_message(f"Replay saved ({frames} frames)", self.theme['accent'])
+        else:
+            self.add_message("No replay to save yet", self.theme['accent'])
+
     def match_train(self):
-        if self.current_train_index < len(self.track_trains):
-            selected_train = self.selection_trains[self.selected_train_index]
-            current_train = self.track_trains[self.current_train_index]
-            if selected_train.color == current_train.color:
-                self.sound_manager.play('correct')
-                self.create_explosion(current_train.x, current_train.y, current_train.color)
-                current_train.moving = True
-                current_train.move_direction = "left"
-                current_train.speed = self.train_speed
-                self.score += 1
-                self.add_message("Correct!", self.theme['secondary'])
-                self.current_train_index += 1
-                self.combo_count += 1
-                self.correct_matches += 1
-                self.max_combo = max(self.max_combo, self.combo_count)
-                self.update_combo_message()
-                self.sound_manager.play('item_pickup')
-                if self.current_train_index >= len(self.track_trains):
-                    self.all_trains_moving = True
-            else:
-                self.sound_manager.play('wrong')
-                self.add_message("Wrong Color!", self.theme['error'])
-                self.combo_count = 0
-                self.combo_message = None
-                self.incorrect_matches += 1
+        outcome = self.game_state.match(self.selected_train_index)
+        self.input_latency.tag(f"match_{outcome}")
+        if outcome == EVENT_CORRECT:
+            self.telemetry.emit('match', level=self.level, score=self.score, combo=self.combo_count,
+                                train_index=self.current_train_index - 1)
+            current_train = self.track_trains[self.current_train_index - 1]
+            self.sound_manager.play('correct')
+            self.create_explosion(current_train.x, current_train.y, current_train.color)
+            current_train.moving = True
+            current_train.move_direction = "left"
+            current_train.speed = self.train_speed
+            self.add_message("Correct!", self.theme['secondary'])
+            self.update_combo_message()
+            self.sound_manager.play('item_pickup')
+        elif outcome == EVENT_WRONG:
+            self.telemetry.emit('miss', reason='wrong_color', level=self.level, score=self.score,
+                                expected=self.game_state.current_color, picked=self.selected_train_index)
+            self.sound_manager.play('wrong')
+            self.add_message("Wrong Color!", self.theme['error'])
+            self.combo_message = None
         else:
+            self.telemetry.emit('miss', reason='no_trains', level=self.level, score=self.score)
             self.add_message("No more trains to match!", self.theme['accent'], 0.5)
 
+    def update_trains(self):
+        state = self.game_state
+        was_moving = list(state.moving)
+        generation = state.track_generation
+        events = state.advance()
+
+        if generation == self.track_generation:
+            for index, train in enumerate(self.track_trains):
+                train.x = state.track_x[index]
+                if was_moving[index]:
+                    train.update_smoke()
+                train.moving = state.moving[index]
+
+        for event in events:
+            if event == EVENT_GAME_OVER:
+                self.state = GAME_OVER
+                self.high_score = max(self.high_score, self.score)
+                self.record_session()
+                if self.save_path is not None:
+                    delete_snapshot(self.save_path)  # A finished game has nothing left to resume
+                self.sound_manager.play('game_over')
+            elif event == EVENT_LEVEL_UP:
+                self.apply_level_up_effects()
+
     def start_transition(self):
         self.transitioning = True
         self.transition_alpha = 0
@@ -1725,26 +2167,67 @@ class ModernGame(Game):
         self.start_transition()
 
     def create_background(self):
-        self.background = pygame.Surface((self.window_width, self.window_height), pygame.SRCALPHA)
-        gradient = self.theme.get('background_gradient')
-        if gradient:
-            draw_vertical_gradient(self.background, gradient[0], gradient[1])
-        else:
-            self.background.fill(self.theme['background'])
-
-        rail_color = self.theme.get('rail_color', self.theme['text'])
-        for x in range(self.track_origin_x - 20, self.window_width, 40):
-            pygame.draw.rect(self.background, self.theme['track'], (x, self.track_y + 30, 20, 20), border_radius=4)
-
-        pygame.draw.line(self.background, rail_color, (0, self.track_y + 25), (self.window_width, self.track_y + 25), 5)
-        pygame.draw.line(self.background, rail_color, (0, self.track_y + 55), (self.window_width, self.track_y + 55), 5)
+        self.background = render_background((self.window_width, self.window_height), self.theme,
+                                            self.track_origin_x, self.track_y)
+
+    def glass_panel_sizes(self):
+        names = ('hud_rect', 'instruction_rect', 'menu_panel', 'scroll_rect')
+        return sorted({self.layout[name].size for name in names if name in self.layout})
+
+    def request_background(self) -> None:
+        """Rebuild every theme's scene off-thread, showing the current background until it is ready."""
+        width, height = self.background.get_size()
+        if width < self.window_width or height < self.window_height:
+            # Stretch the old background so it still covers the window until the new one arrives
+            self.background = pygame.transform.scale(self.background, (self.window_width, self.window_height))
+        panel_sizes = self.glass_panel_sizes()
+        scene_key = (self.window_width, self.window_height, self.track_origin_x, self.track_y, tuple(panel_sizes))
+        if scene_key == self.scene_key:
+            return  # Every theme is already built (or queued) for this layout
+        self.scene_key = scene_key
+        self.theme_scenes = {}  # Scenes for the old layout no longer fit
+        themes = [self.theme] + [theme for theme in self.themes if theme is not self.theme]
+        self.background_builder.request((self.window_width, self.window_height), themes,
+                                        self.track_origin_x, self.track_y, panel_sizes)
+
+    def swap_background(self) -> None:
+        for name, scene in self.background_builder.collect().items():
+            self.theme_scenes[name] = scene
+            for size, panel in scene['panels'].items():
+                cache_glass_panel(name, size, panel)
+        scene = self.theme_scenes.get(self.theme['name'])
+        if scene is not None:
+            self.background = scene['background']
+
+    def set_quality_preset(self, preset):
+        """Use a fixed preset, or "auto" to follow measured frame times."""
+        self.quality = QualityController(CONFIG['quality']['target_fps'], preset)
+        self.apply_quality()
+
+    def apply_quality(self):
+        """Apply the effect scales of the current quality preset."""
+        QUALITY.update(self.quality.settings)
+        PARTICLE_BUDGET.set_cap(effect_count(PARTICLE_BUDGET_CAP))
+        self.star_field.set_density(QUALITY['stars'])
+        self.active_parallax_layers = self.parallax_layers[:QUALITY['parallax_layers']]
+
+    def observe_frame(self, work_ms):
+        """Feed one frame's work time to the quality controller."""
+        preset = self.quality.record(work_ms)
+        if preset is not None:
+            self.apply_quality()
+            self.telemetry.emit('quality', preset=preset, load=self.quality.last_load)
+
+    def theme_cache_stats(self):
+        """Pixel memory held by each pre-built theme scene, in bytes."""
+        return {name: theme_scene_bytes(scene) for name, scene in self.theme_scenes.items()}
 
     def draw_menu(self, screen):
-        screen.blit(self.background, (0, 0))
         if self.uses_night_sky:
-            for star in self.stars:
-                star.draw(screen)
-        for layer in self.parallax_layers:
+            self.star_field.draw(screen, self.background)  # Background with the twinkling stars over it
+        else:
+            screen.blit(self.background, (0, 0))
+        for layer in self.active_parallax_layers:
             layer.draw(screen)
         for building in getattr(self, 'buildings', []):
             building.draw(screen, self.uses_night_sky)
@@ -1758,32 +2241,39 @@ class ModernGame(Game):
         menu_panel = self.layout['menu_panel']
         draw_glass_panel(screen, menu_panel, self.theme)
 
-        title_font = pygame.font.Font(FONT_PATH, 64)
+        title_font = load_game_font(64)
         title_surface = title_font.render("Train Color Matcher", True, self.theme['text'])
         title_rect = title_surface.get_rect(center=(menu_panel.centerx, menu_panel.top + 80))
         screen.blit(title_surface, title_rect)
 
-        quote_y = title_rect.bottom + 20
-        for line in self.menu_quote_lines:
-            line_surface = self.quote_font.render(line, True, self.theme['secondary'])
-            screen.blit(line_surface, (menu_panel.left + 40, quote_y))
-            quote_y += self.quote_font.get_linesize()
+        if self.saved_game is not None:
+            resume_hint = self.layout['resume_hint']
+            line_surface = self.quote_font.render(self.resume_text(), True, self.theme['primary'])
+            screen.blit(line_surface, line_surface.get_rect(center=resume_hint.center))
+        else:
+            quote_y = title_rect.bottom + 20
+            for line in self.menu_quote_lines:
+                line_surface = self.quote_font.render(line, True, self.theme['secondary'])
+                screen.blit(line_surface, (menu_panel.left + 40, quote_y))
+                quote_y += self.quote_font.get_linesize()
 
         self.start_button.draw(screen)
         self.quit_button.draw(screen)
         self.theme_button.draw(screen)
         self.mute_button.draw(screen)
 
-        version_font = pygame.font.Font(FONT_PATH, 18)
+        self.draw_leaderboard(screen)
+
+        version_font = load_game_font(18)
         version_surface = version_font.render("v1.1 | Built by dundd - Feb 2025", True, self.theme['text'])
         screen.blit(version_surface, (UI_PADDING, self.window_height - UI_PADDING - version_surface.get_height()))
 
     def draw_game(self, screen):
-        screen.blit(self.background, (0, 0))
         if self.uses_night_sky:
-            for star in self.stars:
-                star.draw(screen)
-        for layer in self.parallax_layers:
+            self.star_field.draw(screen, self.background)  # Background with the twinkling stars over it
+        else:
+            screen.blit(self.background, (0, 0))
+        for layer in self.active_parallax_layers:
             layer.draw(screen)
         for building in getattr(self, 'buildings', []):
             building.draw(screen, self.uses_night_sky)
@@ -1815,23 +2305,31 @@ class ModernGame(Game):
         if self.combo_message:
             self.combo_message.draw(screen)
 
-        if self.transitioning:
-            target_theme = self.themes[self.pending_theme_index] if self.pending_theme_index is not None else self.theme
-            overlay_color = target_theme.get('background')
-            gradient = target_theme.get('background_gradient')
-            if gradient:
-                overlay_color = gradient[0]
-            overlay = pygame.Surface((self.window_width, self.window_height), pygame.SRCALPHA)
-            overlay.fill((*overlay_color, 255))
-            overlay.set_alpha(min(255, int(self.transition_alpha)))
-            screen.blit(overlay, (0, 0))
+    def draw_leaderboard(self, screen):
+        entries = self.score_store.top_scores(LEADERBOARD_SIZE)
+        rect = self.layout['leaderboard_panel']
+        line_height = self.timeline_font.get_linesize()
+        rows = min(len(entries), (rect.height - 24) // line_height - 1)
+        if rows <= 0:
+            return
+
+        panel = pygame.Rect(rect.left, rect.top, rect.width, (rows + 1) * line_height + 24)
+        draw_glass_panel(screen, panel, self.theme)
+        y = panel.top + 12
+        heading_surface = self.timeline_font.render("Top Scores", True, self.theme['accent'])
+        screen.blit(heading_surface, (panel.left + 40, y))
+        for rank, entry in enumerate(entries[:rows], start=1):
+            y += line_height
+            line = f"{rank}. {entry['score']} pts   Level {entry['level']}   {entry['accuracy']:.0f}%   Best x{entry['max_combo']}"
+            line_surface = self.timeline_font.render(line, True, self.theme['text'])
+            screen.blit(line_surface, (panel.left + 40, y))
 
     def draw_game_over(self, screen):
         self.draw_game(screen)
         panel = self.layout['menu_panel']
         draw_glass_panel(screen, panel, self.theme)
 
-        font = pygame.font.Font(FONT_PATH, 48)
+        font = load_game_font(48)
         game_over_surface = font.render("Game Over!", True, self.theme['text'])
         screen.blit(game_over_surface, game_over_surface.get_rect(center=(panel.centerx, panel.top + 70)))
 
@@ -1853,67 +2351,24 @@ class ModernGame(Game):
         hud_rect = self.layout['hud_rect']
         draw_glass_panel(screen, hud_rect, self.theme)
 
-        stats_lines = self._build_stats_lines()
+        stats_fields = self._build_stats_fields()
         stats_font = self.timeline_font
-        heading_surface = self.hud_font.render("Mission Stats", True, self.theme['text'])
+        stats_atlas = glyph_atlas(stats_font, self.theme['text'])
+        heading_surface = glyph_atlas(self.hud_font, self.theme['text']).label("Mission Stats")
         heading_y = hud_rect.top + 16
 
-        quote_lines = list(self.quote_lines) if getattr(self, 'quote_lines', None) else []
-
-        text_padding = 8
-        stats_width = max((stats_font.size(line)[0] for line in stats_lines), default=0)
-        quote_width = max((self.quote_font.size(line)[0] for line in quote_lines), default=0) if quote_lines else 0
-        heading_width = heading_surface.get_width()
-        base_text_width = max(stats_width, quote_width, heading_width)
-        text_column_width = base_text_width + text_padding
-
-        available_width = hud_rect.width - 40
-        timeline_min_width = 180
-        column_gap = 24
-        two_column = available_width >= timeline_min_width + column_gap + text_column_width
-
-        timeline_rect = None
-        if two_column:
-            timeline_width = max(timeline_min_width, available_width - column_gap - text_column_width)
-            timeline_height = max(120, hud_rect.height - 32)
-            text_left = hud_rect.left + 20
-            text_right = text_left + text_column_width
-            timeline_right_limit = hud_rect.right - 20
-            timeline_left = max(text_right + column_gap, timeline_right_limit - timeline_width)
-            timeline_width = max(timeline_min_width, timeline_right_limit - timeline_left)
-            if timeline_width < timeline_min_width:
-                two_column = False
-            else:
-                timeline_rect = pygame.Rect(timeline_left, heading_y, timeline_width, timeline_height)
-                if timeline_rect.bottom > hud_rect.bottom - 16:
-                    timeline_rect.height = max(96, hud_rect.bottom - 16 - timeline_rect.top)
-                self.layout['scroll_rect'] = timeline_rect
-                if hasattr(self, 'timeline_font'):
-                    self.timeline_wrap_width = max(120, timeline_rect.width - 32)
-
-        if not two_column:
-            timeline_rect = self._compute_scroll_rect(hud_rect, stats_lines, quote_lines)
-            self.layout['scroll_rect'] = timeline_rect
-            if hasattr(self, 'timeline_font'):
-                self.timeline_wrap_width = max(120, timeline_rect.width - 32)
+        hud_text_width = self.hud_text_width(stats_fields)
+        if hud_text_width != self.hud_layout_text_width:  # The stats grew or shrank; only the HUD moves
+            self.apply_hud_layout(self.compute_layout(hud_text_width))
 
         heading_pos = (hud_rect.left + 20, heading_y)
         screen.blit(heading_surface, heading_pos)
 
         y = heading_pos[1] + heading_surface.get_height() + 16
-        for line in stats_lines:
-            line_surface = stats_font.render(line, True, self.theme['text'])
-            screen.blit(line_surface, (heading_pos[0], y))
+        for template, values in stats_fields:
+            stats_atlas.draw(screen, (heading_pos[0], y), template, *values)
             y += stats_font.get_linesize()
 
-        if quote_lines:
-            y += 12
-            for line in quote_lines:
-                quote_surface = self.quote_font.render(line, True, self.theme['secondary'])
-                screen.blit(quote_surface, (heading_pos[0], y))
-                y += self.quote_font.get_linesize()
-
-        self.layout['hud_two_column'] = two_column
 
         self.draw_timeline(screen)
 
@@ -1926,7 +2381,7 @@ class ModernGame(Game):
         cached_lines = []
         total_height = 0
         for entry in self.timeline_entries:
-            lines = wrap_text(entry['text'], self.timeline_font, wrap_width)
+            lines = self.wrap_lines(entry['text'], 'timeline_font', wrap_width)
             cached_lines.append((entry, lines))
             total_height += len(lines) * line_height + 10
 
@@ -1938,14 +2393,14 @@ class ModernGame(Game):
         screen.set_clip(clip_rect)
         y = clip_rect.top - self.scroll_offset
         base_time = cached_lines[0][0]['time'] if cached_lines else 0
+        time_atlas = glyph_atlas(self.timeline_font, self.theme['accent'])
         for entry, lines in cached_lines:
             timestamp = (entry['time'] - base_time) / 1000.0
-            time_surface = self.timeline_font.render(f"{timestamp:>5.1f}s", True, self.theme['accent'])
-            screen.blit(time_surface, (clip_rect.left, y))
+            screen.blit(time_atlas.label(f"{timestamp:>5.1f}s"), (clip_rect.left, y))
             y += line_height
+            line_atlas = glyph_atlas(self.timeline_font, entry['color'])
             for line in lines:
-                line_surface = self.timeline_font.render(line, True, entry['color'])
-                screen.blit(line_surface, (clip_rect.left, y))
+                screen.blit(line_atlas.label(line), (clip_rect.left, y))
                 y += line_height
             y += 6
         screen.set_clip(None)
@@ -1964,21 +2419,27 @@ class ModernGame(Game):
 
     def handle_click(self, pos):
         if self.mute_button.is_clicked(pos):
-            self.sound_manager.muted = not self.sound_manager.muted
+            self.sound_manager.toggle_mute()
             self.update_mute_button_label()
+            self.input_latency.tag('button_mute')
             return True
 
         if self.theme_button.is_clicked(pos):
             self.toggle_theme()
             self.sound_manager.play('click')
+            self.input_latency.tag('button_theme')
             return True
 
         if self.state == MENU:
             if self.start_button.is_clicked(pos):
+                self.input_latency.tag('button_start')
                 self.start_button.create_particles()
                 self.sound_manager.play('click')
+                self.discard_saved_game()  # A new game replaces the saved one
                 self.state = PLAYING
                 self.reset_game()
+            elif self.saved_game is not None and self.layout['resume_hint'].collidepoint(pos):
+                self.resume_saved_game()
             elif self.quit_button.is_clicked(pos):
                 return False
 
@@ -1991,10 +2452,13 @@ class ModernGame(Game):
                     self.match_train()
                     break
             if not clicked:
+                self.telemetry.emit('miss', reason='no_train_clicked', level=self.level, x=pos[0], y=pos[1])
+                self.input_latency.tag('miss_click')
                 self.add_message("Please click on a train!", self.theme['accent'], 0.5)
 
         elif self.state == GAME_OVER:
             if self.play_again_button.is_clicked(pos):
+                self.input_latency.tag('button_play_again')
                 self.sound_manager.play('click')
                 self.state = PLAYING
                 self.reset_game()
@@ -2003,40 +2467,65 @@ class ModernGame(Game):
         return True
 
     def update(self, dt: float) -> None:
+        if dt > self.frame_outlier_seconds:
+            self.telemetry.emit('frame_outlier', dt_ms=round(dt * 1000.0, 2), state=self.state)
+        self.swap_background()
         Game.update(self)
         for cloud in self.clouds:
             cloud.update(dt)
+        if self.uses_night_sky:
+            self.star_field.update(dt)
         for button in [self.start_button, self.quit_button, self.play_again_button, self.theme_button]:
             button.update(dt)
+        PARTICLE_BUDGET.bounds = scene_size()
+        PARTICLE_BUDGET.update(dt)  # Every emitter's particles, including those of stopped trains
         if self.transitioning:
             self.transition_alpha += TRANSITION_SPEED * dt
             if self.transition_alpha >= 255:
                 self.complete_transition()
 
     def complete_transition(self):
-        if self.pending_theme_index is None:
-            self.transitioning = False
-            self.transition_alpha = 0
-            return
-        self.theme_index = self.pending_theme_index
+        self.transitioning = False
+        self.transition_alpha = 0
+        self.fade_frame_visible = False
+
+    def apply_theme(self, theme_index: int) -> None:
+        """Switch themes using the pre-built scene; layout does not depend on the theme."""
+        previous_theme = self.theme['name']
+        self.theme_index = theme_index
         self.pending_theme_index = None
         self.theme = self.themes[self.theme_index]
+        self.telemetry.emit('theme_change', theme=self.theme['name'], previous=previous_theme)
         self.dark_mode = self.uses_night_sky
         self.refresh_button_palette()
-        self.recalculate_layout(self.window_width, self.window_height)
-        self.create_background()
-        self.transitioning = False
-        self.transition_alpha = 0
+        scene = self.theme_scenes.get(self.theme['name'])
+        if scene is not None:
+            self.background = scene['background']
+        else:
+            self.create_background()  # Switched before the worker got to this theme
+
+    def draw(self, screen):
+        if self.pending_theme_index is not None:
+            # The screen still holds the last frame in the old theme; keep it to fade out
+            if self.fade_frame is None or self.fade_frame.get_size() != screen.get_size():
+                self.fade_frame = pygame.Surface(screen.get_size())
+            self.fade_frame.blit(screen, (0, 0))
+            self.fade_frame_visible = True
+            self.apply_theme(self.pending_theme_index)
+        Game.draw(self, screen)
+        if self.transitioning and self.fade_frame_visible:
+            self.fade_frame.set_alpha(max(0, 255 - int(self.transition_alpha)))
+            screen.blit(self.fade_frame, (0, 0))
 
     def handle_resize(self, width: int, height: int) -> None:
         old_width = getattr(self, 'window_width', width)
         old_height = getattr(self, 'window_height', height)
         self.recalculate_layout(width, height)
-        self.background = pygame.Surface((self.window_width, self.window_height), pygame.SRCALPHA)
-        self.create_background()
+        self.telemetry.emit('resize', width=self.window_width, height=self.window_height,
+                            previous_width=old_width, previous_height=old_height)
+        self.request_background()
         for layer in self.parallax_layers:
-            if hasattr(layer, 'image'):
-                layer.y = self.window_height - layer.image.get_height() + getattr(layer, 'offset_y', 0)
+            layer.resize(self.window_width, self.window_height)
         if old_width and old_height:
             ratio_x = self.window_width / max(old_width, 1)
             ratio_y = self.window_height / max(old_height, 1)
@@ -2046,102 +2535,441 @@ class ModernGame(Game):
             for cloud in self.clouds:
                 cloud.x = cloud.x * ratio_x
                 cloud.y = min(self.window_height - 50, max(0, cloud.y * ratio_y))
-            if self.uses_night_sky:
-                for star in self.stars:
-                    star.x = int(star.x * ratio_x)
-                    star.y = int(star.y * ratio_y)
 
-        self.update_structures_layout()
+        self.star_field.resize(self.window_width, self.window_height)
 
     def handle_scroll(self, amount: int) -> None:
         max_offset = max(0, self.timeline_content_height - self.layout['scroll_rect'].height + 16)
         self.scroll_offset = max(0, min(self.scroll_offset - amount * 24, max_offset))
 
+    def record_session(self) -> None:
+        """Queue the finished session for the score store's background writer."""
+        session = {
+            'score': self.score,
+            'accuracy': calculate_accuracy(self.correct_matches, self.correct_matches + self.incorrect_matches),
+            'max_combo': self.max_combo,
+            'level': self.level,
+            'duration_s': (pygame.time.get_ticks() - self.session_start_ticks) / 1000.0,
+            'theme': self.theme['name']
+        }
+        self.score_store.record_session(**session)
+        self.telemetry.emit('game_over', **session)
+
+    def snapshot(self) -> GameSnapshot:
+        """Capture the gameplay state for a save."""
+        now = pygame.time.get_ticks()
+        timeline = [(now - entry['time'], entry['color'], entry['text']) for entry in self.timeline_entries]
+        return GameSnapshot(self.game_state, self.theme_index, self.selected_train_index, self.high_score,
+                            now - self.session_start_ticks, timeline)
+
+    def restore_snapshot(self, snapshot: GameSnapshot) -> None:
+        """Resume the game in *snapshot*, rebuilding trains, layout and background around it."""
+        now = pygame.time.get_ticks()
+        snapshot.apply(self.game_state)
+        self.resumed_from = snapshot
+        self.state = PLAYING
+        self.selected_train_index = snapshot.selected_train_index % len(TRAIN_COLORS)
+        self.high_score = max(self.high_score, snapshot.high_score)
+        self.session_start_ticks = now - snapshot.elapsed_ms
+        self.last_time = now
+        self.explosion_particles.clear()
+        self.combo_message = None
+        self.messages = []
+        self.timeline_entries = [{'time': now - age, 'text': text, 'color': color}
+                                 for age, color, text in snapshot.timeline]
+        if snapshot.theme_index != self.theme_index and snapshot.theme_index < len(self.themes):
+            self.apply_theme(snapshot.theme_index)
+        self.build_train_views()
+        self.recalculate_layout(self.window_width, self.window_height)  # Track length decides the spacing
+        snapshot.place_trains(self.game_state)  # The layout snapped trains to their slots
+        for index, train in enumerate(self.track_trains):
+            train.x = self.game_state.track_x[index]
+        self.request_background()
+        self.saved_game = None
+        self.telemetry.emit('resume', level=self.level, score=self.score)
+
+    def save_progress(self) -> None:
+        """Save the game in progress; anything but an active game is left alone."""
+        if self.save_path is None or self.state != PLAYING:
+            return
+        self.scheduler.run_named('timeline')  # Messages still waiting to be logged belong in the save
+        try:
+            write_snapshot(self.save_path, self.snapshot())
+        except OSError as e:
+            print(f"Warning: Could not save the game to {self.save_path}: {e}")
+
+    def load_progress(self) -> None:
+        """Offer the saved game, if there is one, on the menu."""
+        if self.save_path is None:
+            return
+        try:
+            self.saved_game = read_snapshot(self.save_path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load the saved game {self.save_path}: {e}. Starting fresh.")
+            self.saved_game = None
+
+    def resume_text(self) -> str:
+        return f"Resume level {self.saved_game.level}, score {self.saved_game.score} (R)"
+
+    def resume_saved_game(self) -> None:
+        self.input_latency.tag('resume')
+        self.sound_manager.play('click')
+        self.restore_snapshot(self.saved_game)
+
+    def discard_saved_game(self) -> None:
+        if self.saved_game is None:
+            return
+        self.saved_game = None
+        if self.save_path is not None:
+            delete_snapshot(self.save_path)
+
+    def handle_focus_lost(self) -> None:
+        self.save_progress()  # The player may not come back to this window
+
+    def shutdown(self) -> None:
+        """Flush background writers before the game exits."""
+        self.save_progress()  # Quitting mid-level resumes from here next time
+        self.scheduler.run_all()
+        self.score_store.close()
+        self.telemetry.close()
+        self.background_builder.close()
+        if self.instant_replay is not None:
+            self.instant_replay.buffer.close()  # Waits for replays still being written
+
     def level_up(self):
-        super().level_up()
+        self.game_state.level_up()
+        self.apply_level_up_effects()
+
+    def apply_level_up_effects(self) -> None:
+        """Present a level up that the game state has already applied."""
+        self.sound_manager.play('level_up')
+        self.add_message(f"Level Up! {self.level}", self.theme['primary'], 1.5)
+        self.telemetry.emit('level_up', level=self.level, score=self.score, train_speed=self.train_speed,
+                            max_trains=self.max_trains)
+        self.build_train_views()
+        self.sound_manager.play('victory')
         self.recalculate_layout(self.window_width, self.window_height)
-        self.create_background()
+        self.scheduler.submit('background', self.request_background, PRIORITY_LOW, 500, coalesce=True)
+        self.scheduler.submit('autosave', self.save_progress, PRIORITY_LOW, 500, coalesce=True)
 
 # Combo message class for displaying combo messages
 class ComboMessage(Message):
     # Initializes a combo message
     def __init__(self, text, color, duration=1.0, font_size=48):
-        super().__init__(text, color, duration)  # Call superclass constructor
-        try:
-            self.font = pygame.font.Font(FONT_PATH, font_size)  # Set font
-        except:
-            print(f"Warning: Could not load font {FONT_PATH}, using system default")  # Print warning if font is not found
-            self.font = pygame.font.Font(None, font_size)  # Use default font
-        self.start_time = pygame.time.get_ticks()  # Set start time
+        self.text = text  # Set text
+        self.color = color  # Set color
+        self.duration = duration  # Set duration
         self.initial_font_size = font_size  # Set initial font size
+        self.frames = combo_keyframes(text, font_size, color)  # Pre-baked pulse frames
+        self.age = 0.0  # Seconds of simulation time since the combo fired
         self.scale = 1.0  # Set scale
-        surface = pygame.display.get_surface()
-        width = surface.get_width() if surface else WIDTH
-        height = surface.get_height() if surface else HEIGHT
-        self.position = (width // 2, height // 3)  # Set position
-        self.color = color  # Set color
+        self.alpha = 255  # Set alpha
 
-    # Updates the combo message
+    # Advances the pulse by the simulation step
     def update(self, dt):
-        current_time = pygame.time.get_ticks()  # Get current time
-        age = (current_time - self.start_time) / 1000.0  # Calculate age
-        
-        self.scale = 1.0 + 0.2 * abs(math.sin(age * 10))  # Update scale
-        
-        self.alpha = max(0, 255 * (1.0 - age / self.duration))  # Update alpha
+        self.age += dt  # Advance age
+        self.scale = 1.0 + COMBO_PULSE * abs(math.sin(self.age * 10))  # Update scale
+        self.alpha = max(0, 255 * (1.0 - self.age / self.duration))  # Update alpha
 
-    # Draws the combo message
+    # Draws the keyframe nearest to the current scale
     def draw(self, screen):
         if self.alpha > 0:  # If alpha is greater than 0
-            base_surface = self.font.render(self.text, True, self.color)  # Render text
-            scaled_size = (int(base_surface.get_width() * self.scale),
-                         int(base_surface.get_height() * self.scale))  # Calculate scaled size
-            
-            scaled_surface = pygame.transform.scale(base_surface, scaled_size)  # Scale surface
-            scaled_surface.set_alpha(self.alpha)  # Set alpha
-            
-            pos = (self.position[0] - scaled_size[0]//2,
-                  self.position[1] - scaled_size[1]//2)  # Calculate position
-            
-            screen.blit(scaled_surface, pos)  # Blit surface
+            index = round((self.scale - 1.0) / COMBO_PULSE * (len(self.frames) - 1))
+            frame = self.frames[index]
+            frame.set_alpha(self.alpha)  # Set alpha
+            width, height = screen.get_size()
+            screen.blit(frame, (width // 2 - frame.get_width() // 2, height // 3 - frame.get_height() // 2))
+
+# Render scaler that composes frames below window resolution
+class RenderScaler:
+    """Draws the scene on an offscreen surface and upscales it once before flip.
+
+    The game lays itself out for the render size, so every draw call,
+    particle and panel touches fewer pixels. The render size keeps the window
+    aspect ratio and never drops below the minimum window size the layout
+    supports. Mouse positions are mapped from window to render coordinates.
+    """
 
-# Main function to run the game
-def main():
+    def __init__(self, scale=1.0, smooth=True):
+        self.scale = scale
+        self.smooth = smooth  # smoothscale looks better; scale is cheaper
+        self.window_size = (0, 0)
+        self.render_size = (0, 0)
+        self.canvas = None  # Offscreen surface, None when drawing straight to the window
+
+    # Recreates the offscreen surface for a new window size and returns the render size
+    def resize(self, window_size):
+        global RENDER_SIZE
+        width, height = window_size
+        scale = min(1.0, max(self.scale, MIN_WINDOW_WIDTH / width, MIN_WINDOW_HEIGHT / height))
+        self.window_size = (width, height)
+        self.render_size = (max(MIN_WINDOW_WIDTH, round(width * scale)), max(MIN_WINDOW_HEIGHT, round(height * scale)))
+        if self.render_size[0] >= width and self.render_size[1] >= height:
+            self.render_size = self.window_size
+            self.canvas = None
+            RENDER_SIZE = None
+        else:
+            self.canvas = pygame.Surface(self.render_size).convert()  # Display format keeps blits and the upscale fast
+            RENDER_SIZE = self.render_size
+        return self.render_size
+
+    # Returns the surface the game should draw on this frame
+    def target(self, screen):
+        return self.canvas if self.canvas is not None else screen
+
+    # Upscales the finished frame onto the window in one pass
+    def present(self, screen):
+        if self.canvas is None:
+            return
+        if self.smooth:
+            pygame.transform.smoothscale(self.canvas, self.window_size, screen)
+        else:
+            pygame.transform.scale(self.canvas, self.window_size, screen)
+
+    # Maps a window position to render coordinates
+    def to_render(self, pos):
+        if self.canvas is None:
+            return pos
+        return (pos[0] * self.render_size[0] // self.window_size[0], pos[1] * self.render_size[1] // self.window_size[1])
+
+# Copies presented frames, optionally downscaled, into a frame recorder
+class FrameCapture:
+    def __init__(self, recorder, scale=1.0):
+        self.recorder = recorder  # Frame recorder that encodes and writes on worker threads
+        self.scale = scale  # Fraction of the window size that is recorded
+        self.scaled = None  # Reused downscale target
+
+    # Queues a copy of the presented frame, or counts a drop without copying when the recorder is behind
+    def capture(self, surface):
+        if self.recorder.full():
+            self.recorder.drop()
+            return
+        if self.scale != 1.0:
+            width, height = surface.get_size()
+            size = (max(1, int(width * self.scale)), max(1, int(height * self.scale)))
+            if self.scaled is None or self.scaled.get_size() != size:
+                self.scaled = pygame.Surface(size, 0, surface)
+            pygame.transform.scale(surface, size, self.scaled)
+            surface = self.scaled
+        width, height = surface.get_size()
+        self.recorder.submit(width, height, pygame.image.tobytes(surface, 'RGB'))
+
+# Keeps the last seconds of presented frames for the instant-replay hotkey
+class InstantReplay:
+    def __init__(self, settings):
+        self.directory = settings['directory']  # Saved replays go into timestamped folders here
+        self.buffer = ReplayBuffer(settings['seconds'], settings['max_megabytes'] * 1024 * 1024, settings['budget_ms'])
+        self.capture = FrameCapture(self.buffer, settings['scale'])
+
+    # Captures the presented frame when it is due and charges the cost against the budget
+    def observe(self, surface):
+        if not self.buffer.due():
+            self.buffer.charge(0.0, False)
+            return
+        started = time.perf_counter()
+        self.capture.capture(surface)
+        self.buffer.charge((time.perf_counter() - started) * 1000.0, True)
+
+    # Writes the ring out on a background thread and returns how many frames it holds
+    def save(self):
+        name = time.strftime("replay-%Y%m%d-%H%M%S") + f"-{self.buffer.dumps + 1}"
+        return self.buffer.dump(os.path.join(self.directory, name))
+
+# Logs the input the game handled, and the deals and matches it led to, to an input log
+class InputRecorder:
+    def __init__(self, game, path):
+        self.game = game
+        self.writer = InputLogWriter(path, (game.window_width, game.window_height))
+        self.watcher = SessionWatcher(game.game_state)
+        self.resumed_from = game.resumed_from
+        self.frame = 0  # Last frame observed
+        self.observe(0)  # The track already dealt for the menu
+
+    def click(self, frame, pos):
+        self.writer.click(frame, *pos)
+
+    def key(self, frame, key):
+        self.writer.key(frame, key)
+
+    def resize(self, frame, width, height):
+        self.writer.resize(frame, width, height)
+
+    def wheel(self, frame, amount):
+        self.writer.wheel(frame, amount)
+
+    # Logs a resumed save, a match attempt or a new deal since the last call, so replays can reproduce them
+    def observe(self, frame):
+        self.frame = frame
+        if self.game.resumed_from is not self.resumed_from:
+            # The replayed game has no save to resume, so the log carries it; its track is not a new deal
+            self.resumed_from = self.game.resumed_from
+            self.writer.resume(frame, self.resumed_from.encode())
+            self.watcher.sync()
+        outcome = self.watcher.new_match()
+        if outcome is not None:
+            self.writer.match(frame, outcome, self.game.selected_train_index)
+        colors = self.watcher.new_deal()
+        if colors is not None:
+            self.writer.deal(frame, colors)
+
+    def close(self):
+        self.writer.close(self.frame + 1)
+
+# Runs the event, update and draw loop until the player quits
+def run_game_loop(game, screen, clock, framerate=FRAMERATE, profiler=None, max_frames=None, input_script=None,
+                  render_scale=None, capture=None, input_recorder=None):
+    """Drive *game* frame by frame and return the number of frames shown.
+
+    *input_script*, when given, is called as ``input_script(frame, game)``
+    before events are read and returns pygame events to post, which lets
+    headless tools feed the exact same event path as a real player.
+    *render_scale* overrides ``window.render_scale`` from the config.
+    *capture*, a `FrameCapture`, records every presented frame.
+    *input_recorder*, an `InputRecorder`, logs the input for replays.
+    """
     global WIDTH, HEIGHT
-    pygame.init()  # Initialize Pygame
-    game = ModernGame()  # Create game instance
-    clock = pygame.time.Clock()  # Create clock
-    screen = set_window_mode((WIDTH, HEIGHT))  # Create display
-    pygame.display.set_caption(WINDOW_TITLE)  # Set window title
-    
+    latency = game.input_latency
+    window_settings = CONFIG['window']
+    scaler = RenderScaler(window_settings['render_scale'] if render_scale is None else render_scale,
+                          window_settings['smooth_upscale'])
+    render_size = scaler.resize(screen.get_size())
+    if render_size != (game.window_width, game.window_height):
+        if input_recorder is not None:
+            input_recorder.resize(0, *render_size)
+        game.handle_resize(*render_size)
+    frame = 0
     running = True  # Set running state
-    while running:
-        dt = clock.tick(FRAMERATE) / 1000.0  # Calculate delta time
-        
+    while running and (max_frames is None or frame < max_frames):
+        tick_start = time.perf_counter()
+        dt = clock.tick(framerate) / 1000.0  # Calculate delta time
+        work_start = time.perf_counter()  # Frame work starts once pacing is done
+        if input_script is not None:
+            for scripted_event in input_script(frame, game):
+                pygame.event.post(scripted_event)
+        if profiler is not None:
+            profiler.begin_frame(tick_start)
+
         for event in pygame.event.get():  # Handle events
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                latency.begin('click')  # Timestamp the input as it is dequeued
+            elif event.type == pygame.KEYDOWN:
+                latency.begin('key')
+
             if event.type == pygame.QUIT:  # If quit event
                 running = False
             elif event.type == pygame.VIDEORESIZE:
                 new_width = max(event.w, MIN_WINDOW_WIDTH)
                 new_height = max(event.h, MIN_WINDOW_HEIGHT)
                 screen = set_window_mode((new_width, new_height))
-                game.handle_resize(new_width, new_height)
+                render_size = scaler.resize((new_width, new_height))
+                if input_recorder is not None:
+                    input_recorder.resize(frame, *render_size)
+                game.handle_resize(*render_size)
                 WIDTH, HEIGHT = new_width, new_height
             elif event.type == pygame.MOUSEBUTTONDOWN:  # If mouse button down event
-                if not game.handle_click(event.pos):  # Handle click
+                position = scaler.to_render(event.pos)
+                if input_recorder is not None:
+                    input_recorder.click(frame, position)
+                if not game.handle_click(position):  # Handle click
                     running = False
             elif event.type == pygame.MOUSEWHEEL:
+                if input_recorder is not None:
+                    input_recorder.wheel(frame, event.y)
                 game.handle_scroll(event.y)
+            elif event.type == pygame.WINDOWFOCUSLOST:
+                game.handle_focus_lost()
             elif event.type == pygame.MOUSEMOTION:  # If mouse motion event
                 hover_targets = [game.theme_button, game.start_button, game.quit_button, game.play_again_button]
+                position = scaler.to_render(event.pos)
                 for button in hover_targets:
-                    button.handle_hover(event.pos)  # Handle hover
+                    button.handle_hover(position)  # Handle hover
             elif event.type == pygame.KEYDOWN:  # If key down event
+                if input_recorder is not None:
+                    input_recorder.key(frame, event.key)
                 game.handle_keyboard_input(event)  # Handle keyboard input
-        
+            if input_recorder is not None:
+                input_recorder.observe(frame)
+            latency.end()
+
+        if profiler is not None:
+            profiler.mark('events')
         game.update(dt)  # Update game
-        game.draw(screen)  # Draw game
+        if input_recorder is not None:
+            input_recorder.observe(frame)  # Level ups deal new tracks during the update
+        if profiler is not None:
+            profiler.mark('update')
+        game.draw(scaler.target(screen))  # Draw game
+        scaler.present(screen)
+        if profiler is not None:
+            profiler.mark('draw')
         pygame.display.flip()  # Flip display
+        if capture is not None:
+            capture.capture(screen)  # Copy the presented frame for the recorder's workers
+        if game.instant_replay is not None:
+            game.instant_replay.observe(screen)
+        if profiler is not None:
+            profiler.mark('flip')
+        work_ms = (time.perf_counter() - work_start) * 1000.0  # Deferred work below is throttled by the scheduler
+        game.scheduler.run(work_start)  # Deferred work in whatever the frame budget has left
+        if profiler is not None:
+            profiler.end_frame()
+        game.observe_frame(work_ms)
+        frame += 1
+    return frame
+
+# Main function to run the game
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=WINDOW_TITLE)
+    parser.add_argument("--profile", action="store_true", help="Print frame timings and input latency on exit")
+    parser.add_argument("--render-scale", type=float, help="Draw at this fraction of the window size (e.g. 0.5, 0.75)")
+    parser.add_argument("--quality", choices=QUALITY_PRESET_NAMES, help="Override quality.preset from config.json")
+    parser.add_argument("--record", action="store_true", help="Record every presented frame to recording.directory")
+    parser.add_argument("--record-format", choices=RECORDING_FORMATS, help="Override recording.format from config.json")
+    parser.add_argument("--record-scale", type=float, help="Override recording.scale from config.json")
+    parser.add_argument("--log-inputs", metavar="PATH", help="Log every input to PATH for replay_session.py")
+    args = parser.parse_args(argv)
+
+    pygame.init()  # Initialize Pygame
+    game = ModernGame()  # Create game instance
+    if args.quality is not None:
+        game.set_quality_preset(args.quality)
+    clock = pygame.time.Clock()  # Create clock
+    screen = set_window_mode((WIDTH, HEIGHT))  # Create display
+    pygame.display.set_caption(WINDOW_TITLE)  # Set window title
+    profiler = FrameProfiler(game.input_latency) if args.profile else None
+    capture = None
+    if args.record:
+        settings = CONFIG['recording']
+        session_dir = os.path.join(settings['directory'], time.strftime("session-%Y%m%d-%H%M%S"))
+        recorder = FrameRecorder(session_dir, args.record_format or settings['format'], settings['workers'],
+                                 settings['queue_size'])
+        capture = FrameCapture(recorder, settings['scale'] if args.record_scale is None else args.record_scale)
+    input_recorder = InputRecorder(game, args.log_inputs) if args.log_inputs else None
+
+    try:
+        run_game_loop(game, screen, clock, profiler=profiler, render_scale=args.render_scale, capture=capture,
+                      input_recorder=input_recorder)
+    finally:
+        game.shutdown()  # Flush queued scores and telemetry before exiting
+        if input_recorder is not None:
+            input_recorder.close()
+        if capture is not None:
+            capture.recorder.close()  # Write the frames still queued
+            stats = capture.recorder.stats()
+            print(f"Recorded {stats['written']} frames to {capture.recorder.directory} "
+                  f"({stats['dropped']} dropped, {stats['failed']} failed, {stats['megabytes']} MB)")
+        if profiler is not None:
+            summary = profiler.summary()
+            summary['audio'] = game.sound_manager.stats()
+            summary['theme_cache'] = game.theme_cache_stats()
+            summary['quality'] = game.quality.stats()
+            summary['particles'] = PARTICLE_BUDGET.stats()
+            summary['scheduler'] = game.scheduler.stats()
+            if game.instant_replay is not None:
+                summary['replay'] = game.instant_replay.buffer.stats()
+            if capture is not None:
+                summary['recording'] = capture.recorder.stats()
+            print(format_report(summary))
 
 # Run the game
 if __name__ == '__main__':
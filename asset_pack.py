@@ -0,0 +1,230 @@
+"""Single-file asset pack with a table of contents and memory-mapped reads.
+
+A pack is a small header, the asset files stored back to back at aligned
+offsets, and a JSON table of contents at the end. `AssetPack` maps the
+whole file and hands out `PackedFile` objects, file-like views over one
+entry that pygame's loaders read directly, so only the pages of the assets
+actually used are ever touched. Images can be stored pre-decoded as raw
+RGBA pixels so loading them skips PNG decompression.
+
+Build a pack from the assets directory with::
+
+    python asset_pack.py build --decode-images
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Sequence
+
+PACK_MAGIC = b"TCMPACK\0"
+PACK_VERSION = 1
+HEADER = struct.Struct("<8sIIQQ")  # magic, version, alignment, toc offset, toc length
+DEFAULT_ALIGNMENT = 4096  # Page aligned so one entry never shares a page with the next
+DEFAULT_PACK_NAME = "assets.pack"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+ENCODING_RAW = "raw"
+ENCODING_RGBA = "rgba"  # Pre-decoded 32-bit pixels, row major
+
+
+def normalize_name(name: str) -> str:
+    """Pack entries use forward slashes whatever the platform."""
+    return os.path.normpath(name).replace(os.sep, "/")
+
+
+class PackedFile(io.RawIOBase):
+    """Read-only, seekable file object over one memory-mapped pack entry."""
+
+    def __init__(self, view: memoryview, name: str = ""):
+        super().__init__()
+        self._view = view
+        self._position = 0
+        self.name = name
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), len(self._view) - self._position)
+        if size <= 0:
+            return 0
+        buffer[:size] = self._view[self._position:self._position + size]
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError("Negative seek position")
+        self._position = position
+        return position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self) -> None:
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+class AssetPack:
+    """Memory-mapped reader for packs written by `build_pack`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file
+            self._file.close()
+            raise ValueError(f"{path} is not an asset pack")
+        self._view = memoryview(self._map)
+        try:
+            magic, version, self.alignment, toc_offset, toc_length = HEADER.unpack_from(self._map, 0)
+            if magic != PACK_MAGIC or version != PACK_VERSION:
+                raise ValueError(f"{path} is not a version {PACK_VERSION} asset pack")
+            entries = json.loads(bytes(self._view[toc_offset:toc_offset + toc_length]).decode("utf-8"))
+        except (struct.error, UnicodeDecodeError, json.JSONDecodeError) as e:
+            self.close()
+            raise ValueError(f"{path} has a corrupt header or table of contents: {e}")
+        except ValueError:
+            self.close()
+            raise
+        self.entries: Dict[str, Dict[str, object]] = {entry['name']: entry for entry in entries}
+
+    def __contains__(self, name: str) -> bool:
+        return normalize_name(name) in self.entries
+
+    def names(self) -> List[str]:
+        return sorted(self.entries)
+
+    def entry(self, name: str) -> Dict[str, object]:
+        return self.entries[normalize_name(name)]
+
+    def view(self, name: str) -> memoryview:
+        """Zero-copy view of an entry's stored bytes."""
+        entry = self.entry(name)
+        return self._view[entry['offset']:entry['offset'] + entry['size']]
+
+    def open(self, name: str) -> PackedFile:
+        """File-like object for a raw entry, suitable for pygame loaders."""
+        entry = self.entry(name)
+        if entry['encoding'] != ENCODING_RAW:
+            raise ValueError(f"{name} is stored pre-decoded and has no file form")
+        return PackedFile(self.view(name), entry['name'])
+
+    def read(self, name: str) -> bytes:
+        return bytes(self.view(name))
+
+    def close(self) -> None:
+        """Unmap the pack; entries still held by pygame keep the map alive."""
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # Fonts keep their file open; the map is freed with them
+        self._file.close()
+
+
+def _decode_image(path: str):
+    """Return (width, height, RGBA bytes) for an image, using pygame."""
+    import pygame  # Only needed when building with --decode-images
+
+    surface = pygame.image.load(path)
+    return surface.get_width(), surface.get_height(), pygame.image.tobytes(surface, "RGBA")
+
+
+def _align(offset: int, alignment: int) -> int:
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def build_pack(source_dir: str, output_path: str, decode_images: bool = False,
+               alignment: int = DEFAULT_ALIGNMENT, prefix: Optional[str] = None) -> List[Dict[str, object]]:
+    """Write every file under *source_dir* into a pack and return its entries.
+
+    Entry names are relative to the parent of *source_dir* (for example
+    ``assets/images/cloud_layer.png``) unless *prefix* is given, so they
+    match the paths the game already uses.
+    """
+    if alignment <= 0 or alignment & (alignment - 1):
+        raise ValueError("Alignment must be a positive power of two")
+    source_dir = os.path.normpath(source_dir)
+    prefix = os.path.basename(source_dir) if prefix is None else prefix
+
+    files = []
+    for directory, subdirectories, file_names in os.walk(source_dir):
+        subdirectories.sort()
+        for file_name in sorted(file_names):
+            path = os.path.join(directory, file_name)
+            files.append((normalize_name(os.path.join(prefix, os.path.relpath(path, source_dir))), path))
+
+    entries = []
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        for name, path in files:
+            entry = {'name': name, 'encoding': ENCODING_RAW}
+            if decode_images and path.lower().endswith(IMAGE_EXTENSIONS):
+                width, height, data = _decode_image(path)
+                entry.update(encoding=ENCODING_RGBA, width=width, height=height)
+            else:
+                with open(path, "rb") as source:
+                    data = source.read()
+            offset = _align(f.tell(), alignment)
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(data)
+            entry.update(offset=offset, size=len(data))
+            entries.append(entry)
+
+        toc = json.dumps(entries, separators=(',', ':')).encode("utf-8")
+        toc_offset = f.tell()
+        f.write(toc)
+        f.seek(0)
+        f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, alignment, toc_offset, len(toc)))
+    os.replace(temp_path, output_path)  # Never leave a half-written pack behind
+    return entries
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Build or inspect the packed asset bundle.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="Pack a directory of assets")
+    build.add_argument("--source", default="assets", help="Directory to pack (default: assets)")
+    build.add_argument("--output", default=DEFAULT_PACK_NAME, help=f"Pack to write (default: {DEFAULT_PACK_NAME})")
+    build.add_argument("--decode-images", action="store_true", help="Store images as raw RGBA pixels (needs pygame)")
+    build.add_argument("--alignment", type=int, default=DEFAULT_ALIGNMENT, help="Entry alignment in bytes")
+    listing = subparsers.add_parser("list", help="Print the table of contents of a pack")
+    listing.add_argument("pack", nargs="?", default=DEFAULT_PACK_NAME)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        entries = build_pack(args.source, args.output, args.decode_images, args.alignment)
+        print(f"Packed {len(entries)} assets into {args.output} ({os.path.getsize(args.output)} bytes)")
+    else:
+        pack = AssetPack(args.pack)
+        try:
+            for name in pack.names():
+                entry = pack.entry(name)
+                print(f"{entry['offset']:>12} {entry['size']:>10} {entry['encoding']:<5} {name}")
+        finally:
+            pack.close()
+
+
+if __name__ == '__main__':
+    main()
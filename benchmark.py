@@ -0,0 +1,157 @@
+"""Headless benchmark of the full game loop.
+
+Runs `ModernGame` through `run_game_loop` on SDL's dummy drivers with a
+scripted player posting real mouse and keyboard events, then prints the
+frame phase timings and input-to-display latency histograms.
+
+Example::
+
+    python benchmark.py --frames 3000 --output bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import time
+from typing import List, Optional, Sequence
+
+from headless import PROJECT_DIR, load_game_module
+from profiling import FrameProfiler, format_report
+from quality import AUTO, QUALITY_LEVELS
+from recorder import FrameRecorder, RECORDING_FORMATS
+
+
+class ScriptedPlayer:
+    """Clicks through menus and matches trains at a fixed cadence."""
+
+    def __init__(self, module, rng: random.Random, click_interval: int = 6, error_rate: float = 0.1,
+                 key_rate: float = 0.2):
+        self.module = module
+        self.rng = rng
+        self.click_interval = max(1, click_interval)
+        self.error_rate = error_rate
+        self.key_rate = key_rate
+
+    def click(self, pos) -> object:
+        """Click at a game position, mapped to window coordinates when render scaling."""
+        module = self.module
+        x, y = pos
+        if module.RENDER_SIZE is not None:
+            x = (x + 0.5) * module.WIDTH / module.RENDER_SIZE[0]
+            y = (y + 0.5) * module.HEIGHT / module.RENDER_SIZE[1]
+        return module.pygame.event.Event(module.pygame.MOUSEBUTTONDOWN, pos=(int(x), int(y)), button=1)
+
+    def __call__(self, frame: int, game) -> List[object]:
+        if frame % self.click_interval:
+            return []
+        module = self.module
+        pygame = module.pygame
+        if game.state == module.MENU:
+            return [self.click(game.start_button.rect.center)]
+        if game.state == module.GAME_OVER:
+            return [self.click(game.play_again_button.rect.center)]
+
+        color = game.game_state.current_color
+        if color is None:
+            return []
+        if self.rng.random() < self.error_rate:
+            color = (color + self.rng.randint(1, len(game.selection_trains) - 1)) % len(game.selection_trains)
+        if self.rng.random() < self.key_rate:
+            events = []
+            steps = (color - game.selected_train_index) % len(game.selection_trains)
+            for _ in range(steps):
+                events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RIGHT, mod=0, unicode=""))
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE, mod=0, unicode=" "))
+            return events
+        train = game.selection_trains[color]
+        return [self.click((train.x + train.width / 2, train.y + train.height / 2))]
+
+
+def run_benchmark(frames: int, seed: int = 0, framerate: int = 0, click_interval: int = 6,
+                  render_scale: Optional[float] = None, quality: Optional[str] = None,
+                  record: Optional[str] = None, record_format: Optional[str] = None,
+                  log_inputs: Optional[str] = None, replay: bool = False) -> dict:
+    """Play *frames* frames headlessly and return the profiler summary.
+
+    With *record*, every frame is also captured into that directory, which
+    measures what recording costs the loop. With *log_inputs*, the scripted
+    player's input is logged there for `replay_session.py`. With *replay*,
+    the instant-replay ring runs as it does in the game, which measures what
+    it costs.
+    """
+    module = load_game_module()
+    random.seed(seed)
+    game = module.ModernGame()
+    if quality is not None:
+        game.set_quality_preset(quality)
+    if replay:
+        game.instant_replay = module.InstantReplay(module.CONFIG['replay'])
+    screen = module.set_window_mode((module.WIDTH, module.HEIGHT))
+    clock = module.pygame.time.Clock()
+    profiler = FrameProfiler(game.input_latency)
+    player = ScriptedPlayer(module, random.Random(seed), click_interval=click_interval)
+    capture = None
+    if record is not None:
+        settings = module.CONFIG['recording']
+        recorder = FrameRecorder(record, record_format or settings['format'], settings['workers'], settings['queue_size'])
+        capture = module.FrameCapture(recorder, settings['scale'])
+    input_recorder = module.InputRecorder(game, log_inputs) if log_inputs else None
+
+    started = time.perf_counter()
+    try:
+        shown = module.run_game_loop(game, screen, clock, framerate=framerate, profiler=profiler,
+                                     max_frames=frames, input_script=player, render_scale=render_scale,
+                                     capture=capture, input_recorder=input_recorder)
+    finally:
+        game.shutdown()
+        if input_recorder is not None:
+            input_recorder.close()
+        if capture is not None:
+            capture.recorder.close()
+    elapsed = time.perf_counter() - started
+
+    summary = profiler.summary()
+    summary['audio'] = game.sound_manager.stats()
+    summary['theme_cache'] = game.theme_cache_stats()
+    summary['quality'] = game.quality.stats()
+    summary['particles'] = module.PARTICLE_BUDGET.stats()
+    summary['scheduler'] = game.scheduler.stats()
+    if game.instant_replay is not None:
+        summary['replay'] = game.instant_replay.buffer.stats()
+    if capture is not None:
+        summary['recording'] = capture.recorder.stats()
+    summary['wall_time_s'] = round(elapsed, 3)
+    summary['fps'] = round(shown / elapsed, 1) if elapsed > 0 else 0.0
+    summary['final_state'] = {'state': game.state, 'score': game.score, 'level': game.level}
+    return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the game loop headlessly.")
+    parser.add_argument("--frames", type=int, default=3000, help="Frames to run (default: 3000)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the game and the scripted player")
+    parser.add_argument("--fps", type=int, default=0, help="Frame rate cap passed to clock.tick (default: uncapped)")
+    parser.add_argument("--click-interval", type=int, default=6, help="Frames between scripted inputs")
+    parser.add_argument("--render-scale", type=float, help="Override window.render_scale from config.json")
+    parser.add_argument("--quality", choices=(AUTO,) + QUALITY_LEVELS, help="Override quality.preset from config.json")
+    parser.add_argument("--record", metavar="DIR", help="Also record every frame into this directory")
+    parser.add_argument("--record-format", choices=RECORDING_FORMATS, help="Override recording.format from config.json")
+    parser.add_argument("--log-inputs", metavar="PATH", help="Log the scripted input for replay_session.py")
+    parser.add_argument("--replay", action="store_true", help="Keep the instant-replay ring running, as the game does")
+    parser.add_argument("--output", help="Write the summary as JSON to this path")
+    args = parser.parse_args(argv)
+
+    os.chdir(PROJECT_DIR)  # Assets and config.json are resolved relative to the project
+    summary = run_benchmark(args.frames, args.seed, args.fps, args.click_interval, args.render_scale, args.quality,
+                            args.record, args.record_format, args.log_inputs, args.replay)
+    print(f"{summary['fps']} FPS over {summary['frames']} frames ({summary['wall_time_s']}s)")
+    print(format_report(summary))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""Headless bot tournament for tuning difficulty settings.
+
+Plays thousands of complete games with scripted bot players against one or
+more candidate configurations and reports the level reached, accuracy and
+best combo distributions side by side. Games are split into chunks that run
+as `BatchGameState` simulations across a `multiprocessing` pool, one worker
+per core, so a sweep scales with the number of cores.
+
+Example::
+
+    python bot_tournament.py --games 10000 --config config.json \\
+        --config candidate.json --bots perfect,reaction,error
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from config_validator import ConfigValidator
+from game_state import BatchGameState, COLOR_COUNT, NO_ACTION, np
+
+SIMULATION_FRAMERATE = 60  # Frames per simulated second, matching the game loop
+MAX_GAME_FRAMES = SIMULATION_FRAMERATE * 60 * 30  # Safety cap of 30 simulated minutes per game
+CHUNK_SIZE = 250  # Games simulated together by one pool task
+PERCENTILES = (10, 50, 90)
+
+
+class BotProfile:
+    """A scripted player.
+
+    The bot waits ``reaction_ms`` (with normally distributed jitter) after a
+    new train becomes the one to match, then clicks; with probability
+    ``error_rate`` the click picks a wrong color.
+    """
+
+    def __init__(self, name: str, reaction_ms: float = 0.0, reaction_jitter_ms: float = 0.0, error_rate: float = 0.0):
+        if reaction_ms < 0 or reaction_jitter_ms < 0:
+            raise ValueError("Reaction times must be non-negative")
+        if not 0.0 <= error_rate < 1.0:
+            raise ValueError("Error rate must be in the range [0, 1)")
+        self.name = name
+        self.reaction_ms = reaction_ms
+        self.reaction_jitter_ms = reaction_jitter_ms
+        self.error_rate = error_rate
+
+    def describe(self) -> str:
+        return f"{self.name} (reaction {self.reaction_ms:.0f}+-{self.reaction_jitter_ms:.0f} ms, errors {self.error_rate:.0%})"
+
+
+BOT_PRESETS = {
+    'perfect': BotProfile('perfect'),
+    'reaction': BotProfile('reaction', reaction_ms=350, reaction_jitter_ms=90),
+    'error': BotProfile('error', error_rate=0.15),
+    'casual': BotProfile('casual', reaction_ms=550, reaction_jitter_ms=150, error_rate=0.1)
+}
+
+
+def parse_bot(spec: str) -> BotProfile:
+    """Resolve a preset name or a ``name:reaction_ms[:error_rate[:jitter_ms]]`` spec."""
+    if spec in BOT_PRESETS:
+        return BOT_PRESETS[spec]
+    parts = spec.split(':')
+    if len(parts) < 2 or len(parts) > 4:
+        raise ValueError(f"Unknown bot '{spec}'; use a preset ({', '.join(BOT_PRESETS)}) or name:reaction_ms[:error_rate[:jitter_ms]]")
+    reaction_ms = float(parts[1])
+    error_rate = float(parts[2]) if len(parts) > 2 else 0.0
+    jitter_ms = float(parts[3]) if len(parts) > 3 else 0.0
+    return BotProfile(parts[0], reaction_ms, jitter_ms, error_rate)
+
+
+def simulate_chunk(task: Tuple[Dict[str, float], Dict[str, float], int, int]) -> Dict[str, object]:
+    """Play *count* complete games for one (settings, bot) pair.
+
+    Runs in a worker process; returns plain arrays so results stay cheap to
+    pickle back to the parent.
+    """
+    settings, bot_fields, count, seed = task
+    bot = BotProfile(**bot_fields)
+    seeds = np.random.SeedSequence(seed).spawn(2)
+    batch = BatchGameState(count, settings, seed=seeds[0])
+    rng = np.random.default_rng(seeds[1])
+
+    frame_ms = 1000.0 / SIMULATION_FRAMERATE
+    target_key = np.full(count, -1, dtype=np.int64)
+    waited = np.zeros(count, dtype=np.float64)
+    delay = np.zeros(count, dtype=np.float64)
+
+    while batch.active.any() and batch.frames.max() < MAX_GAME_FRAMES:
+        current = batch.current_color
+        # A new target appears whenever the index advances or a level deals a new track
+        key = batch.current_train_index + batch.level * 1_000_000
+        fresh = key != target_key
+        target_key = key
+        waited = np.where(fresh, 0.0, waited + frame_ms)
+        if bot.reaction_ms or bot.reaction_jitter_ms:
+            jittered = rng.normal(bot.reaction_ms, bot.reaction_jitter_ms, count) if bot.reaction_jitter_ms else np.full(count, bot.reaction_ms)
+            delay = np.where(fresh, np.maximum(0.0, jittered), delay)
+
+        acting = (current != NO_ACTION) & (waited >= delay)
+        actions = np.where(acting, current, NO_ACTION)
+        if bot.error_rate:
+            mistakes = acting & (rng.random(count) < bot.error_rate)
+            wrong = (current + rng.integers(1, COLOR_COUNT, count)) % COLOR_COUNT
+            actions = np.where(mistakes, wrong, actions)
+        # After a click the bot needs to react again before the next one
+        waited = np.where(acting, -frame_ms, waited)
+        batch.step(actions)
+
+    return {
+        'level': batch.level,
+        'accuracy': batch.accuracy,
+        'max_combo': batch.max_combo,
+        'score': batch.score,
+        'frames': batch.frames,
+        'unfinished': int(batch.active.sum())
+    }
+
+
+def load_candidate(path: str) -> Dict[str, float]:
+    """Read and validate the game settings of a candidate config file."""
+    with open(path, "r") as f:
+        config = json.load(f)
+    return ConfigValidator.validate_config(config)['game']
+
+
+def summarize(values) -> Dict[str, float]:
+    summary = {'mean': float(values.mean())}
+    for pct, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+        summary[f'p{pct}'] = float(value)
+    return summary
+
+
+def histogram(values) -> Dict[str, int]:
+    keys, counts = np.unique(values, return_counts=True)
+    return {str(int(key)): int(count) for key, count in zip(keys, counts)}
+
+
+def run_tournament(candidates: Sequence[Tuple[str, Dict[str, float]]], bots: Sequence[BotProfile], games: int,
+                   workers: Optional[int] = None, seed: int = 0) -> Dict[str, object]:
+    """Simulate *games* games per (candidate, bot) pair and aggregate the results."""
+    if np is None:
+        raise ImportError("NumPy is required for the bot tournament")
+    if games <= 0:
+        raise ValueError("Number of games must be positive")
+
+    workers = workers or os.cpu_count() or 1
+    tasks = []
+    owners = []
+    seed_sequence = np.random.SeedSequence(seed)
+    for candidate_index, (_, settings) in enumerate(candidates):
+        for bot_index, bot in enumerate(bots):
+            remaining = games
+            while remaining > 0:
+                count = min(CHUNK_SIZE, remaining)
+                remaining -= count
+                task_seed = int(seed_sequence.spawn(1)[0].generate_state(1)[0])
+                tasks.append((dict(settings), vars(bot).copy(), count, task_seed))
+                owners.append((candidate_index, bot_index))
+
+    started = time.perf_counter()
+    if workers == 1:
+        chunks = [simulate_chunk(task) for task in tasks]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            chunks = pool.map(simulate_chunk, tasks, chunksize=1)
+    elapsed = time.perf_counter() - started
+
+    grouped: Dict[Tuple[int, int], List[Dict[str, object]]] = {}
+    for owner, chunk in zip(owners, chunks):
+        grouped.setdefault(owner, []).append(chunk)
+
+    results = []
+    for (candidate_index, bot_index), parts in sorted(grouped.items()):
+        merged = {key: np.concatenate([part[key] for part in parts]) for key in ('level', 'accuracy', 'max_combo', 'score', 'frames')}
+        results.append({
+            'config': candidates[candidate_index][0],
+            'settings': candidates[candidate_index][1],
+            'bot': bots[bot_index].describe(),
+            'games': int(merged['level'].size),
+            'unfinished': sum(part['unfinished'] for part in parts),
+            'level': summarize(merged['level']),
+            'level_histogram': histogram(merged['level']),
+            'accuracy': summarize(merged['accuracy']),
+            'max_combo': summarize(merged['max_combo']),
+            'max_combo_histogram': histogram(merged['max_combo']),
+            'score': summarize(merged['score']),
+            'duration_s': summarize(merged['frames'] / SIMULATION_FRAMERATE)
+        })
+
+    total_games = games * len(candidates) * len(bots)
+    return {
+        'games_per_pair': games,
+        'total_games': total_games,
+        'workers': workers,
+        'elapsed_s': elapsed,
+        'games_per_second': total_games / elapsed if elapsed > 0 else float('inf'),
+        'results': results
+    }
+
+
+def format_report(report: Dict[str, object]) -> str:
+    lines = [
+        f"{report['total_games']} games on {report['workers']} workers in {report['elapsed_s']:.1f}s "
+        f"({report['games_per_second']:.0f} games/s)",
+        ""
+    ]
+    header = f"{'config':<24} {'bot':<52} {'level p10/p50/p90':>18} {'acc mean':>9} {'combo p50/p90':>14} {'time p50':>9}"
+    lines.append(header)
+    lines.append("-" * len(header))
+    for result in report['results']:
+        level = result['level']
+        combo = result['max_combo']
+        lines.append(
+            f"{os.path.basename(result['config']):<24} {result['bot']:<52} "
+            f"{level['p10']:>5.0f}/{level['p50']:>4.0f}/{level['p90']:>4.0f}    "
+            f"{result['accuracy']['mean']:>8.1f}% "
+            f"{combo['p50']:>7.0f}/{combo['p90']:>4.0f}   "
+            f"{result['duration_s']['p50']:>8.1f}s"
+        )
+        if result['unfinished']:
+            lines.append(f"  warning: {result['unfinished']} games hit the {MAX_GAME_FRAMES}-frame cap")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare difficulty settings by running bot players headlessly.")
+    parser.add_argument("--config", action="append", help="Candidate config.json (repeatable, default: config.json)")
+    parser.add_argument("--games", type=int, default=10000, help="Games per candidate and bot (default: 10000)")
+    parser.add_argument("--bots", default="perfect,reaction,error", help="Comma separated bot presets or name:reaction_ms[:error_rate[:jitter_ms]]")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for reproducible sweeps")
+    parser.add_argument("--output", help="Write the full report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    candidates = [(path, load_candidate(path)) for path in (args.config or ["config.json"])]
+    bots = [parse_bot(spec.strip()) for spec in args.bots.split(',') if spec.strip()]
+    report = run_tournament(candidates, bots, args.games, args.workers, args.seed)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,375 @@
+"""Validation of config.json values.
+
+Kept free of pygame so headless tools (bot tournaments, batch simulations)
+can validate candidate configurations without opening a window.
+"""
+from quality import AUTO, QUALITY_LEVELS
+from recorder import RECORDING_FORMATS
+
+# Game rule defaults; level ups add the two *_step values to speed and trains
+DEFAULT_GAME_SETTINGS = {
+    'initial_train_speed': 5,
+    'initial_max_trains': 10,
+    'level_up_threshold': 5,
+    'max_trains_cap': 15,
+    'level_speed_step': 1,
+    'level_train_step': 2
+}
+
+# Game settings that count trains and must be whole numbers; the rest may be fractional
+GAME_COUNT_SETTINGS = ('initial_max_trains', 'max_trains_cap', 'level_train_step')
+
+
+# Accepted values of quality.preset; "auto" scales with measured frame times
+QUALITY_PRESET_NAMES = (AUTO,) + QUALITY_LEVELS
+
+
+# Configuration validation class: Validates configuration settings
+class ConfigValidator:
+    # Validates a color value
+    @staticmethod
+    def validate_color(color):
+        if not isinstance(color, list) or len(color) != 3:
+            return False
+        return all(isinstance(v, int) and 0 <= v <= 255 for v in color)
+
+    # Validates window settings
+    @staticmethod
+    def validate_window(config):
+        window = config.get('window', {})
+        defaults = {'width': 1280, 'height': 720, 'title': 'Train Color Matching Game',
+                    'render_scale': 1.0, 'smooth_upscale': True}
+        
+        width = window.get('width', defaults['width'])
+        height = window.get('height', defaults['height'])
+        title = window.get('title', defaults['title'])
+        render_scale = window.get('render_scale', defaults['render_scale'])
+        smooth_upscale = window.get('smooth_upscale', defaults['smooth_upscale'])
+
+        if not isinstance(width, int) or width < 800:
+            width = defaults['width']
+        if not isinstance(height, int) or height < 600:
+            height = defaults['height']
+        if not isinstance(title, str):
+            title = defaults['title']
+        # Render scale is the fraction of the window resolution the scene is drawn at
+        if not isinstance(render_scale, (int, float)) or isinstance(render_scale, bool) or not 0.25 <= render_scale <= 1.0:
+            render_scale = defaults['render_scale']
+        if not isinstance(smooth_upscale, bool):
+            smooth_upscale = defaults['smooth_upscale']
+
+        return {'width': width, 'height': height, 'title': title,
+                'render_scale': float(render_scale), 'smooth_upscale': smooth_upscale}
+
+    # Validates color settings
+    @staticmethod
+    def validate_colors(config):
+        colors = config.get('colors', {})
+        defaults = {
+            'white': [255, 255, 255],
+            'black': [0, 0, 0],
+            'red': [255, 0, 0],
+            'blue': [0, 0, 255],
+            'green': [0, 255, 0],
+            'gray': [128, 128, 128],
+            'yellow': [255, 255, 0]
+        }
+
+        validated = {}
+        for color_name, default_value in defaults.items():
+            color = colors.get(color_name, default_value)
+            if not ConfigValidator.validate_color(color):
+                color = default_value
+            validated[color_name] = color
+
+        return validated
+
+    # Validates game settings
+    @staticmethod
+    def validate_game_settings(config):
+        game = config.get('game', {})
+
+        validated = {}
+        for key, default_value in DEFAULT_GAME_SETTINGS.items():
+            value = game.get(key, default_value)
+            kinds = int if key in GAME_COUNT_SETTINGS else (int, float)
+            if not isinstance(value, kinds) or isinstance(value, bool) or value <= 0:
+                value = default_value
+            validated[key] = value
+
+        return validated
+
+    # Validates train settings
+    @staticmethod
+    def validate_train_settings(config):
+        train = config.get('train', {})
+        defaults = {
+            'width': 60,
+            'height': 30,
+            'wheel_radius': 5
+        }
+
+        validated = {}
+        for key, default_value in defaults.items():
+            value = train.get(key, default_value)
+            if not isinstance(value, (int, float)) or value <= 0:
+                value = default_value
+            validated[key] = value
+
+        return validated
+
+    # Validates parallax settings
+    @staticmethod
+    def validate_parallax(config):
+        parallax = config.get('parallax', {})
+        defaults = {
+            'cloud_speed': 10,
+            'tree_speed': 30,
+            'cloud_offset_y': 100,
+            'tree_offset_y': 200
+        }
+
+        validated = {}
+        for key, default_value in defaults.items():
+            value = parallax.get(key, default_value)
+            if not isinstance(value, (int, float)):
+                value = default_value
+            validated[key] = value
+
+        return validated
+
+    # Validates particle effect settings
+    @staticmethod
+    def validate_particles(config):
+        particles = config.get('particles', {})
+        defaults = {
+            'count': 20,
+            'explosion_count': 30,
+            'size_min': 4,
+            'size_max': 8,
+            'velocity_min': -30,
+            'velocity_max': 30,
+            'gravity': 15,
+            'smoke_emission_chance': 0.3,
+            'budget': 600
+        }
+
+        validated = {}
+        for key, default_value in defaults.items():
+            value = particles.get(key, default_value)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                value = default_value
+            elif key in ('count', 'explosion_count'):
+                if not isinstance(value, int) or not 0 <= value <= 500:
+                    value = default_value
+            elif key in ('size_min', 'size_max'):
+                if not isinstance(value, int) or value <= 0:
+                    value = default_value
+            elif key == 'smoke_emission_chance' and not 0 <= value <= 1:
+                value = default_value
+            elif key == 'budget':
+                if not isinstance(value, int) or not 1 <= value <= 5000:
+                    value = default_value
+            validated[key] = value
+
+        # Ranges must not be inverted
+        if validated['size_min'] > validated['size_max']:
+            validated['size_min'], validated['size_max'] = defaults['size_min'], defaults['size_max']
+        if validated['velocity_min'] > validated['velocity_max']:
+            validated['velocity_min'], validated['velocity_max'] = defaults['velocity_min'], defaults['velocity_max']
+
+        return validated
+
+    # Validates visual settings
+    @staticmethod
+    def validate_visual(config):
+        visual = config.get('visual', {})
+        defaults = {
+            'tree_count': 5,
+            'cloud_count': 3,
+            'star_count': 50,
+            'glow_max': 100,
+            'glow_min': 20,
+            'transition_speed': 500
+        }
+        # Stars are drawn from arrays, so thousands are affordable
+        limits = {'tree_count': 100, 'cloud_count': 100, 'star_count': 20000, 'glow_max': 255, 'glow_min': 255}
+
+        validated = {}
+        for key, default_value in defaults.items():
+            value = visual.get(key, default_value)
+            if key in limits:
+                if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value <= limits[key]:
+                    value = default_value
+            elif not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+                value = default_value
+            validated[key] = value
+
+        if validated['glow_min'] > validated['glow_max']:
+            validated['glow_min'], validated['glow_max'] = defaults['glow_min'], defaults['glow_max']
+
+        return validated
+
+    # Validates quality scaling settings
+    @staticmethod
+    def validate_quality(config):
+        quality = config.get('quality', {})
+        defaults = {'preset': AUTO, 'target_fps': 60}
+
+        preset = quality.get('preset', defaults['preset'])
+        target_fps = quality.get('target_fps', defaults['target_fps'])
+
+        if preset not in QUALITY_PRESET_NAMES:
+            preset = defaults['preset']
+        if not isinstance(target_fps, (int, float)) or isinstance(target_fps, bool) or not 10 <= target_fps <= 240:
+            target_fps = defaults['target_fps']
+
+        return {'preset': preset, 'target_fps': target_fps}
+
+    # Validates audio settings
+    @staticmethod
+    def validate_audio(config):
+        audio = config.get('audio', {})
+        defaults = {
+            'frequency': 44100,
+            'buffer_size': 256,
+            'ui_channels': 4,
+            'gameplay_channels': 8,
+            'music_channels': 1,
+            'voice_limit': 2
+        }
+
+        validated = {}
+        for key, default_value in defaults.items():
+            value = audio.get(key, default_value)
+            if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+                value = default_value
+            validated[key] = value
+
+        # The mixer buffer must be a power of two between 64 and 8192 samples
+        buffer_size = validated['buffer_size']
+        if buffer_size < 64 or buffer_size > 8192 or buffer_size & (buffer_size - 1):
+            validated['buffer_size'] = defaults['buffer_size']
+
+        voice_limits = audio.get('voice_limits', {})
+        if not isinstance(voice_limits, dict):
+            voice_limits = {}
+        validated['voice_limits'] = {
+            name: limit for name, limit in voice_limits.items()
+            if isinstance(name, str) and isinstance(limit, int) and not isinstance(limit, bool) and limit > 0
+        }
+
+        return validated
+
+    # Validates telemetry settings
+    @staticmethod
+    def validate_telemetry(config):
+        telemetry = config.get('telemetry', {})
+        defaults = {
+            'enabled': True,
+            'directory': 'telemetry',
+            'buffer_capacity': 4096,
+            'max_file_bytes': 1000000,
+            'backup_count': 5,
+            'frame_outlier_ms': 50
+        }
+
+        validated = {}
+        for key, default_value in defaults.items():
+            value = telemetry.get(key, default_value)
+            if isinstance(default_value, bool):
+                if not isinstance(value, bool):
+                    value = default_value
+            elif isinstance(default_value, str):
+                if not isinstance(value, str) or not value:
+                    value = default_value
+            elif key == 'backup_count':
+                if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+                    value = default_value
+            elif not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+                value = default_value
+            validated[key] = value
+
+        return validated
+
+    # Validates frame recording settings
+    @staticmethod
+    def validate_recording(config):
+        recording = config.get('recording', {})
+        defaults = {'directory': 'recordings', 'format': 'png', 'scale': 0.5, 'queue_size': 32, 'workers': 2}
+
+        validated = {}
+        for key, default_value in defaults.items():
+            value = recording.get(key, default_value)
+            if key == 'directory':
+                if not isinstance(value, str) or not value:
+                    value = default_value
+            elif key == 'format':
+                if value not in RECORDING_FORMATS:
+                    value = default_value
+            elif key == 'scale':
+                if not isinstance(value, (int, float)) or isinstance(value, bool) or not 0.1 <= value <= 1.0:
+                    value = default_value
+            elif not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= 256:
+                value = default_value
+            validated[key] = value
+
+        return validated
+
+    # Validates instant replay settings
+    @staticmethod
+    def validate_replay(config):
+        replay = config.get('replay', {})
+        defaults = {'enabled': True, 'directory': 'recordings', 'seconds': 10, 'scale': 0.25, 'max_megabytes': 64,
+                    'budget_ms': 1.0}
+
+        validated = {}
+        for key, default_value in defaults.items():
+            value = replay.get(key, default_value)
+            if key == 'enabled':
+                if not isinstance(value, bool):
+                    value = default_value
+            elif key == 'directory':
+                if not isinstance(value, str) or not value:
+                    value = default_value
+            elif key == 'scale':
+                if not isinstance(value, (int, float)) or isinstance(value, bool) or not 0.1 <= value <= 1.0:
+                    value = default_value
+            elif not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+                value = default_value
+            validated[key] = value
+
+        return validated
+
+    # Validates save and resume settings
+    @staticmethod
+    def validate_save(config):
+        save = config.get('save', {})
+        enabled = save.get('enabled', True)
+        path = save.get('path', 'savegame.bin')
+        return {
+            'enabled': enabled if isinstance(enabled, bool) else True,
+            'path': path if isinstance(path, str) and path else 'savegame.bin'
+        }
+
+    # Validates the entire configuration
+    @staticmethod
+    def validate_config(config):
+        if not isinstance(config, dict):
+            config = {}
+
+        return {
+            'window': ConfigValidator.validate_window(config),
+            'colors': ConfigValidator.validate_colors(config),
+            'game': ConfigValidator.validate_game_settings(config),
+            'train': ConfigValidator.validate_train_settings(config),
+            'parallax': ConfigValidator.validate_parallax(config),
+            'particles': ConfigValidator.validate_particles(config),
+            'visual': ConfigValidator.validate_visual(config),
+            'quality': ConfigValidator.validate_quality(config),
+            'audio': ConfigValidator.validate_audio(config),
+            'telemetry': ConfigValidator.validate_telemetry(config),
+            'recording': ConfigValidator.validate_recording(config),
+            'replay': ConfigValidator.validate_replay(config),
+            'save': ConfigValidator.validate_save(config)
+        }
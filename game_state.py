@@ -0,0 +1,329 @@
+"""Pygame-free rules model for Train Color Matcher.
+
+`GameState` owns everything that decides how a game plays out: the colors
+waiting on the track, where the departing trains are, score, combo,
+accuracy counters and level progression. It never touches a window or the
+mixer, so it can be stepped headlessly; `ModernGame` drives it and renders
+the result.
+
+`BatchGameState` applies the same rules to thousands of independent games
+at once using NumPy arrays and is meant for population simulations.
+"""
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Optional
+
+from config_validator import DEFAULT_GAME_SETTINGS
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only required for batch simulation
+    np = None
+
+
+# Number of selectable train colors (red, blue, green)
+COLOR_COUNT = 3
+
+# Default track geometry used when no layout has been applied
+DEFAULT_TRAIN_WIDTH = 60
+DEFAULT_TRACK_ORIGIN_X = 40
+DEFAULT_TRAIN_SPACING = 80
+DEFAULT_BOUNDS_WIDTH = 1280
+
+# Events reported by GameState.match/advance/step
+EVENT_CORRECT = "correct"
+EVENT_WRONG = "wrong"
+EVENT_NO_TRAINS = "no_trains"
+EVENT_LEVEL_UP = "level_up"
+EVENT_GAME_OVER = "game_over"
+
+# Per-game match outcomes reported by BatchGameState
+OUTCOME_NONE = 0
+OUTCOME_CORRECT = 1
+OUTCOME_WRONG = 2
+OUTCOME_NO_TRAINS = 3
+
+# Batch action value meaning "no click this frame"
+NO_ACTION = -1
+
+
+def resolve_game_settings(settings: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Merge *settings* over the defaults, keeping only the rule keys."""
+    resolved = dict(DEFAULT_GAME_SETTINGS)
+    if settings:
+        for key in DEFAULT_GAME_SETTINGS:
+            if key in settings:
+                resolved[key] = settings[key]
+    return resolved
+
+
+class GameState:
+    """Rules and counters of a single game, advanced one frame at a time.
+
+    Train colors are stored as indices into the selection row, so an action
+    is simply the index of the color the player picked.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, float]] = None, rng: Optional[random.Random] = None,
+                 train_width: int = DEFAULT_TRAIN_WIDTH, track_origin_x: int = DEFAULT_TRACK_ORIGIN_X,
+                 train_spacing: int = DEFAULT_TRAIN_SPACING, bounds_width: int = DEFAULT_BOUNDS_WIDTH):
+        settings = resolve_game_settings(settings)
+        self.level_up_threshold = settings['level_up_threshold']
+        self.base_train_speed = settings['initial_train_speed']
+        self.base_max_trains = settings['initial_max_trains']
+        self.max_trains_cap = settings['max_trains_cap']
+        self.level_speed_step = settings['level_speed_step']
+        self.level_train_step = settings['level_train_step']
+        self.rng = rng if rng is not None else random.Random()
+
+        self.train_width = train_width
+        self.track_origin_x = track_origin_x
+        self.train_spacing = train_spacing
+        self.bounds_width = bounds_width
+
+        self.track_generation = 0  # Bumped whenever a new set of track trains is dealt
+        self.reset()
+
+    # Starts a fresh game at level 1
+    def reset(self) -> None:
+        self.score = 0
+        self.level = 1
+        self.train_speed = self.base_train_speed
+        self.max_trains = self.base_max_trains
+        self.current_train_index = 0
+        self.all_trains_moving = False
+        self.combo_count = 0
+        self.max_combo = 0
+        self.correct_matches = 0
+        self.incorrect_matches = 0
+        self.game_over = False
+        self.frame = 0
+        self.initialize_trains()
+
+    # Deals a new track of randomly colored trains
+    def initialize_trains(self) -> None:
+        self.track_colors: List[int] = [self.rng.randrange(COLOR_COUNT) for _ in range(self.max_trains)]
+        self.track_x: List[float] = [self.slot_x(index) for index in range(self.max_trains)]
+        self.moving: List[bool] = [False] * self.max_trains
+        self.track_generation += 1
+
+    def slot_x(self, index: int) -> float:
+        return self.track_origin_x + index * self.train_spacing
+
+    # Applies new track geometry and snaps every track train back to its slot
+    def set_track_layout(self, track_origin_x: int, train_spacing: int, bounds_width: int) -> None:
+        self.track_origin_x = track_origin_x
+        self.train_spacing = train_spacing
+        self.bounds_width = bounds_width
+        self.track_x = [self.slot_x(index) for index in range(len(self.track_colors))]
+
+    @property
+    def remaining_trains(self) -> int:
+        return max(0, len(self.track_colors) - self.current_train_index)
+
+    @property
+    def total_attempts(self) -> int:
+        return self.correct_matches + self.incorrect_matches
+
+    @property
+    def current_color(self) -> Optional[int]:
+        if self.current_train_index < len(self.track_colors):
+            return self.track_colors[self.current_train_index]
+        return None
+
+    # Resolves a click on the selection train with the given color index
+    def match(self, color_index: int) -> str:
+        if self.current_train_index >= len(self.track_colors):
+            return EVENT_NO_TRAINS
+
+        if color_index != self.track_colors[self.current_train_index]:
+            self.combo_count = 0
+            self.incorrect_matches += 1
+            return EVENT_WRONG
+
+        self.moving[self.current_train_index] = True
+        self.score += 1
+        self.current_train_index += 1
+        self.combo_count += 1
+        self.correct_matches += 1
+        self.max_combo = max(self.max_combo, self.combo_count)
+        if self.current_train_index >= len(self.track_colors):
+            self.all_trains_moving = True
+        return EVENT_CORRECT
+
+    # Raises the difficulty and deals a longer track
+    def level_up(self) -> None:
+        self.level += 1
+        self.train_speed += self.level_speed_step
+        self.max_trains = min(self.max_trains + self.level_train_step, self.max_trains_cap)
+        self.initialize_trains()
+
+    # Advances the simulation by one frame
+    def advance(self) -> List[str]:
+        if self.game_over:
+            return []
+
+        self.frame += 1
+        events: List[str] = []
+        for index, moving in enumerate(self.moving):
+            if moving:
+                x = self.track_x[index] - self.train_speed
+                self.track_x[index] = x
+                if x + self.train_width < 0 or x > self.bounds_width:
+                    self.moving[index] = False
+
+        if self.all_trains_moving and not any(self.moving):
+            self.game_over = True
+            events.append(EVENT_GAME_OVER)
+
+        if self.score >= self.level * self.level_up_threshold:
+            self.level_up()
+            events.append(EVENT_LEVEL_UP)
+        return events
+
+    # Applies an optional match action, then advances one frame
+    def step(self, action: Optional[int] = None) -> List[str]:
+        events: List[str] = []
+        if action is not None and not self.game_over:
+            events.append(self.match(action))
+        events.extend(self.advance())
+        return events
+
+
+class BatchGameState:
+    """Vectorized `GameState` advancing many independent games in lockstep.
+
+    Every per-game counter is an array of length ``count``; track contents
+    are ``(count, slots)`` arrays where ``slots`` covers the longest track
+    any game can reach. Finished games stay frozen while the rest continue.
+    """
+
+    def __init__(self, count: int, settings: Optional[Dict[str, float]] = None, seed: Optional[int] = None,
+                 train_width: int = DEFAULT_TRAIN_WIDTH, track_origin_x: int = DEFAULT_TRACK_ORIGIN_X,
+                 train_spacing: int = DEFAULT_TRAIN_SPACING, bounds_width: int = DEFAULT_BOUNDS_WIDTH):
+        if np is None:
+            raise ImportError("NumPy is required for batch simulation")
+        if count <= 0:
+            raise ValueError("Batch size must be a positive integer")
+
+        settings = resolve_game_settings(settings)
+        self.count = count
+        self.level_up_threshold = settings['level_up_threshold']
+        self.base_train_speed = settings['initial_train_speed']
+        self.base_max_trains = int(settings['initial_max_trains'])
+        self.max_trains_cap = int(settings['max_trains_cap'])
+        self.level_speed_step = settings['level_speed_step']
+        self.level_train_step = int(settings['level_train_step'])
+        self.slots = max(self.base_max_trains, self.max_trains_cap)
+        self.rng = np.random.default_rng(seed)
+
+        self.train_width = train_width
+        self.bounds_width = bounds_width
+        self.slot_positions = track_origin_x + np.arange(self.slots, dtype=np.float64) * train_spacing
+        self.rows = np.arange(count)
+        self.reset()
+
+    def reset(self) -> None:
+        count = self.count
+        self.score = np.zeros(count, dtype=np.int64)
+        self.level = np.ones(count, dtype=np.int64)
+        self.train_speed = np.full(count, self.base_train_speed, dtype=np.float64)
+        self.max_trains = np.full(count, self.base_max_trains, dtype=np.int64)
+        self.current_train_index = np.zeros(count, dtype=np.int64)
+        self.all_trains_moving = np.zeros(count, dtype=bool)
+        self.combo_count = np.zeros(count, dtype=np.int64)
+        self.max_combo = np.zeros(count, dtype=np.int64)
+        self.correct_matches = np.zeros(count, dtype=np.int64)
+        self.incorrect_matches = np.zeros(count, dtype=np.int64)
+        self.game_over = np.zeros(count, dtype=bool)
+        self.frames = np.zeros(count, dtype=np.int64)
+        self.track_colors = np.zeros((count, self.slots), dtype=np.int8)
+        self.track_x = np.zeros((count, self.slots), dtype=np.float64)
+        self.moving = np.zeros((count, self.slots), dtype=bool)
+        self.track_length = np.zeros(count, dtype=np.int64)
+        self.initialize_trains(np.ones(count, dtype=bool))
+
+    # Deals new tracks for the games selected by *mask*
+    def initialize_trains(self, mask) -> None:
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return
+        self.track_colors[rows] = self.rng.integers(0, COLOR_COUNT, size=(rows.size, self.slots), dtype=np.int8)
+        self.track_x[rows] = self.slot_positions
+        self.moving[rows] = False
+        self.track_length[rows] = self.max_trains[rows]
+
+    @property
+    def active(self):
+        return ~self.game_over
+
+    @property
+    def current_color(self):
+        """Color index of each game's next train, or -1 when none is left."""
+        has_train = self.current_train_index < self.track_length
+        slot = np.minimum(self.current_train_index, self.slots - 1)
+        colors = self.track_colors[self.rows, slot].astype(np.int64)
+        return np.where(has_train, colors, NO_ACTION)
+
+    # Resolves one optional click per game; NO_ACTION entries are skipped
+    def match(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+        outcomes = np.full(self.count, OUTCOME_NONE, dtype=np.int8)
+        acted = (actions != NO_ACTION) & self.active
+        has_train = self.current_train_index < self.track_length
+        current = self.current_color
+
+        hit = acted & has_train & (actions == current)
+        miss = acted & has_train & ~hit
+        outcomes[acted & ~has_train] = OUTCOME_NO_TRAINS
+        outcomes[miss] = OUTCOME_WRONG
+        outcomes[hit] = OUTCOME_CORRECT
+
+        hit_rows = np.flatnonzero(hit)
+        self.moving[hit_rows, self.current_train_index[hit_rows]] = True
+        self.score += hit
+        self.current_train_index += hit
+        self.combo_count = np.where(miss, 0, self.combo_count + hit)
+        self.correct_matches += hit
+        self.incorrect_matches += miss
+        np.maximum(self.max_combo, self.combo_count, out=self.max_combo)
+        self.all_trains_moving |= hit & (self.current_train_index >= self.track_length)
+        return outcomes
+
+    # Advances every unfinished game by one frame; returns (leveled, finished) masks
+    def advance(self):
+        active = self.active
+        self.frames += active
+
+        moving = self.moving & active[:, None]
+        self.track_x -= np.where(moving, self.train_speed[:, None], 0.0)
+        out_of_bounds = (self.track_x + self.train_width < 0) | (self.track_x > self.bounds_width)
+        self.moving &= ~(moving & out_of_bounds)
+
+        finished = active & self.all_trains_moving & ~self.moving.any(axis=1)
+        self.game_over |= finished
+
+        leveled = active & (self.score >= self.level * self.level_up_threshold)
+        if leveled.any():
+            self.level += leveled
+            self.train_speed += leveled * self.level_speed_step
+            grown = np.minimum(self.max_trains + self.level_train_step, self.max_trains_cap)
+            self.max_trains = np.where(leveled, grown, self.max_trains)
+            self.initialize_trains(leveled)
+        return leveled, finished
+
+    # Applies one action per game, then advances every game one frame
+    def step(self, actions=None):
+        if actions is None:
+            outcomes = np.full(self.count, OUTCOME_NONE, dtype=np.int8)
+        else:
+            outcomes = self.match(actions)
+        self.advance()
+        return outcomes
+
+    @property
+    def accuracy(self):
+        """Hit accuracy percentage of every game (0 when nothing was attempted)."""
+        total = self.correct_matches + self.incorrect_matches
+        return np.where(total > 0, self.correct_matches * 100.0 / np.maximum(total, 1), 0.0)
@@ -0,0 +1,209 @@
+"""Golden-frame render regression harness.
+
+Renders a fixed set of canonical frames with SDL's dummy video driver and a
+fixed seed, then compares them with the PNGs stored in ``tests/golden``:
+
+    python golden_frames.py            # compare, writing heat maps of any differences
+    python golden_frames.py --update   # re-record the golden PNGs after an intended change
+
+The menu, play in every theme, game over and a heavy combo are rendered into
+off-screen surfaces. Game time is driven by a frozen tick clock, so
+animations land on the same phase on every run.
+Comparison is vectorized with NumPy over batches of frames: a pixel
+differs when any channel is further than the tolerance from the golden
+value. A heat map of each failing frame (the golden frame dimmed to grey,
+differences in red by size) is written next to the report.
+
+The comparison functions do not import pygame, so they can be unit tested
+on plain arrays.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_DIR = os.path.join(PROJECT_DIR, "tests", "golden")
+DIFF_DIR = os.path.join(PROJECT_DIR, "golden_diffs")
+GOLDEN_SIZE = (800, 600)  # The minimum window size keeps the PNGs small
+DEFAULT_SEED = 7
+DEFAULT_TOLERANCE = 8  # Largest per-channel difference still counted as equal
+BATCH_FRAMES = 32  # Frames compared per vectorized batch, bounding temporary memory
+FRAME_MS = 16  # Tick clock step per rendered frame
+
+CANONICAL_FRAMES = ('menu', 'playing_light', 'playing_dark', 'playing_glass', 'game_over', 'heavy_combo')
+
+
+class FrameDiff(NamedTuple):
+    name: str
+    mismatched: int  # Pixels with a channel outside the tolerance
+    max_delta: int  # Largest channel difference anywhere in the frame
+
+    @property
+    def passed(self) -> bool:
+        return self.mismatched == 0
+
+
+def compare_batch(actual: np.ndarray, expected: np.ndarray, tolerance: int = DEFAULT_TOLERANCE) -> Tuple[np.ndarray, np.ndarray]:
+    """Compare stacks of ``(frames, width, height, 3)`` arrays.
+
+    Returns the mismatched pixel count and the largest channel difference of
+    every frame.
+    """
+    if actual.shape != expected.shape:
+        raise ValueError(f"Frame shapes differ: {actual.shape} != {expected.shape}")
+    delta = np.abs(actual.astype(np.int16) - expected.astype(np.int16)).max(axis=-1)
+    mismatched = np.count_nonzero(delta > tolerance, axis=(1, 2))
+    return mismatched, delta.max(axis=(1, 2))
+
+
+def compare_frames(names: Iterable[str], actual: Iterable[np.ndarray], expected: Iterable[np.ndarray],
+                   tolerance: int = DEFAULT_TOLERANCE) -> List[FrameDiff]:
+    """Compare frames pairwise, stacking same-sized frames into batches."""
+    names, actual, expected = list(names), list(actual), list(expected)
+    results: List[Optional[FrameDiff]] = [None] * len(names)
+    by_shape: Dict[tuple, List[int]] = {}
+    for index, (frame, golden) in enumerate(zip(actual, expected)):
+        if frame.shape != golden.shape:
+            raise ValueError(f"{names[index]}: frame shape {frame.shape} != golden shape {golden.shape}")
+        by_shape.setdefault(frame.shape, []).append(index)
+    for indices in by_shape.values():
+        for start in range(0, len(indices), BATCH_FRAMES):
+            batch = indices[start:start + BATCH_FRAMES]
+            mismatched, max_delta = compare_batch(np.stack([actual[i] for i in batch]),
+                                                  np.stack([expected[i] for i in batch]), tolerance)
+            for offset, index in enumerate(batch):
+                results[index] = FrameDiff(names[index], int(mismatched[offset]), int(max_delta[offset]))
+    return results
+
+
+def diff_heatmap(actual: np.ndarray, expected: np.ndarray, tolerance: int = DEFAULT_TOLERANCE) -> np.ndarray:
+    """Golden frame dimmed to grey with out-of-tolerance pixels in red, brighter for larger differences."""
+    delta = np.abs(actual.astype(np.int16) - expected.astype(np.int16)).max(axis=-1)
+    grey = (expected.mean(axis=-1) / 3).astype(np.uint8)
+    heatmap = np.repeat(grey[..., None], 3, axis=-1)
+    over = delta > tolerance
+    heatmap[over] = 0
+    heatmap[..., 0][over] = np.clip(96 + delta[over], 0, 255).astype(np.uint8)
+    return heatmap
+
+
+def render_canonical_frames(seed: int = DEFAULT_SEED, size: Tuple[int, int] = GOLDEN_SIZE) -> Dict[str, np.ndarray]:
+    """Render every canonical frame and return them as ``(width, height, 3)`` arrays."""
+    from headless import frozen_ticks, load_game_module
+
+    module = load_game_module()
+    pygame = module.pygame
+    frames: Dict[str, np.ndarray] = {}
+    with frozen_ticks(pygame) as ticks:
+        random.seed(seed)
+        game = module.ModernGame()
+        game.background_builder.close()
+        game.background_builder = module.BackgroundBuilder(threaded=False)  # Scenes ready before the first draw
+        game.scene_key = None
+        module.set_window_mode(size)
+        screen = pygame.Surface(size)
+
+        def advance(count: int) -> None:
+            for _ in range(count):
+                ticks[0] += FRAME_MS
+                game.update(FRAME_MS / 1000.0)
+                game.draw(screen)
+                game.scheduler.run_all()
+
+        def capture(name: str) -> None:
+            frames[name] = pygame.surfarray.array3d(screen)
+
+        def match(count: int) -> None:
+            for _ in range(count):
+                game.selected_train_index = game.game_state.current_color
+                game.match_train()
+                advance(3)
+
+        try:
+            game.handle_resize(*size)
+            advance(2)
+            capture('menu')
+
+            for index, theme in enumerate(game.themes):
+                game.apply_theme(index)
+                game.state = module.PLAYING
+                game.reset_game()
+                match(2)
+                advance(10)
+                capture(f"playing_{theme['name'].lower()}")
+
+            game.apply_theme(0)
+            game.reset_game()
+            match(3)
+            game.state = module.GAME_OVER
+            advance(2)
+            capture('game_over')
+
+            game.state = module.PLAYING
+            game.reset_game()
+            match(8)
+            capture('heavy_combo')
+        finally:
+            game.shutdown()
+    return frames
+
+
+def golden_path(name: str, directory: str = GOLDEN_DIR) -> str:
+    return os.path.join(directory, f"{name}.png")
+
+
+def save_array(pygame, array: np.ndarray, path: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    pygame.image.save(pygame.surfarray.make_surface(array), path)
+
+
+def load_array(pygame, path: str) -> np.ndarray:
+    return pygame.surfarray.array3d(pygame.image.load(path))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare canonical frames against the golden PNGs")
+    parser.add_argument("--update", action="store_true", help="Re-record the golden PNGs")
+    parser.add_argument("--tolerance", type=int, default=DEFAULT_TOLERANCE, help="Allowed per-channel difference")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed for the rendered session")
+    parser.add_argument("--golden-dir", default=GOLDEN_DIR, help="Directory holding the golden PNGs")
+    parser.add_argument("--diff-dir", default=DIFF_DIR, help="Where heat maps of failing frames are written")
+    args = parser.parse_args(argv)
+
+    frames = render_canonical_frames(args.seed)
+    pygame = sys.modules["pygame"]
+    if args.update:
+        for name, array in frames.items():
+            save_array(pygame, array, golden_path(name, args.golden_dir))
+        print(f"Recorded {len(frames)} golden frames in {args.golden_dir}")
+        return 0
+
+    missing = [name for name in frames if not os.path.exists(golden_path(name, args.golden_dir))]
+    if missing:
+        print(f"Missing golden frames: {', '.join(missing)} (run with --update to record them)")
+        return 1
+    names = list(frames)
+    goldens = [load_array(pygame, golden_path(name, args.golden_dir)) for name in names]
+    results = compare_frames(names, [frames[name] for name in names], goldens, args.tolerance)
+    for result, golden in zip(results, goldens):
+        status = "ok" if result.passed else "DIFFERS"
+        print(f"  {result.name:<24}{status:>8}  {result.mismatched:>8} px  max delta {result.max_delta}")
+        if not result.passed:
+            heatmap = diff_heatmap(frames[result.name], golden, args.tolerance)
+            save_array(pygame, heatmap, os.path.join(args.diff_dir, f"{result.name}_diff.png"))
+    failed = [result.name for result in results if not result.passed]
+    if failed:
+        print(f"{len(failed)} of {len(results)} frames differ; heat maps in {args.diff_dir}")
+        return 1
+    print(f"All {len(results)} frames match within {args.tolerance}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Helpers for driving the game without a real display or audio device.
+
+The game script has a hyphenated file name and opens its window at import
+time, so tools load it through `load_game_module`, which selects SDL's
+dummy drivers first.
+"""
+from __future__ import annotations
+
+import contextlib
+import importlib.util
+import os
+import sys
+from types import ModuleType
+from typing import Iterator, List
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+GAME_SCRIPT = os.path.join(PROJECT_DIR, "Train-Color-Matcher.py")
+MODULE_NAME = "train_color_matcher"
+
+
+def load_game_module(persist: bool = False) -> ModuleType:
+    """Import the game script headlessly and return the module.
+
+    Unless *persist* is set, scores go to a throwaway in-memory database and
+    telemetry and saved games are switched off so tool runs never touch the
+    player's data. Instant replay is always off, so its capture cost stays
+    out of measurements unless a tool opts in.
+    """
+    if MODULE_NAME in sys.modules:
+        return sys.modules[MODULE_NAME]
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    if PROJECT_DIR not in sys.path:
+        sys.path.insert(0, PROJECT_DIR)
+
+    spec = importlib.util.spec_from_file_location(MODULE_NAME, GAME_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[MODULE_NAME] = module
+    spec.loader.exec_module(module)
+
+    if not persist:
+        module.SCORES_DB_PATH = ":memory:"
+        module.CONFIG['telemetry']['enabled'] = False
+        module.CONFIG['save']['enabled'] = False
+    module.CONFIG['replay']['enabled'] = False
+    return module
+
+
+@contextlib.contextmanager
+def frozen_ticks(pygame) -> Iterator[List[int]]:
+    """Replace ``pygame.time.get_ticks`` with a clock that only moves when told to."""
+    ticks = [0]
+    original = pygame.time.get_ticks
+    pygame.time.get_ticks = lambda: ticks[0]
+    try:
+        yield ticks
+    finally:
+        pygame.time.get_ticks = original
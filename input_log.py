@@ -0,0 +1,318 @@
+"""Compact append-only log of player input, for replays and session logs.
+
+A log starts with a small header and is followed by a stream of typed
+records:
+
+    header      magic "TCMINPUT", version, checkpoint interval, game size
+    record      kind (1 byte), frame delta (varint), payload (varints; RESUME adds raw bytes)
+
+Frame numbers are stored as the distance from the previous record, and
+every number is a LEB128 varint, so a click costs about six bytes. Records
+cover what the game was asked to do: clicks (in game coordinates), key
+presses, resizes and wheel scrolls. They also cover what came of it: every
+dealt track (DEAL) and every match attempt (MATCH). A replay feeds the
+logged deals back to `GameState` in place of its random number generator.
+The game therefore plays out exactly as recorded, even though particle
+effects draw from the same generator as the track. Resuming a saved game
+logs the whole save (RESUME), so a replay needs nothing but the log.
+
+Every ``checkpoint_interval`` frames a CHECKPOINT record stores the
+absolute frame number, so a reader can resume decoding there. `close`
+appends an END record, an INDEX record listing every checkpoint's frame and
+file offset, and a fixed trailer pointing at the index.
+`InputLogReader.records(start_frame)` uses the index to jump to the nearest
+checkpoint and streams from there in small chunks, so it never loads the
+whole file. A log that was cut off by a crash has no trailer. The reader
+then finds the checkpoints with one streaming pass and stops cleanly at the
+torn record.
+
+The module does not import pygame.
+"""
+from __future__ import annotations
+
+import bisect
+import os
+import struct
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+LOG_MAGIC = b"TCMINPUT"
+LOG_VERSION = 1
+HEADER = struct.Struct("<8sHIHH")  # magic, version, checkpoint interval, game width, game height
+TRAILER = struct.Struct("<QQ4s")  # index offset, end frame, trailer magic
+TRAILER_MAGIC = b"TIDX"
+DEFAULT_CHECKPOINT_INTERVAL = 600  # Frames; ten seconds at 60 fps
+READ_CHUNK = 64 * 1024
+
+# Record kinds
+RECORD_CLICK = 1  # x, y
+RECORD_KEY = 2  # key code
+RECORD_RESIZE = 3  # width, height
+RECORD_WHEEL = 4  # signed amount
+RECORD_MATCH = 5  # outcome, selected color index
+RECORD_DEAL = 6  # color index of every track train
+RECORD_CHECKPOINT = 7  # absolute frame; not returned by readers
+RECORD_END = 8  # last frame of the session
+RECORD_INDEX = 9  # checkpoint table; not returned by readers
+RECORD_RESUME = 10  # encoded `save_state.GameSnapshot` the session resumed
+
+# MATCH outcomes
+MATCH_CORRECT = 0
+MATCH_WRONG = 1
+
+_PAYLOAD_SIZES = {RECORD_CLICK: 2, RECORD_KEY: 1, RECORD_RESIZE: 2, RECORD_WHEEL: 1, RECORD_MATCH: 2, RECORD_END: 0}
+
+
+class InputRecord(NamedTuple):
+    frame: int
+    kind: int
+    values: tuple  # Integers; a RESUME record holds the save's bytes
+
+
+def encode_varint(value: int) -> bytes:
+    if value < 0:
+        raise ValueError(f"Varints are unsigned, got {value}")
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+class SessionWatcher:
+    """Notices the deals and match attempts a `GameState` made since the last call."""
+
+    def __init__(self, state):
+        self.state = state
+        self.generation = None  # Reported as a new deal on the first call
+        self.correct = state.correct_matches
+        self.incorrect = state.incorrect_matches
+
+    def sync(self) -> None:
+        """Take the state as it is now, such as a restored save, without reporting it."""
+        self.generation = self.state.track_generation
+        self.correct, self.incorrect = self.state.correct_matches, self.state.incorrect_matches
+
+    def new_deal(self) -> Optional[List[int]]:
+        """Colors of the track dealt since the last call, if there was one."""
+        if self.state.track_generation == self.generation:
+            return None
+        self.generation = self.state.track_generation
+        return list(self.state.track_colors)
+
+    def new_match(self) -> Optional[int]:
+        """MATCH_CORRECT or MATCH_WRONG for an attempt since the last call; a reset is not an attempt."""
+        state = self.state
+        outcome = None
+        if state.correct_matches > self.correct:
+            outcome = MATCH_CORRECT
+        elif state.incorrect_matches > self.incorrect:
+            outcome = MATCH_WRONG
+        self.correct, self.incorrect = state.correct_matches, state.incorrect_matches
+        return outcome
+
+
+class InputLogWriter:
+    """Appends records to a new input log."""
+
+    def __init__(self, path: str, size: Tuple[int, int], checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        self.handle: Optional[BinaryIO] = open(path, "wb")
+        self.handle.write(HEADER.pack(LOG_MAGIC, LOG_VERSION, checkpoint_interval, *size))
+        self.frame = 0  # Frame of the last record
+        self.checkpoints: List[Tuple[int, int]] = []  # (frame, file offset)
+        self.records = 0
+
+    def _write(self, frame: int, kind: int, values: Sequence[int], data: bytes = b"") -> None:
+        if frame < self.frame:
+            raise ValueError(f"Frame {frame} is before the last record's frame {self.frame}")
+        if not self.checkpoints or frame - self.checkpoints[-1][0] >= self.checkpoint_interval:
+            self.handle.flush()  # A crash loses at most one checkpoint interval
+            self.checkpoints.append((frame, self.handle.tell()))
+            self.handle.write(bytes((RECORD_CHECKPOINT,)) + encode_varint(frame))
+            self.frame = frame
+        self.handle.write(bytes((kind,)) + encode_varint(frame - self.frame) + b"".join(map(encode_varint, values))
+                          + data)
+        self.frame = frame
+        self.records += 1
+
+    def click(self, frame: int, x: int, y: int) -> None:
+        self._write(frame, RECORD_CLICK, (x, y))
+
+    def key(self, frame: int, key: int) -> None:
+        self._write(frame, RECORD_KEY, (key,))
+
+    def resize(self, frame: int, width: int, height: int) -> None:
+        self._write(frame, RECORD_RESIZE, (width, height))
+
+    def wheel(self, frame: int, amount: int) -> None:
+        self._write(frame, RECORD_WHEEL, (zigzag(amount),))
+
+    def match(self, frame: int, outcome: int, color_index: int) -> None:
+        self._write(frame, RECORD_MATCH, (outcome, color_index))
+
+    def deal(self, frame: int, colors: Sequence[int]) -> None:
+        self._write(frame, RECORD_DEAL, (len(colors),) + tuple(colors))
+
+    def resume(self, frame: int, save: bytes) -> None:
+        self._write(frame, RECORD_RESUME, (len(save),), save)
+
+    def close(self, frame: int) -> None:
+        """Mark *frame* as the end of the session and write the checkpoint index."""
+        if self.handle is None:
+            return
+        self._write(max(frame, self.frame), RECORD_END, ())
+        index_offset = self.handle.tell()
+        table = bytearray((RECORD_INDEX,)) + encode_varint(len(self.checkpoints))
+        previous_frame = previous_offset = 0
+        for checkpoint_frame, offset in self.checkpoints:
+            table += encode_varint(checkpoint_frame - previous_frame) + encode_varint(offset - previous_offset)
+            previous_frame, previous_offset = checkpoint_frame, offset
+        self.handle.write(bytes(table) + TRAILER.pack(index_offset, self.frame, TRAILER_MAGIC))
+        self.handle.close()
+        self.handle = None
+
+
+class _ByteStream:
+    """Reads bytes and varints from a file in fixed-size chunks."""
+
+    def __init__(self, handle: BinaryIO, offset: int):
+        handle.seek(offset)
+        self.handle = handle
+        self.buffer = b""
+        self.pos = 0
+
+    def byte(self) -> int:
+        if self.pos >= len(self.buffer):
+            self.buffer = self.handle.read(READ_CHUNK)
+            self.pos = 0
+            if not self.buffer:
+                raise EOFError
+        value = self.buffer[self.pos]
+        self.pos += 1
+        return value
+
+    def read(self, size: int) -> bytes:
+        chunks = []
+        while size:
+            if self.pos >= len(self.buffer):
+                self.buffer = self.handle.read(READ_CHUNK)
+                self.pos = 0
+                if not self.buffer:
+                    raise EOFError
+            chunk = self.buffer[self.pos:self.pos + size]
+            self.pos += len(chunk)
+            size -= len(chunk)
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def varint(self) -> int:
+        result = shift = 0
+        while True:
+            value = self.byte()
+            result |= (value & 0x7F) << shift
+            if value < 0x80:
+                return result
+            shift += 7
+
+
+class InputLogReader:
+    """Streams records from an input log, starting at any frame."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as handle:
+            header = handle.read(HEADER.size)
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is not an input log")
+            magic, version, self.checkpoint_interval, width, height = HEADER.unpack(header)
+            if magic != LOG_MAGIC:
+                raise ValueError(f"{path} is not an input log")
+            if version != LOG_VERSION:
+                raise ValueError(f"{path} is input log version {version}; version {LOG_VERSION} is supported")
+            self.size = (width, height)
+            self.complete = self._read_index(handle)
+        if not self.complete:
+            self._scan()
+
+    def _read_index(self, handle: BinaryIO) -> bool:
+        end = handle.seek(0, os.SEEK_END)
+        if end < HEADER.size + TRAILER.size:
+            return False
+        handle.seek(end - TRAILER.size)
+        index_offset, self.end_frame, magic = TRAILER.unpack(handle.read(TRAILER.size))
+        if magic != TRAILER_MAGIC or not HEADER.size <= index_offset < end - TRAILER.size:
+            return False
+        stream = _ByteStream(handle, index_offset)
+        if stream.byte() != RECORD_INDEX:
+            return False
+        self.checkpoints: List[Tuple[int, int]] = []
+        frame = offset = 0
+        for _ in range(stream.varint()):
+            frame += stream.varint()
+            offset += stream.varint()
+            self.checkpoints.append((frame, offset))
+        return True
+
+    def _scan(self) -> None:
+        """Rebuild the checkpoint table of a log without a trailer."""
+        self.checkpoints = []
+        self.end_frame = 0
+        for record in self._stream(HEADER.size, 0, self.checkpoints):
+            self.end_frame = record.frame
+
+    def _stream(self, offset: int, frame: int, checkpoints: Optional[list] = None) -> Iterator[InputRecord]:
+        with open(self.path, "rb") as handle:
+            stream = _ByteStream(handle, offset)
+            while True:
+                start = handle.tell() - len(stream.buffer) + stream.pos  # File offset of this record
+                try:
+                    kind = stream.byte()
+                    if kind == RECORD_CHECKPOINT:
+                        frame = stream.varint()
+                        if checkpoints is not None:
+                            checkpoints.append((frame, start))
+                        continue
+                    if kind == RECORD_INDEX:
+                        return
+                    frame += stream.varint()
+                    if kind == RECORD_DEAL:
+                        values = tuple(stream.varint() for _ in range(stream.varint()))
+                    elif kind == RECORD_RESUME:
+                        values = (stream.read(stream.varint()),)
+                    elif kind in _PAYLOAD_SIZES:
+                        values = tuple(stream.varint() for _ in range(_PAYLOAD_SIZES[kind]))
+                        if kind == RECORD_WHEEL:
+                            values = (unzigzag(values[0]),)
+                    else:
+                        raise ValueError(f"{self.path}: unknown record kind {kind}")
+                except EOFError:
+                    return  # The log was cut off mid-record
+                yield InputRecord(frame, kind, values)
+                if kind == RECORD_END:
+                    return
+
+    def records(self, start_frame: int = 0) -> Iterator[InputRecord]:
+        """Yield every record at or after *start_frame*, seeking to the nearest checkpoint first."""
+        offset, frame = HEADER.size, 0
+        position = bisect.bisect_right(self.checkpoints, (start_frame, float('inf'))) - 1
+        if position >= 0:
+            frame, offset = self.checkpoints[position]
+        for record in self._stream(offset, frame):
+            if record.frame >= start_frame:
+                yield record
+
+    def __iter__(self) -> Iterator[InputRecord]:
+        return self.records()
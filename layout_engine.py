@@ -0,0 +1,278 @@
+"""Declarative, memoized screen layout.
+
+Every box and number on screen (HUD, instruction panel, menu panel,
+buttons, track and selection rows) is declared once as a rule over the
+layout inputs and other rules. `LayoutEngine.compute` evaluates the rules in
+dependency order and re-evaluates only the rules whose inputs changed since
+the previous call; complete layouts are also memoized by their inputs, so
+going back to a window size seen before costs a dictionary lookup.
+
+The module does not import pygame. Boxes are plain ``(x, y, width, height)``
+tuples that ``pygame.Rect`` accepts directly, so layouts can be unit tested
+without a display.
+"""
+from __future__ import annotations
+
+import collections
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+LAYOUT_CACHE_SIZE = 16  # Complete layouts memoized by their inputs
+_MISSING = object()
+
+
+class Box(NamedTuple):
+    x: int
+    y: int
+    width: int
+    height: int
+
+    @property
+    def right(self) -> int:
+        return self.x + self.width
+
+    @property
+    def bottom(self) -> int:
+        return self.y + self.height
+
+    @property
+    def centerx(self) -> int:
+        return self.x + self.width // 2
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+
+class LayoutEngine:
+    """Evaluates named layout rules, recomputing only what changed."""
+
+    def __init__(self, cache_size: int = LAYOUT_CACHE_SIZE):
+        self.rules: Dict[str, Tuple[Tuple[str, ...], Callable[..., object]]] = {}
+        self.cache_size = cache_size
+        self.evaluations = 0  # Rule evaluations so far
+        self._order: Optional[List[str]] = None
+        self._values: Dict[str, object] = {}
+        self._memo: "collections.OrderedDict[tuple, Dict[str, object]]" = collections.OrderedDict()
+
+    def rule(self, name: str, *dependencies: str):
+        """Decorator declaring *name* as a function of *dependencies*."""
+        def register(function):
+            self.rules[name] = (dependencies, function)
+            self._order = None
+            self._values = {}
+            self._memo.clear()
+            return function
+        return register
+
+    def _evaluation_order(self) -> List[str]:
+        if self._order is None:
+            order: List[str] = []
+            state: Dict[str, str] = {}
+
+            def visit(name: str) -> None:
+                if state.get(name) == "done" or name not in self.rules:
+                    return
+                if state.get(name) == "visiting":
+                    raise ValueError(f"Layout rule {name} depends on itself")
+                state[name] = "visiting"
+                for dependency in self.rules[name][0]:
+                    visit(dependency)
+                state[name] = "done"
+                order.append(name)
+
+            for name in self.rules:
+                visit(name)
+            self._order = order
+        return self._order
+
+    def compute(self, **inputs: object) -> Dict[str, object]:
+        """Return every layout value for *inputs*, which must be hashable."""
+        key = tuple(sorted(inputs.items()))
+        layout = self._memo.get(key)
+        if layout is not None:
+            self._memo.move_to_end(key)
+            self._values = layout
+            return dict(layout)
+
+        values = dict(self._values)
+        changed = {name for name, value in inputs.items() if values.get(name, _MISSING) != value}
+        values.update(inputs)
+        for name in self._evaluation_order():
+            dependencies, function = self.rules[name]
+            missing = [dependency for dependency in dependencies if dependency not in values]
+            if missing:
+                raise KeyError(f"Layout rule {name} needs {', '.join(missing)}")
+            if name in values and changed.isdisjoint(dependencies):
+                continue  # Nothing this rule reads has changed
+            value = function(*(values[dependency] for dependency in dependencies))
+            self.evaluations += 1
+            if values.get(name, _MISSING) != value:
+                changed.add(name)
+            values[name] = value
+
+        self._values = values
+        self._memo[key] = values
+        if len(self._memo) > self.cache_size:
+            self._memo.popitem(last=False)
+        return dict(values)
+
+
+# Fixed geometry of the game screen
+UI_PADDING = 20
+MUTE_BUTTON_SIZE = 50
+THEME_BUTTON_SIZE = (120, 44)
+MENU_BUTTON_HEIGHT = 60
+HUD_TEXT_PADDING = 8
+HUD_COLUMN_GAP = 24
+TIMELINE_MIN_WIDTH = 180
+
+
+def game_layout(train_width: int, color_count: int, padding: int = UI_PADDING,
+                mute_button_size: int = MUTE_BUTTON_SIZE) -> LayoutEngine:
+    """Declare the game screen.
+
+    Inputs: ``width`` and ``height`` (already clamped to the minimum window
+    size), ``max_trains``, ``hud_text_width`` (widest HUD heading or stats
+    line in pixels) and ``line_heights`` (HUD heading and stats line sizes).
+    """
+    engine = LayoutEngine()
+    rule = engine.rule
+    spacing_min = train_width + 40
+
+    # Track and selection rows
+    @rule('train_spacing', 'width', 'max_trains')
+    def train_spacing(width, max_trains):
+        available_track_width = max(width - padding * 4, spacing_min)
+        return max(spacing_min, available_track_width // max(1, max_trains))
+
+    @rule('track_origin_x')
+    def track_origin_x():
+        return padding * 2
+
+    @rule('track_y', 'height')
+    def track_y(height):
+        return int(height * 0.35)
+
+    @rule('selection_y', 'height')
+    def selection_y(height):
+        return int(height * 0.72)
+
+    @rule('selection_spacing', 'width')
+    def selection_spacing(width):
+        return max(spacing_min, int(width * 0.18))
+
+    @rule('selection_origin_x', 'width', 'selection_spacing')
+    def selection_origin_x(width, selection_spacing):
+        total_selection_span = selection_spacing * (color_count - 1)
+        return int(width // 2 - total_selection_span / 2 - train_width / 2)
+
+    # HUD and the buttons beside it
+    @rule('hud_rect', 'width', 'height')
+    def hud_rect(width, height):
+        hud_width = max(400, int(width * 0.32))
+        hud_height = max(240, int(height * 0.4))
+        return Box(width - hud_width - padding, padding, hud_width, min(hud_height, height - padding * 2 - 120))
+
+    @rule('theme_button', 'hud_rect')
+    def theme_button(hud):
+        button_width, button_height = THEME_BUTTON_SIZE
+        button_offset = 16
+        return Box(max(padding, hud.x - button_width - button_offset), hud.y + button_offset, button_width, button_height)
+
+    @rule('mute_button', 'theme_button')
+    def mute_button(theme):
+        return Box(theme.x + (theme.width - mute_button_size) // 2, theme.bottom + 10, mute_button_size, mute_button_size)
+
+    @rule('hud_columns', 'hud_rect', 'hud_text_width', 'line_heights')
+    def hud_columns(hud, hud_text_width, line_heights):
+        """Stats beside the timeline when both fit, otherwise the timeline below the stats."""
+        heading_height, stats_line_height = line_heights
+        text_column_width = hud_text_width + HUD_TEXT_PADDING
+        available_width = hud.width - 40
+        heading_y = hud.y + 16
+        if available_width >= TIMELINE_MIN_WIDTH + HUD_COLUMN_GAP + text_column_width:
+            timeline_width = max(TIMELINE_MIN_WIDTH, available_width - HUD_COLUMN_GAP - text_column_width)
+            timeline_height = max(120, hud.height - 32)
+            text_right = hud.x + 20 + text_column_width
+            right_limit = hud.right - 20
+            timeline_left = max(text_right + HUD_COLUMN_GAP, right_limit - timeline_width)
+            timeline_width = max(TIMELINE_MIN_WIDTH, right_limit - timeline_left)
+            if heading_y + timeline_height > hud.bottom - 16:
+                timeline_height = max(96, hud.bottom - 16 - heading_y)
+            return True, Box(timeline_left, heading_y, timeline_width, timeline_height)
+
+        inner_padding = 16
+        stats_lines = 6  # Score, high score, remaining, level, accuracy, combo
+        timeline_top = heading_y + heading_height + 16 + stats_lines * stats_line_height + 12
+        min_height = max(96, stats_line_height * 4)
+        available_height = hud.bottom - inner_padding - timeline_top
+        if available_height < min_height:
+            timeline_top = max(hud.y + heading_height + 32, hud.bottom - inner_padding - min_height)
+            available_height = hud.bottom - inner_padding - timeline_top
+        return False, Box(hud.x + inner_padding, timeline_top, max(80, hud.width - inner_padding * 2),
+                          max(min_height, available_height))
+
+    @rule('hud_two_column', 'hud_columns')
+    def hud_two_column(columns):
+        return columns[0]
+
+    @rule('scroll_rect', 'hud_columns')
+    def scroll_rect(columns):
+        return columns[1]
+
+    @rule('timeline_wrap_width', 'scroll_rect')
+    def timeline_wrap_width(scroll):
+        return max(120, scroll.width - 32)
+
+    # Instruction panel under the selection row
+    @rule('instruction_rect', 'width', 'height')
+    def instruction_rect(width, height):
+        instruction_width = min(int(width * 0.6), width - padding * 2)
+        return Box(width // 2 - instruction_width // 2, height - 90, instruction_width, 70)
+
+    @rule('instruction_wrap_width', 'instruction_rect')
+    def instruction_wrap_width(instruction):
+        return max(120, instruction.width - 40)
+
+    # Menu, its buttons and the leaderboard below it
+    @rule('menu_panel', 'width', 'height')
+    def menu_panel(width, height):
+        menu_panel_width = min(int(width * 0.6), width - padding * 2)
+        return Box(width // 2 - menu_panel_width // 2, int(height * 0.18), menu_panel_width, int(height * 0.5))
+
+    @rule('menu_quote_wrap_width', 'menu_panel')
+    def menu_quote_wrap_width(menu):
+        return max(220, menu.width - 80)
+
+    @rule('start_button', 'width', 'menu_panel')
+    def start_button(width, menu):
+        button_width = min(360, max(260, int(menu.width * 0.65)))
+        return Box(width // 2 - button_width // 2, menu.bottom - MENU_BUTTON_HEIGHT * 2 - 30, button_width,
+                   MENU_BUTTON_HEIGHT)
+
+    @rule('quit_button', 'start_button')
+    def quit_button(start):
+        return Box(start.x, start.bottom + 20, start.width, start.height)
+
+    @rule('play_again_button', 'start_button')
+    def play_again_button(start):
+        return start
+
+    # Offer to resume a saved game, shown just above the start button in place of the quote
+    @rule('resume_hint', 'menu_panel', 'start_button')
+    def resume_hint(menu, start):
+        return Box(menu.x + 40, start.y - 40, menu.width - 80, 30)
+
+    @rule('leaderboard_panel', 'height', 'menu_panel')
+    def leaderboard_panel(height, menu):
+        leaderboard_top = menu.bottom + 16
+        return Box(menu.x, leaderboard_top, menu.width, max(0, height - padding - 28 - leaderboard_top))
+
+    return engine
+
+
+# Layout values that are boxes, applied to the game as pygame rects
+GAME_LAYOUT_BOXES = (
+    'hud_rect', 'instruction_rect', 'theme_button', 'mute_button', 'menu_panel', 'leaderboard_panel',
+    'start_button', 'quit_button', 'play_again_button', 'resume_hint', 'scroll_rect'
+)
@@ -0,0 +1,158 @@
+"""One particle budget shared by every emitter on screen.
+
+Button sparkles, train smoke and match explosions each emit into their own
+`ParticleEmitter`, so they still draw in their own layer. All emitters draw
+from one `ParticleBudget`, which has a hard global cap:
+
+* When the budget is full, a new particle replaces the oldest particle of a
+  lower priority emitter (explosions over smoke over sparkles). If there is
+  nothing of lower priority, the new particle is dropped.
+* `ParticleBudget.update` advances every emitter's particles in one pass,
+  including the particles of emitters that have stopped emitting. A stopped
+  train's smoke therefore fades out instead of freezing on screen.
+* The same pass is the level-of-detail (LOD) pass. It always removes
+  particles too small to draw anything and particles far off screen. Once
+  the budget is more than `LOD_PRESSURE` full, it also removes small
+  particles and reclaims every particle of emitters that have gone idle.
+
+The module does not import pygame. A particle is any object with
+``x``, ``y``, ``size`` and ``lifetime`` attributes and an ``update(dt)``
+method.
+"""
+from __future__ import annotations
+
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+# Emitter priorities, lowest first
+PRIORITY_SPARKLE = 0
+PRIORITY_SMOKE = 1
+PRIORITY_EXPLOSION = 2
+
+LOD_PRESSURE = 0.75  # Fraction of the cap above which the LOD pass thins particles
+LOD_MIN_SIZE = 0.5  # Radius in pixels below which a particle draws nothing
+LOD_SMALL_SIZE = 2.0  # Radius below which particles are removed under pressure
+LOD_MARGIN = 64  # Particles this far outside the screen count as distant
+IDLE_SECONDS = 0.5  # An emitter that has not emitted for this long is idle
+
+
+class ParticleEmitter:
+    """Particles of one effect source, drawn by their owner."""
+
+    def __init__(self, budget: "ParticleBudget", name: str, priority: int, time_scale: float = 1.0):
+        self.budget = budget
+        self.name = name
+        self.priority = priority
+        self.time_scale = time_scale  # Particle seconds per real second
+        self.particles: List[object] = []
+        self.idle = 0.0  # Seconds since the last emission
+
+    def emit(self, particle) -> bool:
+        """Add *particle* if the budget allows it; return whether it was added."""
+        return self.budget.emit(self, particle)
+
+    def clear(self) -> None:
+        self.budget.live -= len(self.particles)
+        self.particles.clear()
+
+    def __iter__(self):
+        return iter(self.particles)
+
+    def __len__(self) -> int:
+        return len(self.particles)
+
+
+class ParticleBudget:
+    """Global particle cap with per-emitter priorities and level of detail."""
+
+    def __init__(self, cap: int):
+        self.cap = max(1, cap)
+        self.bounds: Optional[Tuple[int, int]] = None  # Screen size for distance culling
+        self.emitters: "weakref.WeakSet[ParticleEmitter]" = weakref.WeakSet()  # Owners drop emitters freely
+        self.live = 0
+        self.peak = 0
+        self.dropped = 0  # Emissions refused because the budget was full
+        self.evicted = 0  # Lower priority particles replaced by higher priority ones
+        self.culled = 0  # Removed by the LOD pass
+        self.reclaimed = 0  # Taken back from idle emitters
+
+    def emitter(self, name: str, priority: int, time_scale: float = 1.0) -> ParticleEmitter:
+        emitter = ParticleEmitter(self, name, priority, time_scale)
+        self.emitters.add(emitter)
+        return emitter
+
+    def set_cap(self, cap: int) -> None:
+        """Change the cap; particles over a lowered cap go at the next update."""
+        self.cap = max(1, cap)
+
+    def emit(self, emitter: ParticleEmitter, particle) -> bool:
+        emitter.idle = 0.0
+        if self.live >= self.cap and not self._evict(emitter.priority):
+            self.dropped += 1
+            return False
+        emitter.particles.append(particle)
+        self.live += 1
+        self.peak = max(self.peak, self.live)
+        return True
+
+    def _evict(self, priority: int) -> bool:
+        """Remove the oldest particle of the lowest priority emitter below *priority*."""
+        victim = None
+        for emitter in self.emitters:
+            if emitter.particles and emitter.priority < priority:
+                if victim is None or (emitter.priority, -emitter.idle) < (victim.priority, -victim.idle):
+                    victim = emitter
+        if victim is None:
+            return False
+        del victim.particles[0]  # Oldest, so the closest to fading out anyway
+        self.live -= 1
+        self.evicted += 1
+        return True
+
+    def update(self, dt: float) -> None:
+        """Advance every particle, then apply the LOD pass and the cap."""
+        thinning = self.live > self.cap * LOD_PRESSURE
+        min_size = LOD_SMALL_SIZE if thinning else LOD_MIN_SIZE
+        if self.bounds is not None:
+            width, height = self.bounds
+            left, top = -LOD_MARGIN, -LOD_MARGIN
+            right, bottom = width + LOD_MARGIN, height + LOD_MARGIN
+        else:
+            left = top = float('-inf')
+            right = bottom = float('inf')
+
+        live = 0
+        for emitter in list(self.emitters):
+            emitter.idle += dt
+            particles = emitter.particles
+            if not particles:
+                continue
+            if thinning and emitter.idle > IDLE_SECONDS:
+                self.reclaimed += len(particles)
+                particles.clear()
+                continue
+            step = dt * emitter.time_scale
+            kept = []
+            for particle in particles:
+                particle.update(step)
+                if particle.lifetime <= 0:
+                    continue
+                if particle.size < min_size or not (left <= particle.x <= right and top <= particle.y <= bottom):
+                    self.culled += 1
+                    continue
+                kept.append(particle)
+            emitter.particles = kept
+            live += len(kept)
+        self.live = live
+
+        while self.live > self.cap and self._evict(PRIORITY_EXPLOSION + 1):
+            pass
+
+    def stats(self) -> Dict[str, object]:
+        """Live and dropped counters for profiling reports."""
+        by_emitter: Dict[str, int] = {}
+        for emitter in self.emitters:
+            by_emitter[emitter.name] = by_emitter.get(emitter.name, 0) + len(emitter.particles)
+        return {'cap': self.cap, 'live': self.live, 'peak': self.peak, 'dropped': self.dropped,
+                'evicted': self.evicted, 'culled': self.culled, 'reclaimed': self.reclaimed,
+                'emitters': dict(sorted(by_emitter.items()))}
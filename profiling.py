@@ -0,0 +1,248 @@
+"""Frame phase profiling and input-to-display latency measurement.
+
+`FrameProfiler` times every phase of the main loop (frame pacing in
+``clock.tick``, event handling, update, draw, flip and the deferred work
+run after the flip). `LatencyTracker`
+follows individual clicks and key presses from the moment they are
+dequeued, through the state change they cause, until the frame showing
+that change has been flipped, and keeps a histogram per kind of change.
+Both are pure Python so the report can come from the interactive game
+(``--profile``) or from the headless benchmark.
+"""
+from __future__ import annotations
+
+import collections
+import time
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+# Histogram bucket upper edges in milliseconds; the last bucket is open ended
+LATENCY_BUCKETS_MS = (4.0, 8.0, 16.7, 25.0, 33.3, 50.0, 66.7, 100.0, 150.0)
+SAMPLE_WINDOW = 10000  # Most recent samples kept for percentiles
+
+
+class Histogram:
+    """Bucketed millisecond samples with running totals and recent percentiles."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS_MS, window: int = SAMPLE_WINDOW):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.samples: Deque[float] = collections.deque(maxlen=window)
+
+    def add(self, value_ms: float) -> None:
+        index = 0
+        while index < len(self.buckets) and value_ms > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value_ms
+        self.maximum = max(self.maximum, value_ms)
+        self.samples.append(value_ms)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, object]:
+        labels = [f"<={edge:g}" for edge in self.buckets] + [f">{self.buckets[-1]:g}"]
+        return {
+            'count': self.count,
+            'mean': round(self.mean, 3),
+            'p50': round(self.percentile(50), 3),
+            'p95': round(self.percentile(95), 3),
+            'max': round(self.maximum, 3),
+            'buckets': dict(zip(labels, self.counts))
+        }
+
+
+class LatencyTracker:
+    """Measures input-to-display latency per tagged state change.
+
+    The main loop calls `begin` when it dequeues an input event and `end`
+    once the event has been dispatched; game code calls `tag` for the state
+    change the input produced. `frame_presented` closes every tagged input
+    once the frame showing it has been flipped.
+    """
+
+    def __init__(self, enabled: bool = False, clock=time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self._current: Optional[Tuple[str, float]] = None
+        self._pending: List[Tuple[str, float]] = []
+        self.histograms: Dict[str, Histogram] = {}
+        self.breakdown: Dict[str, Dict[str, Histogram]] = {}
+
+    # Marks the input event that is being dispatched right now
+    def begin(self, kind: str, timestamp: Optional[float] = None) -> None:
+        if self.enabled:
+            self._current = (kind, self.clock() if timestamp is None else timestamp)
+
+    def end(self) -> None:
+        self._current = None
+
+    # Attributes a visible state change to the input being dispatched
+    def tag(self, label: str) -> None:
+        if self._current is None:
+            return
+        kind, started = self._current
+        self._pending.append((f"{kind}:{label}", started))
+
+    def frame_presented(self, update_end: float, draw_end: float, flip_end: float) -> None:
+        if not self._pending:
+            return
+        for key, started in self._pending:
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+                self.breakdown[key] = {phase: Histogram() for phase in ('update', 'draw', 'flip')}
+            self.histograms[key].add((flip_end - started) * 1000.0)
+            phases = self.breakdown[key]
+            phases['update'].add((update_end - started) * 1000.0)
+            phases['draw'].add((draw_end - update_end) * 1000.0)
+            phases['flip'].add((flip_end - draw_end) * 1000.0)
+        self._pending.clear()
+
+    def summary(self) -> Dict[str, object]:
+        result = {}
+        for key in sorted(self.histograms):
+            entry = self.histograms[key].summary()
+            entry['phase_means'] = {phase: round(hist.mean, 3) for phase, hist in self.breakdown[key].items()}
+            result[key] = entry
+        return result
+
+
+class FrameProfiler:
+    """Times the phases of each main loop iteration.
+
+    ``pacing`` is the time spent inside ``clock.tick`` waiting for the next
+    frame; input that arrives during that wait is only dequeued afterwards.
+    """
+
+    PHASES = ('pacing', 'events', 'update', 'draw', 'flip', 'deferred', 'frame')
+
+    def __init__(self, latency: Optional[LatencyTracker] = None, clock=time.perf_counter):
+        self.clock = clock
+        self.latency = latency
+        if latency is not None:
+            latency.enabled = True
+            latency.clock = clock
+        self.phases = {phase: Histogram() for phase in self.PHASES}
+        self.frames = 0
+        self._frame_start = 0.0
+        self._last_mark = 0.0
+        self._marks: Dict[str, float] = {}
+
+    def begin_frame(self, tick_start: float) -> None:
+        now = self.clock()
+        self.phases['pacing'].add((now - tick_start) * 1000.0)
+        self._frame_start = now
+        self._last_mark = now
+        self._marks = {}
+
+    def mark(self, phase: str) -> None:
+        now = self.clock()
+        self.phases[phase].add((now - self._last_mark) * 1000.0)
+        self._marks[phase] = now
+        self._last_mark = now
+
+    def end_frame(self) -> None:
+        """Close the frame; time since the flip mark counts as deferred work."""
+        if 'flip' not in self._marks:
+            self.mark('flip')
+        self.mark('deferred')
+        self.phases['frame'].add((self._last_mark - self._frame_start) * 1000.0)
+        self.frames += 1
+        if self.latency is not None:
+            self.latency.frame_presented(self._marks['update'], self._marks['draw'], self._marks['flip'])
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            'frames': self.frames,
+            'phases': {phase: hist.summary() for phase, hist in self.phases.items()},
+            'input_latency': self.latency.summary() if self.latency is not None else {}
+        }
+
+
+def format_report(summary: Dict[str, object]) -> str:
+    """Render a profiler summary as a plain-text table."""
+    lines = [f"Frames profiled: {summary['frames']}", "",
+             f"{'phase (ms)':<28}{'count':>8}{'mean':>9}{'p50':>9}{'p95':>9}{'max':>9}"]
+    for phase, stats in summary['phases'].items():
+        lines.append(f"  {phase:<26}{stats['count']:>8}{stats['mean']:>9.2f}{stats['p50']:>9.2f}{stats['p95']:>9.2f}{stats['max']:>9.2f}")
+
+    latency = summary.get('input_latency') or {}
+    lines.append("")
+    lines.append("Input-to-display latency (ms)")
+    if not latency:
+        lines.append("  no tagged inputs")
+    for key, stats in latency.items():
+        lines.append(f"  {key:<26}{stats['count']:>8}{stats['mean']:>9.2f}{stats['p50']:>9.2f}{stats['p95']:>9.2f}{stats['max']:>9.2f}")
+        means = stats['phase_means']
+        lines.append(f"    until update {means['update']:.2f}, draw {means['draw']:.2f}, flip {means['flip']:.2f}")
+        buckets = "  ".join(f"{label}:{count}" for label, count in stats['buckets'].items() if count)
+        lines.append(f"    {buckets}")
+
+    audio = summary.get('audio')
+    if audio:
+        play_call = audio['play_call_ms']
+        lines.append("")
+        lines.append("Audio")
+        lines.append(f"  mixer buffer {audio['buffer_latency_ms']:.2f} ms, play() mean {play_call['mean']:.3f} ms "
+                     f"(p95 {play_call['p95']:.3f}) over {play_call['count']} calls")
+        lines.append(f"  estimated play-to-audio {audio['estimated_play_to_audio_ms']:.2f} ms, "
+                     f"stolen voices {audio['stolen_voices']}")
+
+    quality = summary.get('quality')
+    if quality:
+        mode = "auto" if quality['auto'] else "fixed"
+        lines.append("")
+        lines.append(f"Quality preset {quality['preset']} ({mode}), {quality['changes']} changes, "
+                     f"last load {quality['load'] * 100:.0f}% of the frame budget")
+
+    particles = summary.get('particles')
+    if particles:
+        lines.append("")
+        lines.append(f"Particles {particles['live']} live of {particles['cap']} (peak {particles['peak']}), "
+                     f"dropped {particles['dropped']}, evicted {particles['evicted']}, "
+                     f"culled {particles['culled']}, reclaimed {particles['reclaimed']}")
+
+    scheduler = summary.get('scheduler')
+    if scheduler:
+        lines.append("")
+        lines.append(f"Deferred work {scheduler['completed']} tasks run ({scheduler['overdue']} overdue, "
+                     f"{scheduler['coalesced']} merged), {scheduler['pending']} pending, "
+                     f"longest wait {scheduler['max_wait_ms']:.1f} ms")
+
+    replay = summary.get('replay')
+    if replay:
+        lines.append("")
+        lines.append(f"Instant replay {replay['frames_held']} frames ({replay['seconds_held']:.1f} s, "
+                     f"{replay['megabytes']} MB) held, every {replay['stride']} frame(s) captured, "
+                     f"{replay['dropped']} dropped")
+        lines.append(f"  main thread {replay['mean_cost_ms']:.3f} ms per frame (budget {replay['budget_ms']} ms), "
+                     f"{replay['capture_ms']:.3f} ms per capture, max {replay['max_cost_ms']:.3f} ms")
+
+    recording = summary.get('recording')
+    if recording:
+        lines.append("")
+        lines.append(f"Recording ({recording['format']}) {recording['written']} of {recording['submitted']} frames "
+                     f"written, {recording['dropped']} dropped, {recording['failed']} failed, "
+                     f"queue depth mean {recording['mean_queue_depth']:.1f} "
+                     f"max {recording['max_queue_depth']}/{recording['queue_size']}, "
+                     f"{recording['mean_write_ms']:.2f} ms per frame, {recording['megabytes']} MB")
+
+    theme_cache = summary.get('theme_cache')
+    if theme_cache:
+        lines.append("")
+        lines.append("Pre-built theme scenes")
+        for name, size in sorted(theme_cache.items()):
+            lines.append(f"  {name:<26}{size / (1024 * 1024):>8.2f} MiB")
+    return "\n".join(lines)
@@ -0,0 +1,89 @@
+"""Automatic visual quality scaling from measured frame times.
+
+`QualityController` is fed the time each frame spent working (events,
+update, draw and flip, but not the wait for the next frame) and steps
+through named presets to keep that work inside the frame budget. It steps
+down as soon as a window of frames runs over budget. It only steps back up
+after several consecutive windows with plenty of headroom, so it does not
+flip between two presets on a machine that sits near the limit.
+
+The module does not import pygame; the game applies the preset's effect
+scales itself.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+AUTO = "auto"
+QUALITY_LEVELS = ("ultra", "high", "medium", "low")  # Best first
+
+# Effect scales per preset: particle counts, smoke emission, button glow and stars
+# are fractions of the configured values; parallax_layers is how many layers draw
+QUALITY_PRESETS: Dict[str, Dict[str, float]] = {
+    "ultra": {"particles": 1.0, "smoke": 1.0, "glow": 1.0, "stars": 1.0, "parallax_layers": 2},
+    "high": {"particles": 0.75, "smoke": 0.75, "glow": 1.0, "stars": 0.75, "parallax_layers": 2},
+    "medium": {"particles": 0.5, "smoke": 0.5, "glow": 0.5, "stars": 0.5, "parallax_layers": 1},
+    "low": {"particles": 0.25, "smoke": 0.25, "glow": 0.0, "stars": 0.25, "parallax_layers": 0},
+}
+
+SAMPLE_WINDOW = 90  # Frames judged together, 1.5 s at 60 fps
+DOWNGRADE_LOAD = 0.9  # Step down when the median frame uses more of the budget than this
+UPGRADE_LOAD = 0.5  # Step up only when the median frame uses less than this...
+UPGRADE_WINDOWS = 4  # ...for this many windows in a row
+
+
+class QualityController:
+    """Chooses a quality preset from rolling frame work times."""
+
+    def __init__(self, target_fps: float, preset: str = AUTO, window: int = SAMPLE_WINDOW):
+        if preset != AUTO and preset not in QUALITY_PRESETS:
+            raise ValueError(f"Unknown quality preset: {preset}")
+        self.budget_ms = 1000.0 / target_fps
+        self.auto = preset == AUTO
+        self.index = 0 if self.auto else QUALITY_LEVELS.index(preset)
+        self.window = window
+        self.samples: List[float] = []
+        self.headroom_windows = 0
+        self.changes = 0
+        self.last_load = 0.0  # Median frame work as a fraction of the budget
+
+    @property
+    def preset(self) -> str:
+        return QUALITY_LEVELS[self.index]
+
+    @property
+    def settings(self) -> Dict[str, float]:
+        return QUALITY_PRESETS[self.preset]
+
+    def record(self, work_ms: float) -> Optional[str]:
+        """Add one frame's work time; return the new preset name when it changes."""
+        if not self.auto:
+            return None
+        self.samples.append(work_ms)
+        if len(self.samples) < self.window:
+            return None
+        ordered = sorted(self.samples)
+        self.samples.clear()
+        self.last_load = ordered[len(ordered) // 2] / self.budget_ms
+
+        if self.last_load > DOWNGRADE_LOAD:
+            self.headroom_windows = 0
+            if self.index < len(QUALITY_LEVELS) - 1:
+                return self._step(1)
+        elif self.last_load < UPGRADE_LOAD:
+            self.headroom_windows += 1
+            if self.headroom_windows >= UPGRADE_WINDOWS and self.index > 0:
+                self.headroom_windows = 0
+                return self._step(-1)
+        else:
+            self.headroom_windows = 0
+        return None
+
+    def _step(self, direction: int) -> str:
+        self.index += direction
+        self.changes += 1
+        return self.preset
+
+    def stats(self) -> Dict[str, object]:
+        return {'preset': self.preset, 'auto': self.auto, 'changes': self.changes,
+                'load': round(self.last_load, 3)}
@@ -0,0 +1,193 @@
+"""Background recording of presented frames.
+
+The main loop hands `FrameRecorder` a copy of each presented frame as packed
+RGB bytes. Frames wait in a bounded queue until a small pool of worker
+threads encodes and writes them. The output is either a PNG sequence or a
+single raw RGB stream, and an ``index.csv`` records each frame's number,
+capture time and position, in the order the frames were written.
+
+Recording must never stall the game, so the queue applies backpressure by
+dropping: when the workers fall behind and the queue is full, `submit`
+refuses the frame straight away and counts it as dropped. The frame
+numbers in the index show where the gaps are. `full` lets the caller skip
+copying a frame that would be dropped anyway. A frame that cannot be
+written, for example because the disk is full, is counted as failed and
+the worker moves on. `close` gives up on the queued frames rather than
+hang when the workers stop taking them.
+
+PNG encoding uses only ``zlib`` and ``struct``. zlib releases the GIL, so
+the workers compress in parallel with the game. The module does not import
+pygame.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+FORMAT_PNG = "png"
+FORMAT_RAW = "raw"
+RECORDING_FORMATS = (FORMAT_PNG, FORMAT_RAW)
+
+PNG_COMPRESSION = 1  # Fastest zlib level; recordings favour keeping up over size
+RAW_STREAM_NAME = "frames.rgb"
+CLOSE_TIMEOUT = 5.0  # Seconds close waits for the workers to take the next frame
+INDEX_NAME = "index.csv"
+INDEX_HEADER = "frame,time_ms,width,height,file,offset,length\n"
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def encode_png(width: int, height: int, rgb: bytes, level: int = PNG_COMPRESSION) -> bytes:
+    """Encode packed 8-bit RGB rows as a PNG file."""
+    stride = width * 3
+    if len(rgb) != stride * height:
+        raise ValueError(f"Expected {stride * height} bytes for {width}x{height} RGB, got {len(rgb)}")
+    rows = b"".join(b"\x00" + rgb[offset:offset + stride] for offset in range(0, len(rgb), stride))  # Filter type 0
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)  # 8-bit truecolor
+    return (_PNG_SIGNATURE + _png_chunk(b"IHDR", header) + _png_chunk(b"IDAT", zlib.compress(rows, level))
+            + _png_chunk(b"IEND", b""))
+
+
+class FrameRecorder:
+    """Encodes and writes submitted frames on worker threads."""
+
+    def __init__(self, directory: str, fmt: str = FORMAT_PNG, workers: int = 2, queue_size: int = 32,
+                 clock=time.perf_counter):
+        if fmt not in RECORDING_FORMATS:
+            raise ValueError(f"Unknown recording format: {fmt}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.format = fmt
+        self.clock = clock
+        self.started = clock()
+        self.frames: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=queue_size)
+        self.queue_size = queue_size
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0  # Frames a worker could not write
+        self.bytes_written = 0
+        self.max_depth = 0
+        self._depth_total = 0  # Queue depth summed over submit calls
+        self._depth_samples = 0
+        self._encode_ms = 0.0
+        self._lock = threading.Lock()  # Guards the stream, the index and the counters workers update
+        self._stream = open(os.path.join(directory, RAW_STREAM_NAME), "wb") if fmt == FORMAT_RAW else None
+        self._index = open(os.path.join(directory, INDEX_NAME), "w", encoding="utf-8")
+        self._index.write(INDEX_HEADER)
+        self._workers: List[threading.Thread] = []
+        for number in range(max(1, workers)):
+            worker = threading.Thread(target=self._run, name=f"frame-recorder-{number}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def full(self) -> bool:
+        return self.frames.full()
+
+    def drop(self) -> None:
+        """Count a frame the caller chose not to copy because the queue was full."""
+        self.submitted += 1
+        self.dropped += 1
+
+    def submit(self, width: int, height: int, rgb: bytes) -> bool:
+        """Queue one frame; return False if it was dropped because the workers are behind."""
+        frame = self.submitted
+        self.submitted += 1
+        depth = self.frames.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_total += depth
+        self._depth_samples += 1
+        try:
+            self.frames.put_nowait((frame, (self.clock() - self.started) * 1000.0, width, height, rgb))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self) -> None:
+        while True:
+            item = self.frames.get()
+            if item is None:
+                return
+            frame, time_ms, width, height, rgb = item
+            started = time.perf_counter()
+            try:
+                if self.format == FORMAT_PNG:
+                    data = encode_png(width, height, rgb)
+                    name = f"frame_{frame:06d}.png"
+                    with open(os.path.join(self.directory, name), "wb") as handle:
+                        handle.write(data)
+                    with self._lock:
+                        self._record(frame, time_ms, width, height, name, 0, len(data), started)
+                else:
+                    with self._lock:
+                        offset = self._stream.tell()
+                        self._stream.write(rgb)
+                        self._record(frame, time_ms, width, height, RAW_STREAM_NAME, offset, len(rgb), started)
+            except OSError as e:
+                with self._lock:
+                    self.failed += 1
+                    if self.failed == 1:
+                        print(f"Warning: Could not write recorded frame {frame}: {e}")
+
+    def _record(self, frame, time_ms, width, height, name, offset, length, started) -> None:
+        self._index.write(f"{frame},{time_ms:.3f},{width},{height},{name},{offset},{length}\n")
+        self.written += 1
+        self.bytes_written += length
+        self._encode_ms += (time.perf_counter() - started) * 1000.0
+
+    def close(self, timeout: float = CLOSE_TIMEOUT) -> None:
+        """Write every queued frame, then stop the workers and close the files.
+
+        If the workers take no frame for *timeout* seconds, the frames still
+        queued are counted as dropped so closing cannot block forever.
+        """
+        for _ in self._workers:
+            try:
+                self.frames.put(None, timeout=timeout)
+            except queue.Full:
+                self._discard_queued()
+                self.frames.put_nowait(None)
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+        if self._stream is not None:
+            self._stream.close()
+        self._index.close()
+
+    def _discard_queued(self) -> None:
+        stops = 0
+        while True:
+            try:
+                item = self.frames.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stops += 1
+            else:
+                self.dropped += 1
+        for _ in range(stops):
+            self.frames.put_nowait(None)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'format': self.format,
+            'submitted': self.submitted,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'queue_size': self.queue_size,
+            'max_queue_depth': self.max_depth,
+            'mean_queue_depth': round(self._depth_total / self._depth_samples, 2) if self._depth_samples else 0.0,
+            'mean_write_ms': round(self._encode_ms / self.written, 3) if self.written else 0.0,
+            'megabytes': round(self.bytes_written / (1024 * 1024), 2)
+        }
@@ -0,0 +1,166 @@
+"""Always-on instant replay of the last few seconds of play.
+
+`ReplayBuffer` keeps recently presented frames as PNG-compressed bytes in
+a ring that is bounded both by age (``seconds``) and by memory
+(``max_bytes``). The oldest frames are evicted first. A dump copies the ring
+and writes it to disk as a PNG sequence plus an ``index.csv`` on a
+background thread, so saving "the last ten seconds" never costs a frame.
+
+The main thread only downscales and copies a frame and hands it over. One
+compressor thread encodes it. That copy is the steady-state cost, and
+`charge` measures it each frame. When the smoothed cost of a capture rises
+above ``budget_ms``, the buffer captures every second, third, ... frame, so
+the average cost per frame stays inside the budget. If the compressor falls
+behind, frames are dropped rather than queued without bound.
+
+Dumped frames use the same ``index.csv`` layout as `recorder.FrameRecorder`.
+The module does not import pygame.
+"""
+from __future__ import annotations
+
+import collections
+import math
+import os
+import queue
+import threading
+import time
+from typing import Deque, Dict, List, Optional, Tuple
+
+from recorder import INDEX_HEADER, INDEX_NAME, encode_png
+
+COMPRESSOR_QUEUE_SIZE = 4  # Raw frames waiting for the compressor; more are dropped
+COST_SMOOTHING = 0.1  # Weight of the newest capture in the cost estimate
+MAX_STRIDE = 8  # Capture at least every eighth frame however slow capturing is
+
+
+class ReplayBuffer:
+    """Memory-bounded ring of compressed recent frames."""
+
+    def __init__(self, seconds: float, max_bytes: int, budget_ms: float, clock=time.perf_counter):
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+        self.budget_ms = budget_ms
+        self.clock = clock
+        self.started = clock()
+        self.frames: Deque[Tuple[int, float, int, int, bytes]] = collections.deque()
+        self.bytes_held = 0
+        self.stride = 1  # Capture every stride-th frame
+        self.capture_ms: Optional[float] = None  # Smoothed cost of one capture on the main thread
+        self.frame = 0
+        self.captured = 0
+        self.dropped = 0
+        self.evicted = 0
+        self.dumps = 0
+        self._cost_total = 0.0  # Main-thread milliseconds over every charged frame
+        self._charged = 0
+        self._max_cost = 0.0
+        self._lock = threading.Lock()  # Guards the ring against the compressor and dumps
+        self._pending: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=COMPRESSOR_QUEUE_SIZE)
+        self._writers: List[threading.Thread] = []
+        self._compressor = threading.Thread(target=self._compress, name="replay-compressor", daemon=True)
+        self._compressor.start()
+
+    def due(self) -> bool:
+        """Advance to the next frame and return whether it should be captured."""
+        self.frame += 1
+        return self.frame % self.stride == 0
+
+    # FrameCapture interface
+    def full(self) -> bool:
+        return self._pending.full()
+
+    def drop(self) -> None:
+        self.dropped += 1
+
+    def submit(self, width: int, height: int, rgb: bytes) -> bool:
+        try:
+            self._pending.put_nowait((self.frame, (self.clock() - self.started) * 1000.0, width, height, rgb))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.captured += 1
+        return True
+
+    def charge(self, cost_ms: float, captured: bool) -> None:
+        """Record the main-thread cost of this frame and adapt the capture stride to the budget."""
+        self._cost_total += cost_ms
+        self._charged += 1
+        self._max_cost = max(self._max_cost, cost_ms)
+        if not captured:
+            return
+        if self.capture_ms is None:
+            self.capture_ms = cost_ms
+        else:
+            self.capture_ms += (cost_ms - self.capture_ms) * COST_SMOOTHING
+        self.stride = min(MAX_STRIDE, max(1, math.ceil(self.capture_ms / self.budget_ms)))
+
+    def _compress(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            frame, time_ms, width, height, rgb = item
+            data = encode_png(width, height, rgb)
+            with self._lock:
+                self.frames.append((frame, time_ms, width, height, data))
+                self.bytes_held += len(data)
+                while self.frames and (self.bytes_held > self.max_bytes
+                                       or time_ms - self.frames[0][1] > self.seconds * 1000.0):
+                    self.bytes_held -= len(self.frames.popleft()[4])
+                    self.evicted += 1
+
+    def snapshot(self) -> List[Tuple[int, float, int, int, bytes]]:
+        """Frames currently held, oldest first."""
+        with self._lock:
+            return list(self.frames)
+
+    def dump(self, directory: str) -> int:
+        """Write the held frames to *directory* on a background thread; return how many."""
+        frames = self.snapshot()
+        if not frames:
+            return 0
+        writer = threading.Thread(target=self._write, args=(directory, frames), name="replay-writer", daemon=True)
+        writer.start()
+        self._writers = [thread for thread in self._writers if thread.is_alive()] + [writer]
+        self.dumps += 1
+        return len(frames)
+
+    @staticmethod
+    def _write(directory: str, frames: List[Tuple[int, float, int, int, bytes]]) -> None:
+        os.makedirs(directory, exist_ok=True)
+        first_time = frames[0][1]
+        with open(os.path.join(directory, INDEX_NAME), "w", encoding="utf-8") as index:
+            index.write(INDEX_HEADER)
+            for number, (frame, time_ms, width, height, data) in enumerate(frames):
+                name = f"frame_{number:06d}.png"
+                with open(os.path.join(directory, name), "wb") as handle:
+                    handle.write(data)
+                index.write(f"{frame},{time_ms - first_time:.3f},{width},{height},{name},0,{len(data)}\n")
+
+    def close(self) -> None:
+        """Stop the compressor and wait for dumps still being written."""
+        self._pending.put(None)
+        self._compressor.join()
+        for writer in self._writers:
+            writer.join()
+        self._writers = []
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            held = len(self.frames)
+            span_ms = self.frames[-1][1] - self.frames[0][1] if held > 1 else 0.0
+            megabytes = round(self.bytes_held / (1024 * 1024), 2)
+        return {
+            'frames_held': held,
+            'seconds_held': round(span_ms / 1000.0, 2),
+            'megabytes': megabytes,
+            'captured': self.captured,
+            'dropped': self.dropped,
+            'evicted': self.evicted,
+            'dumps': self.dumps,
+            'stride': self.stride,
+            'budget_ms': self.budget_ms,
+            'mean_cost_ms': round(self._cost_total / self._charged, 3) if self._charged else 0.0,
+            'max_cost_ms': round(self._max_cost, 3),
+            'capture_ms': round(self.capture_ms, 3) if self.capture_ms is not None else 0.0
+        }
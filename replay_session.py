@@ -0,0 +1,196 @@
+"""Replay an input log headlessly.
+
+Feeds a log written by ``Train-Color-Matcher.py --log-inputs`` (or
+``benchmark.py --log-inputs``) back into a fresh `ModernGame` through
+`handle_click`, `handle_keyboard_input`, `handle_resize` and
+`handle_scroll`, one frame at a time on a frozen tick clock. The logged
+deals stand in for the track's random number generator, and a logged
+resume restores the save the session started from. Each logged match
+attempt is checked against what the replayed game did, so any divergence is
+reported.
+
+Without ``--draw``, frames are only simulated, which runs thousands of
+frames per second. ``--list`` prints the records from ``--from-frame`` on
+without replaying, jumping straight to the nearest checkpoint.
+
+Example::
+
+    python replay_session.py session.tcmi
+    python replay_session.py session.tcmi --list --from-frame 36000
+"""
+from __future__ import annotations
+
+import argparse
+import collections
+import os
+import random
+import time
+from typing import Deque, Dict, Iterator, Optional, Sequence
+
+from headless import PROJECT_DIR, frozen_ticks, load_game_module
+from input_log import (RECORD_CLICK, RECORD_DEAL, RECORD_END, RECORD_KEY, RECORD_MATCH, RECORD_RESIZE,
+                       RECORD_RESUME, RECORD_WHEEL, InputLogReader, InputRecord, SessionWatcher)
+from save_state import GameSnapshot
+
+FRAME_MS = 16  # Tick clock step per replayed frame
+RECORD_NAMES = {RECORD_CLICK: 'click', RECORD_KEY: 'key', RECORD_RESIZE: 'resize', RECORD_WHEEL: 'wheel',
+                RECORD_MATCH: 'match', RECORD_DEAL: 'deal', RECORD_RESUME: 'resume', RECORD_END: 'end'}
+
+
+class LoggedDeals:
+    """Stands in for `GameState.rng`, dealing the logged tracks in order.
+
+    A deal made while the game handles an input happens before the replay
+    has reached the DEAL record, so `randrange` reads ahead and keeps the
+    records it passes over for `next_record`. A deal made by a level up in
+    `update` comes after the replay has read the frame's DEAL record, which
+    is then queued with `push`.
+    """
+
+    def __init__(self, records: Iterator[InputRecord], fallback: random.Random):
+        self.records = records
+        self.fallback = fallback  # Used once the log runs out of deals
+        self.pending: Deque[InputRecord] = collections.deque()
+        self.colors: Deque[int] = collections.deque()
+        self.deals = 0
+
+    def randrange(self, stop: int) -> int:
+        if not self.colors:
+            for record in self.records:
+                if record.kind == RECORD_DEAL:
+                    self.colors.extend(record.values)
+                    self.deals += 1
+                    break
+                self.pending.append(record)
+        return self.colors.popleft() if self.colors else self.fallback.randrange(stop)
+
+    def push(self, colors: Sequence[int]) -> bool:
+        """Queue a deal the replay read first; False if the previous deal was never made."""
+        unused = bool(self.colors)
+        self.colors.clear()
+        self.colors.extend(colors)
+        self.deals += 1
+        return not unused
+
+    def next_record(self) -> Optional[InputRecord]:
+        if self.pending:
+            return self.pending.popleft()
+        return next(self.records, None)
+
+
+def replay(module, game, reader: InputLogReader, screen=None) -> Dict[str, object]:
+    """Play *reader*'s log into *game*; draw every frame onto *screen* when given."""
+    pygame = module.pygame
+    state = game.game_state
+    deals = LoggedDeals(reader.records(), state.rng)
+    state.rng = deals
+    if reader.size != (game.window_width, game.window_height):
+        game.handle_resize(*reader.size)
+    game.initialize_trains()  # Deal the menu track the log starts with
+    watcher = SessionWatcher(state)
+    watcher.new_deal()
+    produced: Deque[tuple] = collections.deque()  # Match attempts the replay made, not yet checked
+    mismatches = 0
+    inputs = 0
+    frame = 0
+
+    started = time.perf_counter()
+    with frozen_ticks(pygame) as ticks:
+        record = deals.next_record()
+        while record is not None:
+            while record is not None and record.kind != RECORD_END and record.frame <= frame:
+                kind, values = record.kind, record.values
+                if kind == RECORD_MATCH:
+                    if not produced or produced.popleft() != values:
+                        mismatches += 1
+                elif kind == RECORD_DEAL:
+                    if not deals.push(values):
+                        mismatches += 1  # The replayed game never asked for the previous deal
+                elif kind == RECORD_RESUME:
+                    game.restore_snapshot(GameSnapshot.decode(values[0]))
+                    watcher.sync()
+                else:
+                    inputs += 1
+                    if kind == RECORD_CLICK:
+                        game.handle_click(values)
+                    elif kind == RECORD_KEY:
+                        game.handle_keyboard_input(pygame.event.Event(pygame.KEYDOWN, key=values[0], mod=0,
+                                                                      unicode=""))
+                    elif kind == RECORD_RESIZE:
+                        game.handle_resize(*values)
+                    elif kind == RECORD_WHEEL:
+                        game.handle_scroll(values[0])
+                    outcome = watcher.new_match()
+                    if outcome is not None:
+                        produced.append((outcome, game.selected_train_index))
+                record = deals.next_record()
+            if record is None or (record.kind == RECORD_END and record.frame <= frame):
+                break  # The session ended here, or the log was cut off after its last record
+            ticks[0] += FRAME_MS
+            game.update(FRAME_MS / 1000.0)
+            watcher.new_match()
+            if screen is not None:
+                game.draw(screen)
+            game.scheduler.run_all()
+            frame += 1
+    elapsed = time.perf_counter() - started
+
+    return {
+        'frames': frame,
+        'inputs': inputs,
+        'deals': deals.deals,
+        'mismatches': mismatches + len(produced) + (1 if deals.colors else 0),
+        'wall_time_s': round(elapsed, 3),
+        'fps': round(frame / elapsed, 1) if elapsed > 0 else 0.0,
+        'final_state': {'state': game.state, 'score': game.score, 'level': game.level,
+                        'correct': game.correct_matches, 'incorrect': game.incorrect_matches}
+    }
+
+
+def list_records(reader: InputLogReader, start_frame: int = 0, limit: int = 50) -> None:
+    for count, record in enumerate(reader.records(start_frame)):
+        if count == limit:
+            print("...")
+            break
+        if record.kind == RECORD_RESUME:
+            values = f"{len(record.values[0])} byte save"
+        else:
+            values = ' '.join(map(str, record.values))
+        print(f"{record.frame:>9}  {RECORD_NAMES.get(record.kind, record.kind):<7} {values}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay an input log headlessly.")
+    parser.add_argument("log", help="Input log written with --log-inputs")
+    parser.add_argument("--draw", action="store_true", help="Draw every frame as well (slower)")
+    parser.add_argument("--list", action="store_true", help="Print records instead of replaying them")
+    parser.add_argument("--from-frame", type=int, default=0, help="First frame printed by --list")
+    parser.add_argument("--limit", type=int, default=50, help="Most records printed by --list")
+    args = parser.parse_args(argv)
+
+    reader = InputLogReader(os.path.abspath(args.log))
+    size_kb = os.path.getsize(reader.path) / 1024
+    print(f"{args.log}: {reader.end_frame} frames, {len(reader.checkpoints)} checkpoints, {size_kb:.1f} KB"
+          + ("" if reader.complete else " (no index; the session was cut off)"))
+    if args.list:
+        list_records(reader, args.from_frame, args.limit)
+        return 0
+
+    os.chdir(PROJECT_DIR)  # Assets and config.json are resolved relative to the project
+    module = load_game_module()
+    game = module.ModernGame()
+    screen = module.set_window_mode(reader.size) if args.draw else None
+    try:
+        summary = replay(module, game, reader, screen)
+    finally:
+        game.shutdown()
+    final = summary['final_state']
+    print(f"Replayed {summary['frames']} frames and {summary['inputs']} inputs in {summary['wall_time_s']}s "
+          f"({summary['fps']} FPS)")
+    print(f"Final: {final['state']}, score {final['score']}, level {final['level']}, "
+          f"{final['correct']} correct / {final['incorrect']} wrong, {summary['mismatches']} mismatches")
+    return 1 if summary['mismatches'] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,129 @@
+"""Cooperative scheduling of deferrable work inside the frame budget.
+
+Work that does not have to appear on the frame that triggers it gets
+submitted to a `FrameScheduler` with a priority and a deadline. Examples are
+wrapping a new timeline entry, repositioning the skyline after a layout
+change, and requesting new theme scenes after a level up. The main loop calls `run` once the
+frame has been flipped. It runs pending tasks, most urgent first, for as
+long as the frame's work stays inside the budget. It uses each task's
+measured cost to avoid starting work that would overrun.
+
+A task whose deadline has passed runs on the next call even without slack,
+so a long stretch of heavy frames delays deferred work but never starves
+it.
+
+The module does not import pygame; tasks are plain callables.
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, List, Optional
+
+# Task priorities, most urgent first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+DEFAULT_DEADLINE_MS = 250.0  # Longest a task may wait for slack before it runs anyway
+SAFETY_MARGIN_MS = 2.0  # Budget left unused for the frame's own jitter
+COST_SMOOTHING = 0.25  # Weight of the newest run in a task's cost estimate
+
+
+class Task:
+    __slots__ = ('name', 'function', 'priority', 'submitted', 'deadline', 'sequence')
+
+    def __init__(self, name: str, function: Callable[[], object], priority: int, submitted: float,
+                 deadline: float, sequence: int):
+        self.name = name
+        self.function = function
+        self.priority = priority
+        self.submitted = submitted
+        self.deadline = deadline
+        self.sequence = sequence
+
+
+class FrameScheduler:
+    """Runs deferred tasks in the time a frame leaves unused."""
+
+    def __init__(self, budget_ms: float, clock=time.perf_counter):
+        self.budget_ms = budget_ms
+        self.clock = clock
+        self.pending: List[Task] = []
+        self.costs: Dict[str, float] = {}  # Smoothed milliseconds per task name
+        self._sequence = 0
+        self.submitted = 0
+        self.completed = 0
+        self.overdue = 0  # Tasks run past their deadline without waiting for slack
+        self.coalesced = 0  # Submissions merged into a task already pending
+        self.max_wait_ms = 0.0
+
+    def submit(self, name: str, function: Callable[[], object], priority: int = PRIORITY_NORMAL,
+               deadline_ms: float = DEFAULT_DEADLINE_MS, coalesce: bool = False) -> None:
+        """Queue *function*; with *coalesce*, a pending task of the same name is replaced instead."""
+        now = self.clock()
+        deadline = now + deadline_ms / 1000.0
+        self.submitted += 1
+        if coalesce:
+            for task in self.pending:
+                if task.name == name:
+                    task.function = function
+                    task.priority = min(task.priority, priority)
+                    task.deadline = min(task.deadline, deadline)
+                    self.coalesced += 1
+                    return
+        self._sequence += 1
+        self.pending.append(Task(name, function, priority, now, deadline, self._sequence))
+
+    def _next(self, now: float) -> Optional[Task]:
+        overdue = [task for task in self.pending if task.deadline <= now]
+        if overdue:
+            return min(overdue, key=lambda task: (task.deadline, task.sequence))
+        if not self.pending:
+            return None
+        return min(self.pending, key=lambda task: (task.priority, task.deadline, task.sequence))
+
+    def run(self, frame_start: float) -> int:
+        """Run what fits between now and the end of the frame that began at *frame_start*."""
+        frame_end = frame_start + (self.budget_ms - SAFETY_MARGIN_MS) / 1000.0
+        ran = 0
+        while self.pending:
+            now = self.clock()
+            task = self._next(now)
+            if task.deadline > now:
+                remaining_ms = (frame_end - now) * 1000.0
+                if remaining_ms <= self.costs.get(task.name, 0.0):
+                    break  # Not overdue and it would not fit; try again next frame
+            else:
+                self.overdue += 1
+            self._execute(task, now)
+            ran += 1
+        return ran
+
+    def run_all(self) -> int:
+        """Run every pending task regardless of the budget."""
+        ran = 0
+        while self.pending:
+            self._execute(self._next(self.clock()), self.clock())
+            ran += 1
+        return ran
+
+    def run_named(self, name: str) -> int:
+        """Run every pending task called *name* now, in the order they were submitted."""
+        tasks = sorted((task for task in self.pending if task.name == name), key=lambda task: task.sequence)
+        for task in tasks:
+            self._execute(task, self.clock())
+        return len(tasks)
+
+    def _execute(self, task: Task, now: float) -> None:
+        self.pending.remove(task)
+        self.max_wait_ms = max(self.max_wait_ms, (now - task.submitted) * 1000.0)
+        task.function()
+        cost = (self.clock() - now) * 1000.0
+        previous = self.costs.get(task.name)
+        self.costs[task.name] = cost if previous is None else previous + (cost - previous) * COST_SMOOTHING
+        self.completed += 1
+
+    def stats(self) -> Dict[str, object]:
+        return {'pending': len(self.pending), 'submitted': self.submitted, 'completed': self.completed,
+                'overdue': self.overdue, 'coalesced': self.coalesced, 'max_wait_ms': round(self.max_wait_ms, 3),
+                'cost_ms': {name: round(cost, 3) for name, cost in sorted(self.costs.items())}}
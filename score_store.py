@@ -0,0 +1,139 @@
+"""Persistent high scores and session results backed by SQLite.
+
+Finished sessions are queued and written by a background thread in
+batches, so ending a game never waits on disk. The leaderboard is read once
+at startup and refreshed by the writer after every commit; the game only
+ever reads the cached copy.
+"""
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        finished_at REAL NOT NULL,
+        score INTEGER NOT NULL,
+        accuracy REAL NOT NULL,
+        max_combo INTEGER NOT NULL,
+        level INTEGER NOT NULL,
+        duration_s REAL NOT NULL,
+        theme TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_sessions_score ON sessions (score DESC, finished_at)",
+    "CREATE INDEX IF NOT EXISTS idx_sessions_theme_score ON sessions (theme, score DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_sessions_finished_at ON sessions (finished_at)"
+)
+
+SESSION_COLUMNS = ('finished_at', 'score', 'accuracy', 'max_combo', 'level', 'duration_s', 'theme')
+LEADERBOARD_QUERY = (
+    "SELECT " + ", ".join(SESSION_COLUMNS) + " FROM sessions ORDER BY score DESC, finished_at ASC LIMIT ?"
+)
+INSERT_SESSION = (
+    "INSERT INTO sessions (" + ", ".join(SESSION_COLUMNS) + ") VALUES (" + ", ".join("?" * len(SESSION_COLUMNS)) + ")"
+)
+
+WRITER_BATCH_SIZE = 64  # Maximum sessions committed in one transaction
+_STOP = object()  # Queue sentinel telling the writer to finish
+
+
+class ScoreStore:
+    """High score and session store with a batching background writer."""
+
+    def __init__(self, path: str, leaderboard_size: int = 10):
+        self.path = path
+        self.leaderboard_size = leaderboard_size
+        self.enabled = True
+        self._queue: "queue.Queue[object]" = queue.Queue()
+        self._cache_lock = threading.Lock()
+        self._leaderboard: List[Dict[str, object]] = []
+        self.written_sessions = 0
+
+        try:
+            connection = self._connect()
+            try:
+                self._refresh_leaderboard(connection)
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            print(f"Warning: Could not open score database {path}: {e}. Scores will not be saved.")
+            self.enabled = False
+
+        self._writer = None
+        if self.enabled:
+            self._writer = threading.Thread(target=self._run_writer, name="score-store-writer", daemon=True)
+            self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.commit()
+        return connection
+
+    def _refresh_leaderboard(self, connection: sqlite3.Connection) -> None:
+        rows = connection.execute(LEADERBOARD_QUERY, (self.leaderboard_size,)).fetchall()
+        leaderboard = [dict(zip(SESSION_COLUMNS, row)) for row in rows]
+        with self._cache_lock:
+            self._leaderboard = leaderboard
+
+    # Queues a finished session; never blocks on disk
+    def record_session(self, score: int, accuracy: float, max_combo: int, level: int, duration_s: float,
+                       theme: str, finished_at: Optional[float] = None) -> None:
+        if not self.enabled:
+            return
+        finished_at = time.time() if finished_at is None else finished_at
+        self._queue.put((finished_at, int(score), float(accuracy), int(max_combo), int(level), float(duration_s), str(theme)))
+
+    def top_scores(self, limit: Optional[int] = None) -> List[Dict[str, object]]:
+        """Return the cached leaderboard, best first."""
+        with self._cache_lock:
+            leaderboard = self._leaderboard
+        return list(leaderboard if limit is None else leaderboard[:limit])
+
+    def high_score(self) -> int:
+        leaderboard = self.top_scores(1)
+        return int(leaderboard[0]['score']) if leaderboard else 0
+
+    def _run_writer(self) -> None:
+        try:
+            connection = self._connect()
+        except sqlite3.Error as e:
+            print(f"Warning: Score writer could not open {self.path}: {e}")
+            self.enabled = False
+            return
+
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            while len(batch) < WRITER_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = [item for item in batch if item is not _STOP]
+            stopping = len(rows) != len(batch)
+            if rows:
+                try:
+                    with connection:
+                        connection.executemany(INSERT_SESSION, rows)
+                    self.written_sessions += len(rows)
+                    self._refresh_leaderboard(connection)
+                except sqlite3.Error as e:
+                    print(f"Warning: Could not save {len(rows)} session(s): {e}")
+        connection.close()
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Flush queued sessions and stop the writer thread."""
+        if self._writer is None:
+            return
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+        self._writer = None
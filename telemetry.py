@@ -0,0 +1,166 @@
+"""Structured gameplay telemetry with a non-blocking writer.
+
+The game thread calls `Telemetry.emit`, which only stores a small tuple in a
+fixed-size ring buffer. A background thread drains the buffer and appends
+the records as JSON lines to size-rotated files. When the buffer is full
+new records are dropped and counted instead of waiting on the writer, so a
+slow disk can never stall the render loop.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+Record = Tuple[float, str, Dict[str, object]]
+
+
+class RingBuffer:
+    """Bounded single-producer/single-consumer queue.
+
+    The producer only advances ``head`` and the consumer only advances
+    ``tail``; each index has a single writer, so neither side takes a lock.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        self.capacity = capacity
+        self._slots: List[Optional[Record]] = [None] * capacity
+        self._head = 0  # Next slot to write, advanced by the producer
+        self._tail = 0  # Next slot to read, advanced by the consumer
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._head - self._tail
+
+    def push(self, record: Record) -> bool:
+        head = self._head
+        if head - self._tail >= self.capacity:
+            self.dropped += 1
+            return False
+        self._slots[head % self.capacity] = record
+        self._head = head + 1
+        return True
+
+    def drain(self, limit: Optional[int] = None) -> List[Record]:
+        tail = self._tail
+        available = self._head - tail
+        if limit is not None:
+            available = min(available, limit)
+        records = []
+        for index in range(tail, tail + available):
+            slot = index % self.capacity
+            records.append(self._slots[slot])
+            self._slots[slot] = None
+        self._tail = tail + available
+        return records
+
+
+class Telemetry:
+    """Emits gameplay events to rotated JSONL files from a background thread."""
+
+    def __init__(self, directory: str, enabled: bool = True, buffer_capacity: int = 4096,
+                 max_file_bytes: int = 1_000_000, backup_count: int = 5, flush_interval: float = 0.5,
+                 file_name: str = "telemetry.jsonl"):
+        self.enabled = enabled
+        self.directory = directory
+        self.path = os.path.join(directory, file_name)
+        self.max_file_bytes = max_file_bytes
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.buffer = RingBuffer(buffer_capacity)
+        self.session_id = f"{int(time.time() * 1000):x}"
+        self.emitted = 0
+        self.written = 0
+        self.write_errors = 0
+        self._file = None
+        self._stop = threading.Event()
+        self._thread = None
+
+        if not enabled:
+            return
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError as e:
+            print(f"Warning: Could not create telemetry directory {directory}: {e}. Telemetry disabled.")
+            self.enabled = False
+            return
+        self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self) -> int:
+        return self.buffer.dropped
+
+    # Records an event; called on the game thread and never blocks
+    def emit(self, event: str, **fields: object) -> None:
+        if not self.enabled:
+            return
+        self.emitted += 1
+        self.buffer.push((time.time(), event, fields))
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def flush(self) -> None:
+        """Write every buffered record; runs on the writer thread."""
+        records = self.buffer.drain()
+        if not records:
+            return
+        lines = []
+        for timestamp, event, fields in records:
+            record = {'t': round(timestamp, 4), 'session': self.session_id, 'event': event}
+            record.update(fields)
+            lines.append(json.dumps(record, separators=(',', ':'), default=str))
+        try:
+            for line in lines:
+                self._write_line(line + "\n")
+            self._file.flush()
+            self.written += len(lines)
+        except OSError as e:
+            self.write_errors += 1
+            print(f"Warning: Could not write telemetry: {e}")
+
+    def _write_line(self, line: str) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        if self._file.tell() + len(line) > self.max_file_bytes and self._file.tell() > 0:
+            self._rotate()
+        self._file.write(line)
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'emitted': self.emitted,
+            'written': self.written,
+            'dropped': self.dropped,
+            'buffered': len(self.buffer),
+            'write_errors': self.write_errors
+        }
+
+    def close(self, timeout: float = 2.0) -> None:
+        """Flush buffered records and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
@@ -1,21 +1,169 @@
-"""Lightweight pygame stub for unit tests."""
+"""Lightweight pygame stub for unit tests.
+
+Besides standing in for pygame, the stub counts what each frame asks of the
+renderer: ``draw.*`` calls by function, ``blit`` calls, ``font.render``
+calls, and surface allocations (``Surface``, ``copy``, transforms and image
+loads) with their pixel area. `counter` collects the counts; every
+``display.flip`` closes a frame, and `RenderCounter.frame` measures a block
+of code directly::
+
+    with counter.frame() as counts:
+        game.draw(screen)
+    self.assertEqual(counts.exceeds(surfaces=0, renders=12), {})
+
+Only the main thread is counted, so scenes rendered by worker threads do
+not show up in a frame's budget.
+"""
 from __future__ import annotations
 
+import collections
+import contextlib
 import sys
+import threading
 import types
-from typing import Any, Iterable, Tuple
+from typing import Any, Deque, Dict, Iterable, Iterator, Tuple
+
+FRAME_HISTORY = 600  # Closed frames kept by the counter
+
+
+class FrameCounts:
+    """Renderer work done during one frame."""
+
+    FIELDS = ('draw_calls', 'blits', 'renders', 'surfaces', 'surface_pixels')
+
+    def __init__(self) -> None:
+        self.draws: Dict[str, int] = collections.Counter()
+        self.blits = 0
+        self.renders = 0
+        self.surfaces = 0
+        self.surface_pixels = 0
+
+    @property
+    def draw_calls(self) -> int:
+        return sum(self.draws.values())
+
+    def exceeds(self, **limits: int) -> Dict[str, Tuple[int, int]]:
+        """Return ``{field: (count, limit)}`` for every field over its limit."""
+        over = {}
+        for name, limit in limits.items():
+            value = getattr(self, name) if name in self.FIELDS else self.draws.get(name, 0)
+            if value > limit:
+                over[name] = (value, limit)
+        return over
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)}" for name in self.FIELDS)
+        return f"FrameCounts({fields}, draws={dict(self.draws)})"
+
+
+class RenderCounter:
+    """Per-frame renderer counts recorded by the stub."""
+
+    def __init__(self) -> None:
+        self.current = FrameCounts()
+        self.frames: Deque[FrameCounts] = collections.deque(maxlen=FRAME_HISTORY)
+
+    def _counts(self) -> FrameCounts | None:
+        if threading.current_thread() is not threading.main_thread():
+            return None
+        return self.current
+
+    def draw(self, name: str) -> None:
+        counts = self._counts()
+        if counts is not None:
+            counts.draws[name] += 1
+
+    def blit(self) -> None:
+        counts = self._counts()
+        if counts is not None:
+            counts.blits += 1
+
+    def render(self) -> None:
+        counts = self._counts()
+        if counts is not None:
+            counts.renders += 1
+
+    def surface(self, size: Tuple[int, int]) -> None:
+        counts = self._counts()
+        if counts is not None:
+            counts.surfaces += 1
+            counts.surface_pixels += max(0, int(size[0])) * max(0, int(size[1]))
+
+    def end_frame(self) -> FrameCounts:
+        counts = self.current
+        self.frames.append(counts)
+        self.current = FrameCounts()
+        return counts
+
+    def reset(self) -> None:
+        self.current = FrameCounts()
+        self.frames.clear()
+
+    @contextlib.contextmanager
+    def frame(self) -> Iterator[FrameCounts]:
+        """Count the work done inside the block as one frame."""
+        self.current = counts = FrameCounts()
+        try:
+            yield counts
+        finally:
+            if self.current is counts:
+                self.end_frame()
+
+
+counter = RenderCounter()
+
+
+def _size_of(args: tuple) -> Tuple[int, int, int, int]:
+    if len(args) == 4:
+        return tuple(int(value) for value in args)
+    if len(args) == 2:
+        (x, y), (width, height) = args
+        return int(x), int(y), int(width), int(height)
+    value = args[0]
+    if isinstance(value, _Rect):
+        return value.x, value.y, value.width, value.height
+    return _size_of(tuple(value))
 
 
 class _Rect:
-    def __init__(self, x: int, y: int, width: int, height: int) -> None:
-        self.x = x
-        self.y = y
-        self.width = width
-        self.height = height
+    def __init__(self, *args: Any) -> None:
+        self.x, self.y, self.width, self.height = _size_of(args)
+
+    @property
+    def left(self) -> int:
+        return self.x
+
+    @property
+    def top(self) -> int:
+        return self.y
+
+    @property
+    def right(self) -> int:
+        return self.x + self.width
+
+    @property
+    def bottom(self) -> int:
+        return self.y + self.height
+
+    @property
+    def w(self) -> int:
+        return self.width
+
+    @property
+    def h(self) -> int:
+        return self.height
+
+    @property
+    def centerx(self) -> int:
+        return self.x + self.width // 2
+
+    @property
+    def centery(self) -> int:
+        return self.y + self.height // 2
 
     @property
     def center(self) -> Tuple[int, int]:
-        return (self.x + self.width // 2, self.y + self.height // 2)
+        return (self.centerx, self.centery)
 
     @center.setter
     def center(self, value: Tuple[int, int]) -> None:
@@ -23,26 +171,95 @@ class _Rect:
         self.x = cx - self.width // 2
         self.y = cy - self.height // 2
 
-    def collidepoint(self, pos: Tuple[int, int]) -> bool:
-        px, py = pos
+    @property
+    def topleft(self) -> Tuple[int, int]:
+        return self.x, self.y
+
+    @topleft.setter
+    def topleft(self, value: Tuple[int, int]) -> None:
+        self.x, self.y = value
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    def copy(self) -> "_Rect":
+        return _Rect(self.x, self.y, self.width, self.height)
+
+    def move(self, dx: int, dy: int) -> "_Rect":
+        return _Rect(self.x + dx, self.y + dy, self.width, self.height)
+
+    def inflate(self, dx: int, dy: int) -> "_Rect":
+        return _Rect(self.x - dx // 2, self.y - dy // 2, self.width + dx, self.height + dy)
+
+    def collidepoint(self, *pos: Any) -> bool:
+        px, py = pos[0] if len(pos) == 1 else pos
         return self.x <= px <= self.x + self.width and self.y <= py <= self.y + self.height
 
+    def __iter__(self) -> Iterator[int]:
+        return iter((self.x, self.y, self.width, self.height))
+
+    def __len__(self) -> int:
+        return 4
+
+    def __getitem__(self, index: int) -> int:
+        return (self.x, self.y, self.width, self.height)[index]
+
+    def __eq__(self, other: Any) -> bool:
+        try:
+            return tuple(self) == tuple(other)
+        except TypeError:
+            return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        return f"<rect({self.x}, {self.y}, {self.width}, {self.height})>"
+
 
 class _Surface:
-    def __init__(self, size: Tuple[int, int], flags: int | None = None) -> None:
-        self.width, self.height = size
+    def __init__(self, size: Tuple[int, int], flags: int | None = None, counted: bool = True) -> None:
+        self.width, self.height = (int(value) for value in size)
         self.flags = flags
         self.alpha = 255
+        self.clip = None
+        self.pixels: bytearray | None = None  # 32-bit pixels, allocated on first get_buffer
+        if counted:
+            counter.surface(size)
 
-    def fill(self, color: Iterable[int]) -> None:
+    def fill(self, color: Iterable[int], rect: Any = None) -> None:
         pass
 
-    def blit(self, source: Any, dest: Any) -> None:
-        pass
+    def blit(self, source: Any, dest: Any, area: Any = None, special_flags: int = 0) -> None:
+        counter.blit()
+
+    def copy(self) -> "_Surface":
+        return _Surface(self.get_size(), self.flags)
 
     def get_width(self) -> int:
         return self.width
 
+    def get_size(self) -> Tuple[int, int]:
+        return self.width, self.height
+
+    def get_bytesize(self) -> int:
+        return 4
+
+    def get_pitch(self) -> int:
+        return self.width * 4
+
+    def get_shifts(self) -> Tuple[int, int, int, int]:
+        return 16, 8, 0, 24
+
+    def get_masks(self) -> Tuple[int, int, int, int]:
+        return 0xFF0000, 0xFF00, 0xFF, 0xFF000000
+
+    def get_buffer(self) -> memoryview:
+        if self.pixels is None:
+            self.pixels = bytearray(self.get_pitch() * self.height)
+        return memoryview(self.pixels)
+
     def get_height(self) -> int:
         return self.height
 
@@ -54,27 +271,36 @@ class _Surface:
             rect.x, rect.y = kwargs["topleft"]
         return rect
 
+    def set_clip(self, rect: Any = None) -> None:
+        self.clip = rect
+
     def set_alpha(self, value: int) -> None:
         self.alpha = value
 
     def convert_alpha(self) -> "_Surface":
         return self
 
+    def convert(self) -> "_Surface":
+        return self
+
 
 class _Font:
     def __init__(self, _file: Any, size: int) -> None:
         self._size = max(size, 1)
 
-    def render(self, text: str, _antialias: bool, _color: Iterable[int]) -> _Surface:
-        width = self._size * max(len(text), 1) // 2
-        height = self._size
-        return _Surface((width, height))
+    def render(self, text: str, _antialias: bool, _color: Iterable[int], _background: Any = None) -> _Surface:
+        counter.render()
+        width, height = self.size(text)
+        return _Surface((width, height), counted=False)  # Counted as a render, not an allocation
 
     def size(self, text: str) -> Tuple[int, int]:
         width = self._size * max(len(text), 1) // 2
         height = self._size
         return width, height
 
+    def get_linesize(self) -> int:
+        return self._size + 2
+
 
 class _Sound:
     def __init__(self, _path: str) -> None:
@@ -87,11 +313,58 @@ class _Sound:
         pass
 
 
+class _Channel:
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.sound = None
+        self.volume = 1.0
+
+    def play(self, sound: _Sound, loops: int = 0) -> None:
+        self.sound = sound
+
+    def stop(self) -> None:
+        self.sound = None
+
+    def get_busy(self) -> bool:
+        return self.sound is not None
+
+    def set_volume(self, volume: float) -> None:
+        self.volume = volume
+
+
 class _Clock:
     def tick(self, _framerate: int) -> int:
         return 16
 
 
+class _Event:
+    def __init__(self, event_type: int, **attributes: Any) -> None:
+        self.type = event_type
+        self.__dict__.update(attributes)
+
+
+def _counted_draw(name: str):
+    def draw(*_args: Any, **_kwargs: Any) -> _Rect:
+        counter.draw(name)
+        return _Rect(0, 0, 0, 0)
+    return staticmethod(draw)
+
+
+def _transformed(surface: Any, size: Tuple[int, int], *_args: Any) -> _Surface:
+    return _Surface(size)
+
+
+def _from_buffer(buffer: Any, size: Tuple[int, int], pixel_format: str) -> _Surface:
+    if len(buffer) != size[0] * size[1] * len(pixel_format):
+        raise ValueError("Buffer length does not equal format and resolution size")
+    return _Surface(size)
+
+
+def is_installed() -> bool:
+    """Whether ``import pygame`` resolves to this stub rather than real pygame."""
+    return getattr(sys.modules.get("pygame"), "Surface", None) is _Surface
+
+
 def install() -> types.ModuleType:
     """Install the pygame stub if the real dependency is unavailable."""
     if "pygame" in sys.modules:
@@ -99,14 +372,20 @@ def install() -> types.ModuleType:
 
     pygame = types.ModuleType("pygame")
     pygame.SRCALPHA = 1
+    pygame.RESIZABLE = 16
     pygame.QUIT = 12
     pygame.MOUSEBUTTONDOWN = 5
     pygame.MOUSEMOTION = 6
+    pygame.MOUSEWHEEL = 7
+    pygame.VIDEORESIZE = 8
     pygame.KEYDOWN = 2
+    pygame.WINDOWFOCUSLOST = 32785
     pygame.K_LEFT = 1073741904
     pygame.K_RIGHT = 1073741903
     pygame.K_SPACE = 32
     pygame.K_RETURN = 13
+    pygame.K_F9 = 1073741890
+    pygame.K_r = 114
     pygame.error = type("error", (Exception,), {})
 
     pygame.Rect = _Rect
@@ -121,21 +400,36 @@ def install() -> types.ModuleType:
     pygame.font = font_module
 
     display_module = types.ModuleType("pygame.display")
-    display_module.set_mode = lambda size: _Surface(size)
+    display_state = {'surface': None}
+
+    def set_mode(size: Tuple[int, int], _flags: int = 0) -> _Surface:
+        display_state['surface'] = _Surface(size)
+        return display_state['surface']
+
+    def flip() -> None:
+        if threading.current_thread() is threading.main_thread():
+            counter.end_frame()
+
+    display_module.set_mode = set_mode
+    display_module.get_surface = lambda: display_state['surface']
     display_module.set_caption = lambda _title: None
-    display_module.flip = lambda: None
+    display_module.flip = flip
     pygame.display = display_module
 
     mixer_module = types.ModuleType("pygame.mixer")
     mixer_module.Sound = _Sound
+    mixer_module.Channel = _Channel
+    mixer_module.pre_init = staticmethod(lambda *args, **kwargs: None)
+    mixer_module.get_init = staticmethod(lambda: (44100, -16, 2))
+    mixer_module.set_num_channels = staticmethod(lambda _count: None)
+    mixer_module.set_reserved = staticmethod(lambda _count: _count)
     mixer_module.pause = staticmethod(lambda: None)
     mixer_module.unpause = staticmethod(lambda: None)
     pygame.mixer = mixer_module
 
     draw_module = types.ModuleType("pygame.draw")
-    draw_module.rect = staticmethod(lambda *args, **kwargs: None)
-    draw_module.circle = staticmethod(lambda *args, **kwargs: None)
-    draw_module.line = staticmethod(lambda *args, **kwargs: None)
+    for name in ("rect", "circle", "line", "polygon", "ellipse", "lines", "arc"):
+        setattr(draw_module, name, _counted_draw(name))
     pygame.draw = draw_module
 
     time_module = types.ModuleType("pygame.time")
@@ -144,15 +438,21 @@ def install() -> types.ModuleType:
     pygame.time = time_module
 
     transform_module = types.ModuleType("pygame.transform")
-    transform_module.scale = staticmethod(lambda surface, size: _Surface(size))
+    transform_module.scale = staticmethod(_transformed)
+    transform_module.smoothscale = staticmethod(_transformed)
     pygame.transform = transform_module
 
     event_module = types.ModuleType("pygame.event")
+    event_module.Event = _Event
     event_module.get = staticmethod(lambda: [])
+    event_module.post = staticmethod(lambda _event: None)
     pygame.event = event_module
 
     image_module = types.ModuleType("pygame.image")
-    image_module.load = staticmethod(lambda _path: _Surface((100, 100)))
+    image_module.load = staticmethod(lambda _file, *_name_hint: _Surface((100, 100)))
+    image_module.frombuffer = staticmethod(_from_buffer)
+    image_module.tobytes = staticmethod(lambda surface, pixel_format: bytes(surface.get_width() * surface.get_height()
+                                                                            * len(pixel_format)))
     pygame.image = image_module
 
     sys.modules["pygame"] = pygame
@@ -168,4 +468,4 @@ def install() -> types.ModuleType:
     return pygame
 
 
-__all__ = ["install"]
+__all__ = ["FrameCounts", "RenderCounter", "counter", "install", "is_installed"]
@@ -0,0 +1,99 @@
+"""Tests for the packed asset bundle."""
+from __future__ import annotations
+
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+from unittest import mock
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.pygame_stub import install as install_pygame_stub, is_installed
+
+install_pygame_stub()
+
+from asset_pack import ENCODING_RAW, ENCODING_RGBA, AssetPack, build_pack
+from headless import load_game_module
+
+game_module = load_game_module()
+
+
+class AssetPackTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        source = os.path.join(self.tmp.name, "assets")
+        os.makedirs(os.path.join(source, "music"))
+        with open(os.path.join(source, "font.ttf"), "wb") as f:
+            f.write(b"font-bytes")
+        with open(os.path.join(source, "music", "click.mp3"), "wb") as f:
+            f.write(bytes(range(256)) * 20)
+        self.pack_path = os.path.join(self.tmp.name, "assets.pack")
+        build_pack(source, self.pack_path, alignment=64)
+        self.pack = AssetPack(self.pack_path)
+
+    def tearDown(self) -> None:
+        self.pack.close()
+        self.tmp.cleanup()
+
+    def test_entries_are_aligned_and_named_like_paths(self) -> None:
+        self.assertEqual(self.pack.names(), ["assets/font.ttf", "assets/music/click.mp3"])
+        self.assertIn(os.path.join("assets", "music", "click.mp3"), self.pack)
+        for name in self.pack.names():
+            self.assertEqual(self.pack.entry(name)['offset'] % 64, 0)
+        self.assertEqual(self.pack.read("assets/font.ttf"), b"font-bytes")
+
+    def test_packed_file_reads_and_seeks(self) -> None:
+        packed = self.pack.open("assets/music/click.mp3")
+        self.assertEqual(packed.read(4), bytes([0, 1, 2, 3]))
+        packed.seek(-2, io.SEEK_END)
+        self.assertEqual(packed.tell(), 5118)
+        self.assertEqual(packed.read(), bytes([254, 255]))
+        self.assertEqual(packed.read(1), b"")
+        packed.close()
+
+    def test_missing_entry_and_bad_file(self) -> None:
+        with self.assertRaises(KeyError):
+            self.pack.open("assets/missing.png")
+        bogus = os.path.join(self.tmp.name, "bogus.pack")
+        with open(bogus, "wb") as f:
+            f.write(b"not a pack at all, just some bytes")
+        with self.assertRaises(ValueError):
+            AssetPack(bogus)
+
+
+@unittest.skipUnless(is_installed(), "real pygame was imported before the stub")
+class PackedImageTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        source = os.path.join(self.tmp.name, "assets")
+        os.makedirs(os.path.join(source, "images"))
+        for name in ("sky.png", "notes.txt"):
+            with open(os.path.join(source, "images", name), "wb") as f:
+                f.write(b"encoded")
+        self.pack_path = os.path.join(self.tmp.name, "assets.pack")
+        build_pack(source, self.pack_path, decode_images=True)
+        self.pack = AssetPack(self.pack_path)
+
+    def tearDown(self) -> None:
+        self.pack.close()
+        self.tmp.cleanup()
+
+    def test_decoded_images_load_without_decoding(self) -> None:
+        entry = self.pack.entry("assets/images/sky.png")
+        self.assertEqual((entry['encoding'], entry['width'], entry['height']), (ENCODING_RGBA, 100, 100))
+        self.assertEqual(entry['size'], 100 * 100 * 4)
+        self.assertEqual(self.pack.entry("assets/images/notes.txt")['encoding'], ENCODING_RAW)
+
+        pygame = game_module.pygame
+        with mock.patch.object(game_module, "ASSET_PACK", self.pack), \
+                mock.patch.object(pygame.image, "load", side_effect=AssertionError("decoded again")):
+            surface = game_module.load_image(os.path.join("assets", "images", "sky.png"))
+        self.assertEqual(surface.get_size(), (100, 100))
+
+
+if __name__ == "__main__":
+    unittest.main()
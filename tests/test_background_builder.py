@@ -0,0 +1,49 @@
+"""Tests for BackgroundBuilder, which renders theme scenes on a worker thread."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.pygame_stub import install as install_pygame_stub, is_installed
+
+install_pygame_stub()
+
+from headless import load_game_module
+
+game_module = load_game_module()
+BackgroundBuilder = game_module.BackgroundBuilder
+
+
+@unittest.skipUnless(is_installed(), "real pygame was imported before the stub")
+class BackgroundBuilderTests(unittest.TestCase):
+    themes = [game_module.LIGHT_THEME, game_module.DARK_THEME, game_module.LIQUID_GLASS_THEME]
+
+    def test_latest_request_builds_every_theme(self) -> None:
+        builder = BackgroundBuilder()
+        try:
+            builder.request((800, 600), self.themes, 40, 200)
+            builder.request((1024, 768), self.themes, 40, 260, [(300, 200)])
+            self.assertTrue(builder.wait("GLASS"))
+            scenes = builder.collect()
+            self.assertEqual(sorted(scenes), ["DARK", "GLASS", "LIGHT"])
+            self.assertEqual(scenes["DARK"]["background"].get_size(), (1024, 768))
+            self.assertEqual(list(scenes["DARK"]["panels"]), [(300, 200)])
+            self.assertGreater(game_module.theme_scene_bytes(scenes["DARK"]), 1024 * 768)
+            self.assertEqual(builder.collect(), {})
+        finally:
+            builder.close()
+
+    def test_stale_scenes_are_discarded(self) -> None:
+        builder = BackgroundBuilder(threaded=False)
+        builder.request((800, 600), self.themes[:1], 40, 200)
+        builder.generation += 1  # A newer request is still in flight
+        self.assertEqual(builder.collect(), {})
+        self.assertEqual(builder.discarded, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
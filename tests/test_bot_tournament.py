@@ -0,0 +1,43 @@
+"""Tests for the headless bot tournament."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+import bot_tournament
+from bot_tournament import BotProfile, parse_bot, run_tournament
+from config_validator import DEFAULT_GAME_SETTINGS
+
+
+class ParseBotTests(unittest.TestCase):
+    def test_preset_lookup(self) -> None:
+        self.assertIs(parse_bot("perfect"), bot_tournament.BOT_PRESETS["perfect"])
+
+    def test_custom_spec(self) -> None:
+        bot = parse_bot("slow:400:0.2:50")
+        self.assertEqual((bot.name, bot.reaction_ms, bot.error_rate, bot.reaction_jitter_ms), ("slow", 400.0, 0.2, 50.0))
+
+    def test_invalid_error_rate(self) -> None:
+        with self.assertRaises(ValueError):
+            BotProfile("broken", error_rate=1.5)
+
+
+@unittest.skipIf(bot_tournament.np is None, "NumPy is not installed")
+class TournamentTests(unittest.TestCase):
+    def test_perfect_and_error_bots(self) -> None:
+        candidates = [("default", dict(DEFAULT_GAME_SETTINGS))]
+        bots = [parse_bot("perfect"), BotProfile("sloppy", error_rate=0.5)]
+        report = run_tournament(candidates, bots, games=40, workers=1, seed=1)
+        perfect, sloppy = report["results"]
+        self.assertEqual(perfect["games"], 40)
+        self.assertEqual(perfect["accuracy"]["mean"], 100.0)
+        self.assertLess(sloppy["accuracy"]["mean"], 100.0)
+        self.assertEqual(sum(perfect["level_histogram"].values()), 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
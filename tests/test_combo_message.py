@@ -0,0 +1,41 @@
+"""Tests for ComboMessage's shared, pre-rendered keyframes."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.pygame_stub import install as install_pygame_stub, is_installed
+
+install_pygame_stub()
+
+from headless import load_game_module
+
+game_module = load_game_module()
+ComboMessage = game_module.ComboMessage
+pygame = game_module.pygame
+
+
+@unittest.skipUnless(is_installed(), "real pygame was imported before the stub")
+class ComboMessageTests(unittest.TestCase):
+    def test_keyframes_are_shared_between_messages(self) -> None:
+        first = ComboMessage("COMBO x2!", (255, 215, 0), 1.5, 56)
+        second = ComboMessage("COMBO x2!", (255, 215, 0), 1.5, 56)
+        self.assertIs(first.frames, second.frames)
+        self.assertEqual(len(first.frames), game_module.COMBO_KEYFRAMES)
+        self.assertGreater(first.frames[-1].get_width(), first.frames[0].get_width())
+
+    def test_playback_follows_simulation_time(self) -> None:
+        message = ComboMessage("COMBO x3!", (255, 255, 255), 1.0, 48)
+        message.update(0.5)
+        self.assertAlmostEqual(message.alpha, 127.5)
+        message.draw(pygame.Surface((800, 600)))
+        message.update(0.5)
+        self.assertTrue(message.should_remove())
+
+
+if __name__ == "__main__":
+    unittest.main()
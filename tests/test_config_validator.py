@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import importlib.util
+import random
 import sys
 from pathlib import Path
 import unittest
@@ -9,6 +10,7 @@ import unittest
 project_root = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(project_root))
 
+from game_state import GameState
 from tests.pygame_stub import install as install_pygame_stub
 
 
@@ -26,6 +28,81 @@ calculate_accuracy = train_module.calculate_accuracy
 pygame = sys.modules["pygame"]
 
 
+class GameSettingsValidationTests(unittest.TestCase):
+    def test_train_counts_must_be_whole_numbers(self) -> None:
+        game = ConfigValidator.validate_game_settings({"game": {"level_train_step": 1.5, "initial_max_trains": True,
+                                                                "max_trains_cap": 12, "initial_train_speed": 2.5,
+                                                                "level_speed_step": False}})
+        self.assertEqual((game["level_train_step"], game["initial_max_trains"]), (2, 10))
+        self.assertEqual((game["max_trains_cap"], game["initial_train_speed"]), (12, 2.5))
+        self.assertEqual(game["level_speed_step"], 1)
+
+    def test_validated_settings_survive_level_up(self) -> None:
+        game = ConfigValidator.validate_game_settings({"game": {"level_train_step": 1.5, "initial_max_trains": 3.0,
+                                                                "level_speed_step": 0.5}})
+        state = GameState(game, rng=random.Random(1))
+        state.level_up()
+        self.assertEqual((state.level, state.max_trains, state.train_speed), (2, 12, 5.5))
+        self.assertEqual(len(state.track_colors), 12)
+
+
+class AudioValidationTests(unittest.TestCase):
+    def test_buffer_size_must_be_power_of_two(self) -> None:
+        validated = ConfigValidator.validate_audio({"audio": {"buffer_size": 300, "ui_channels": 0}})
+        self.assertEqual(validated["buffer_size"], 256)
+        self.assertEqual(validated["ui_channels"], 4)
+
+    def test_invalid_voice_limits_are_dropped(self) -> None:
+        validated = ConfigValidator.validate_audio({"audio": {"buffer_size": 512, "voice_limits": {"click": 5, "wrong": "x"}}})
+        self.assertEqual(validated["buffer_size"], 512)
+        self.assertEqual(validated["voice_limits"]["click"], 5)
+        self.assertNotIn("wrong", validated["voice_limits"])
+
+
+class VisualValidationTests(unittest.TestCase):
+    def test_star_count_is_bounded(self) -> None:
+        self.assertEqual(ConfigValidator.validate_visual({"visual": {"star_count": 3000}})["star_count"], 3000)
+        self.assertEqual(ConfigValidator.validate_visual({"visual": {"star_count": -1}})["star_count"], 50)
+
+    def test_inverted_glow_range_falls_back_to_defaults(self) -> None:
+        visual = ConfigValidator.validate_visual({"visual": {"glow_min": 120, "glow_max": 60}})
+        self.assertEqual((visual["glow_min"], visual["glow_max"]), (20, 100))
+
+
+class ParticleValidationTests(unittest.TestCase):
+    def test_inverted_ranges_fall_back_to_defaults(self) -> None:
+        particles = ConfigValidator.validate_particles({"particles": {"size_min": 9, "size_max": 3, "smoke_emission_chance": 2}})
+        self.assertEqual((particles["size_min"], particles["size_max"]), (4, 8))
+        self.assertEqual(particles["smoke_emission_chance"], 0.3)
+        self.assertEqual(ConfigValidator.validate_particles({"particles": {"budget": 0}})["budget"], 600)
+
+
+class QualityValidationTests(unittest.TestCase):
+    def test_unknown_quality_preset_means_auto(self) -> None:
+        quality = ConfigValidator.validate_quality({"quality": {"preset": "cinematic", "target_fps": 144}})
+        self.assertEqual(quality, {"preset": "auto", "target_fps": 144})
+
+
+class RecordingValidationTests(unittest.TestCase):
+    def test_recording_settings_fall_back_to_defaults(self) -> None:
+        recording = ConfigValidator.validate_recording({"recording": {"format": "gif", "scale": 2, "workers": 0,
+                                                                      "queue_size": 8}})
+        self.assertEqual(recording, {"directory": "recordings", "format": "png", "scale": 0.5, "queue_size": 8,
+                                     "workers": 2})
+
+
+class ReplayValidationTests(unittest.TestCase):
+    def test_replay_settings_fall_back_to_defaults(self) -> None:
+        replay = ConfigValidator.validate_replay({"replay": {"enabled": "yes", "seconds": 0, "budget_ms": 0.5}})
+        self.assertEqual((replay["enabled"], replay["seconds"], replay["budget_ms"]), (True, 10, 0.5))
+
+
+class SaveValidationTests(unittest.TestCase):
+    def test_save_path_must_be_a_non_empty_string(self) -> None:
+        self.assertEqual(ConfigValidator.validate_save({"save": {"enabled": False, "path": ""}}),
+                         {"enabled": False, "path": "savegame.bin"})
+
+
 class ValidateColorTests(unittest.TestCase):
     def test_invalid_color_types(self) -> None:
         self.assertFalse(ConfigValidator.validate_color("not-a-color"))
@@ -43,6 +120,11 @@ class WindowValidationTests(unittest.TestCase):
         self.assertEqual(validated["width"], 1280)
         self.assertEqual(validated["height"], 720)
         self.assertEqual(validated["title"], "Train Color Matching Game")
+        self.assertEqual(validated["render_scale"], 1.0)
+
+    def test_render_scale_out_of_range_falls_back(self) -> None:
+        self.assertEqual(ConfigValidator.validate_window({"window": {"render_scale": 0.1}})["render_scale"], 1.0)
+        self.assertEqual(ConfigValidator.validate_window({"window": {"render_scale": 0.75}})["render_scale"], 0.75)
 
     def test_window_preserves_valid_values(self) -> None:
         config = {"window": {"width": 1366, "height": 768, "title": "Custom"}}
@@ -0,0 +1,110 @@
+"""Tests for the pygame-free game rules model."""
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+import game_state
+from game_state import (
+    BatchGameState,
+    GameState,
+    EVENT_CORRECT,
+    EVENT_GAME_OVER,
+    EVENT_LEVEL_UP,
+    EVENT_NO_TRAINS,
+    EVENT_WRONG,
+    NO_ACTION,
+    OUTCOME_CORRECT,
+    OUTCOME_WRONG,
+)
+
+
+def play_perfect_game(state: GameState) -> None:
+    while not state.game_over:
+        state.step(state.current_color)
+
+
+class GameStateRuleTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.state = GameState(rng=random.Random(7))
+
+    def test_correct_match_scores_and_starts_train(self) -> None:
+        color = self.state.current_color
+        self.assertEqual(self.state.match(color), EVENT_CORRECT)
+        self.assertEqual(self.state.score, 1)
+        self.assertEqual(self.state.combo_count, 1)
+        self.assertTrue(self.state.moving[0])
+        self.assertEqual(self.state.remaining_trains, 9)
+
+    def test_wrong_match_resets_combo(self) -> None:
+        self.state.match(self.state.current_color)
+        wrong = (self.state.current_color + 1) % game_state.COLOR_COUNT
+        self.assertEqual(self.state.match(wrong), EVENT_WRONG)
+        self.assertEqual(self.state.combo_count, 0)
+        self.assertEqual(self.state.max_combo, 1)
+        self.assertEqual(self.state.incorrect_matches, 1)
+
+    def test_level_up_after_threshold(self) -> None:
+        events = []
+        for _ in range(5):
+            events.extend(self.state.step(self.state.current_color))
+        self.assertIn(EVENT_LEVEL_UP, events)
+        self.assertEqual(self.state.level, 2)
+        self.assertEqual(self.state.train_speed, 6)
+        self.assertEqual(len(self.state.track_colors), 12)
+
+    def test_departing_train_stops_outside_bounds(self) -> None:
+        self.state.match(self.state.current_color)
+        for _ in range(100):
+            self.state.advance()
+        self.assertFalse(self.state.moving[0])
+        self.assertLess(self.state.track_x[0] + self.state.train_width, 0)
+
+    def test_perfect_game_ends(self) -> None:
+        play_perfect_game(self.state)
+        self.assertTrue(self.state.game_over)
+        self.assertEqual(self.state.incorrect_matches, 0)
+        self.assertEqual(self.state.step(0), [])
+
+    def test_no_trains_left(self) -> None:
+        state = GameState({'initial_max_trains': 1, 'level_up_threshold': 50}, rng=random.Random(1))
+        state.match(state.current_color)
+        self.assertEqual(state.match(0), EVENT_NO_TRAINS)
+        events = []
+        while not state.game_over:
+            events.extend(state.advance())
+        self.assertEqual(events, [EVENT_GAME_OVER])
+
+
+@unittest.skipIf(game_state.np is None, "NumPy is not installed")
+class BatchGameStateTests(unittest.TestCase):
+    def test_matches_scalar_rules_for_perfect_players(self) -> None:
+        scalar = GameState(rng=random.Random(3))
+        play_perfect_game(scalar)
+
+        batch = BatchGameState(64, seed=3)
+        while batch.active.any():
+            batch.step(batch.current_color)
+        self.assertTrue((batch.score == scalar.score).all())
+        self.assertTrue((batch.level == scalar.level).all())
+        self.assertTrue((batch.frames == scalar.frame).all())
+
+    def test_outcomes_and_idle_games(self) -> None:
+        batch = BatchGameState(3, seed=5)
+        current = batch.current_color
+        wrong = (current + 1) % game_state.COLOR_COUNT
+        actions = [current[0], wrong[1], NO_ACTION]
+        outcomes = batch.step(actions)
+        self.assertEqual(list(outcomes[:2]), [OUTCOME_CORRECT, OUTCOME_WRONG])
+        self.assertEqual(list(batch.score), [1, 0, 0])
+        self.assertEqual(list(batch.incorrect_matches), [0, 1, 0])
+        self.assertEqual(list(batch.accuracy), [100.0, 0.0, 0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
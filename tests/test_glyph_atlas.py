@@ -0,0 +1,43 @@
+"""Tests for GlyphAtlas, which composes HUD counters from cached glyphs."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.pygame_stub import install as install_pygame_stub, is_installed
+
+install_pygame_stub()
+
+from headless import load_game_module
+
+game_module = load_game_module()
+GlyphAtlas = game_module.GlyphAtlas
+pygame = game_module.pygame
+
+
+@unittest.skipUnless(is_installed(), "real pygame was imported before the stub")
+class GlyphAtlasTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.atlas = GlyphAtlas(pygame.font.Font(None, 16), (255, 255, 255))
+
+    def test_counters_compose_from_cached_glyphs(self) -> None:
+        width = self.atlas.draw(pygame.Surface((300, 40)), (0, 0), "Combo: x{} (Best x{})", 12, 40)
+        self.assertEqual(width, 8 * len("Combo: x12 (Best x40)"))  # Stub glyphs are 8 px wide
+        self.assertEqual(set(self.atlas.labels), {"Combo: x", " (Best x", ")"})
+
+    def test_unchanged_values_reuse_the_composed_line(self) -> None:
+        first = self.atlas.line("Score: {}", (7,))
+        self.assertIs(self.atlas.line("Score: {}", (7,)), first)
+        self.assertIsNot(self.atlas.line("Score: {}", (8,)), first)
+
+    def test_values_outside_the_atlas_are_rendered_as_labels(self) -> None:
+        self.atlas.line("Theme: {}", ("DARK",))
+        self.assertIn("DARK", self.atlas.labels)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Tests for the golden-frame comparison and the stored golden frames."""
+from __future__ import annotations
+
+import importlib.machinery
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from golden_frames import BATCH_FRAMES, compare_batch, compare_frames, diff_heatmap
+
+REAL_PYGAME = importlib.machinery.PathFinder.find_spec("pygame") is not None
+
+
+def frame(value: int = 100, size=(40, 30)) -> np.ndarray:
+    return np.full(size + (3,), value, dtype=np.uint8)
+
+
+class GoldenComparisonTests(unittest.TestCase):
+    def test_tolerance_is_per_channel(self) -> None:
+        expected = np.stack([frame(), frame()])
+        actual = expected.copy()
+        actual[0, 5, 5, 1] += 8  # Within the tolerance
+        actual[1, 5, 5, 2] -= 9
+        actual[1, 6, 5] = 0
+        mismatched, max_delta = compare_batch(actual, expected, tolerance=8)
+        self.assertEqual(mismatched.tolist(), [0, 2])
+        self.assertEqual(max_delta.tolist(), [8, 100])
+
+    def test_frames_of_several_sizes_and_batches(self) -> None:
+        count = BATCH_FRAMES + 3
+        names = [f"frame{index}" for index in range(count)] + ["small"]
+        expected = [frame() for _ in range(count)] + [frame(size=(8, 8))]
+        actual = [golden.copy() for golden in expected]
+        actual[BATCH_FRAMES + 1][0, 0] = 255
+        results = compare_frames(names, actual, expected)
+        self.assertEqual([result.name for result in results if not result.passed], [f"frame{BATCH_FRAMES + 1}"])
+        self.assertTrue(results[-1].passed)
+        with self.assertRaises(ValueError):
+            compare_frames(["bad"], [frame()], [frame(size=(8, 8))])
+
+    def test_heatmap_marks_only_differences(self) -> None:
+        expected = frame(90)
+        actual = expected.copy()
+        actual[3, 4] = (250, 90, 90)
+        heatmap = diff_heatmap(actual, expected)
+        self.assertEqual(tuple(heatmap[3, 4]), (255, 0, 0))
+        self.assertEqual(tuple(heatmap[0, 0]), (30, 30, 30))
+
+
+@unittest.skipUnless(REAL_PYGAME, "pygame is not installed")
+class GoldenFrameTests(unittest.TestCase):
+    def test_canonical_frames_match_the_goldens(self) -> None:
+        with tempfile.TemporaryDirectory() as diff_dir:
+            result = subprocess.run([sys.executable, str(project_root / "golden_frames.py"), "--diff-dir", diff_dir],
+                                    capture_output=True, text=True, cwd=project_root, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stdout + result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
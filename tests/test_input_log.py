@@ -0,0 +1,201 @@
+"""Tests for the input log format and headless session replay."""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.pygame_stub import install as install_pygame_stub, is_installed
+
+install_pygame_stub()
+
+from headless import load_game_module
+from input_log import (HEADER, MATCH_CORRECT, MATCH_WRONG, RECORD_CLICK, RECORD_DEAL, RECORD_END, RECORD_KEY,
+                       RECORD_MATCH, RECORD_RESUME, RECORD_WHEEL, InputLogReader, InputLogWriter, encode_varint,
+                       unzigzag, zigzag)
+from replay_session import replay
+
+game_module = load_game_module()
+
+
+class InputLogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.path = os.path.join(tempfile.mkdtemp(), "session.tcmi")
+
+    def write_session(self, frames: int = 5000, interval: int = 600) -> InputLogWriter:
+        writer = InputLogWriter(self.path, (1280, 720), checkpoint_interval=interval)
+        writer.deal(0, [0, 1, 2])
+        writer.resume(0, bytes(range(256)) * 2)
+        for frame in range(0, frames, 7):
+            writer.click(frame, frame % 1280, 533)
+            writer.match(frame, MATCH_CORRECT if frame % 2 else MATCH_WRONG, frame % 3)
+        writer.key(frames, 32)
+        writer.wheel(frames, -3)
+        return writer
+
+    def test_varints_and_zigzag(self) -> None:
+        self.assertEqual(encode_varint(0), b"\x00")
+        self.assertEqual(encode_varint(127), b"\x7f")
+        self.assertEqual(encode_varint(300), b"\xac\x02")
+        with self.assertRaises(ValueError):
+            encode_varint(-1)
+        for value in (0, 1, -1, 2, -2, 1000, -1000):
+            self.assertEqual(unzigzag(zigzag(value)), value)
+        self.assertEqual([zigzag(value) for value in (0, -1, 1, -2)], [0, 1, 2, 3])
+
+    def test_round_trip_and_size(self) -> None:
+        writer = self.write_session()
+        writer.close(5001)
+        reader = InputLogReader(self.path)
+        self.assertTrue(reader.complete)
+        self.assertEqual(reader.size, (1280, 720))
+        self.assertEqual(reader.end_frame, 5001)
+        records = list(reader)
+        self.assertEqual(records[0].kind, RECORD_DEAL)
+        self.assertEqual(records[0].values, (0, 1, 2))
+        self.assertEqual(records[1].kind, RECORD_RESUME)
+        self.assertEqual(records[1].values, (bytes(range(256)) * 2,))
+        self.assertEqual(records[2].kind, RECORD_CLICK)
+        self.assertEqual(records[2].values, (0, 533))
+        self.assertEqual([record.kind for record in records[-3:]], [RECORD_KEY, RECORD_WHEEL, RECORD_END])
+        self.assertEqual(records[-2].values, (-3,))
+        self.assertEqual(sum(record.kind == RECORD_MATCH for record in records), len(range(0, 5000, 7)))
+        self.assertEqual([record.frame for record in records], sorted(record.frame for record in records))
+        self.assertLess(os.path.getsize(self.path), 512 + 12 * len(records))  # A few bytes per record
+
+    def test_records_seek_to_the_nearest_checkpoint(self) -> None:
+        self.write_session().close(5001)
+        reader = InputLogReader(self.path)
+        self.assertEqual([frame for frame, _ in reader.checkpoints], [0, 602, 1204, 1806, 2408, 3010, 3612, 4214,
+                                                                      4816])
+        from_start = [record for record in reader if record.frame >= 3000]
+        self.assertEqual(list(reader.records(3000)), from_start)
+        self.assertEqual(list(reader.records(4999))[0].frame, 5000)
+
+    def test_cut_off_log_is_scanned(self) -> None:
+        writer = self.write_session()
+        writer.handle.flush()
+        complete = list(InputLogReader(self.path))  # No trailer yet
+        with open(self.path, "ab") as handle:
+            handle.write(bytes((RECORD_CLICK, 5)))  # Torn record
+        reader = InputLogReader(self.path)
+        self.assertFalse(reader.complete)
+        self.assertEqual(list(reader), complete)
+        self.assertEqual(reader.end_frame, 5000)
+        self.assertEqual(len(reader.checkpoints), 9)
+        self.assertEqual(list(reader.records(2500)), [record for record in complete if record.frame >= 2500])
+        writer.close(5001)
+
+    def test_rejects_other_files_and_backwards_frames(self) -> None:
+        with open(self.path, "wb") as handle:
+            handle.write(b"\0" * HEADER.size)
+        with self.assertRaises(ValueError):
+            InputLogReader(self.path)
+        writer = InputLogWriter(self.path, (800, 600))
+        writer.click(10, 1, 2)
+        with self.assertRaises(ValueError):
+            writer.click(9, 1, 2)
+        writer.close(10)
+
+
+@unittest.skipUnless(is_installed(), "real pygame was imported before the stub")
+class SessionReplayTests(unittest.TestCase):
+    def play(self, game, recorder, frames: int, start=None) -> None:
+        """Click *start* (default: the start button), then play through the logged input paths, missing now and then."""
+        pygame = game_module.pygame
+
+        def click(frame, pos):
+            recorder.click(frame, pos)
+            game.handle_click(pos)
+            recorder.observe(frame)
+
+        def key(frame, code):
+            recorder.key(frame, code)
+            game.handle_keyboard_input(pygame.event.Event(pygame.KEYDOWN, key=code, mod=0, unicode=""))
+            recorder.observe(frame)
+
+        click(0, start or game.start_button.rect.center)
+        for frame in range(1, frames):
+            color = game.game_state.current_color
+            if frame % 5 == 0 and game.state == game_module.PLAYING and color is not None:
+                if frame % 35 == 0:
+                    color = (color + 1) % len(game.selection_trains)
+                if frame % 3 == 0:
+                    while game.selected_train_index != color:
+                        key(frame, pygame.K_RIGHT)
+                    key(frame, pygame.K_SPACE)
+                else:
+                    train = game.selection_trains[color]
+                    click(frame, (int(train.x + train.width / 2), int(train.y + train.height / 2)))
+            game.update(1 / 60)
+            recorder.observe(frame)
+
+    def test_recorded_session_replays_exactly(self) -> None:
+        path = os.path.join(tempfile.mkdtemp(), "session.tcmi")
+        game = game_module.ModernGame()
+        recorder = game_module.InputRecorder(game, path)
+        try:
+            self.play(game, recorder, 400)
+        finally:
+            recorder.close()
+            game.shutdown()
+        expected = {'state': game.state, 'score': game.score, 'level': game.level,
+                    'correct': game.correct_matches, 'incorrect': game.incorrect_matches}
+        self.assertGreater(expected['level'], 1)  # Level ups deal new tracks from inside update
+        self.assertGreater(expected['incorrect'], 0)
+
+        replayed = game_module.ModernGame()
+        try:
+            summary = replay(game_module, replayed, InputLogReader(path))
+        finally:
+            replayed.shutdown()
+        self.assertEqual(summary['frames'], 400)
+        self.assertEqual(summary['final_state'], expected)
+        self.assertEqual(summary['mismatches'], 0)
+        self.assertGreater(summary['deals'], 2)
+
+    def test_resumed_session_replays_exactly(self) -> None:
+        directory = tempfile.mkdtemp()
+        save_path = os.path.join(directory, "savegame.bin")
+        saved = game_module.ModernGame()
+        saved.save_path = save_path
+        recorder = game_module.InputRecorder(saved, os.path.join(directory, "first.tcmi"))
+        try:
+            self.play(saved, recorder, 45)
+        finally:
+            recorder.close()
+            saved.shutdown()  # Saves the game in progress
+        self.assertEqual(saved.state, game_module.PLAYING)
+        self.assertGreater(saved.level, 1)
+
+        path = os.path.join(directory, "resumed.tcmi")
+        game = game_module.ModernGame()
+        game.save_path = save_path
+        game.load_progress()
+        recorder = game_module.InputRecorder(game, path)
+        try:
+            self.play(game, recorder, 200, start=game.layout['resume_hint'].center)
+        finally:
+            recorder.close()
+            game.shutdown()
+        self.assertGreater(game.correct_matches, saved.correct_matches)  # Kept playing the resumed game
+        expected = {'state': game.state, 'score': game.score, 'level': game.level,
+                    'correct': game.correct_matches, 'incorrect': game.incorrect_matches}
+        self.assertEqual([record.kind for record in InputLogReader(path)].count(RECORD_RESUME), 1)
+
+        replayed = game_module.ModernGame()  # Saves are off, so only the log knows about the save
+        try:
+            summary = replay(game_module, replayed, InputLogReader(path))
+        finally:
+            replayed.shutdown()
+        self.assertEqual(summary['final_state'], expected)
+        self.assertEqual(summary['mismatches'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
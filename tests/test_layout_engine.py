@@ -0,0 +1,59 @@
+"""Tests for the declarative layout engine."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from layout_engine import Box, LayoutEngine, game_layout
+
+INPUTS = dict(width=1280, height=720, max_trains=3, hud_text_width=150, line_heights=(40, 26))
+
+
+class LayoutEngineTests(unittest.TestCase):
+    def test_only_dependent_rules_are_recomputed(self) -> None:
+        engine = game_layout(train_width=100, color_count=3)
+        engine.compute(**INPUTS)
+        before = engine.evaluations
+        layout = engine.compute(**dict(INPUTS, max_trains=5))
+        self.assertEqual(engine.evaluations - before, 1)  # train_spacing only
+        self.assertEqual(layout['train_spacing'], (1280 - 80) // 5)
+
+    def test_repeated_inputs_hit_the_memo(self) -> None:
+        engine = game_layout(train_width=100, color_count=3)
+        first = engine.compute(**INPUTS)
+        engine.compute(**dict(INPUTS, width=900, height=700))
+        before = engine.evaluations
+        self.assertEqual(engine.compute(**INPUTS), first)
+        self.assertEqual(engine.evaluations, before)
+
+    def test_cycles_are_rejected(self) -> None:
+        engine = LayoutEngine()
+        engine.rule('a', 'b')(lambda b: b)
+        engine.rule('b', 'a')(lambda a: a)
+        with self.assertRaises(ValueError):
+            engine.compute()
+
+    def test_game_boxes(self) -> None:
+        layout = game_layout(train_width=100, color_count=3).compute(**INPUTS)
+        self.assertEqual(layout['hud_rect'], Box(851, 20, 409, 288))
+        self.assertEqual(layout['theme_button'], Box(715, 36, 120, 44))
+        self.assertEqual(layout['mute_button'], Box(750, 90, 50, 50))
+        self.assertEqual(layout['quit_button'].y, layout['start_button'].bottom + 20)
+        self.assertEqual(layout['track_y'], 251)
+
+    def test_hud_falls_back_to_one_column_for_wide_text(self) -> None:
+        engine = game_layout(train_width=100, color_count=3)
+        self.assertTrue(engine.compute(**INPUTS)['hud_two_column'])
+        layout = engine.compute(**dict(INPUTS, hud_text_width=300))
+        self.assertFalse(layout['hud_two_column'])
+        hud = layout['hud_rect']
+        self.assertEqual(layout['scroll_rect'].width, hud.width - 32)
+        self.assertLessEqual(layout['scroll_rect'].bottom, hud.bottom)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""Tests for the tiled, cached parallax background layers."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.pygame_stub import install as install_pygame_stub, is_installed
+
+install_pygame_stub()
+
+from headless import load_game_module
+
+game_module = load_game_module()
+ParallaxLayer = game_module.ParallaxLayer
+
+
+@unittest.skipUnless(is_installed(), "real pygame was imported before the stub")
+class ParallaxLayerTests(unittest.TestCase):
+    def test_strip_covers_viewport_plus_one_tile(self) -> None:
+        layer = ParallaxLayer("layer.png", 10)
+        layer.resize(1000, game_module.CONFIG["window"]["height"])
+        self.assertEqual(layer.tile_width, 100)
+        self.assertEqual(layer.strip.get_width(), 1100)
+        layer.resize(1000, game_module.CONFIG["window"]["height"] * 2)
+        self.assertEqual(layer.tile_width, 200)
+        self.assertEqual(layer.strip.get_width(), 1200)
+
+    def test_recent_sizes_are_cached(self) -> None:
+        layer = ParallaxLayer("layer.png", 10, cache_size=2)
+        builds = layer.strip_builds
+        layer.resize(1920, 1080)
+        layer.resize(1280, 720)
+        layer.resize(1920, 1080)
+        self.assertEqual(layer.strip_builds, builds + 1)
+        layer.resize(800, 600)
+        layer.resize(1280, 720)
+        self.assertEqual(layer.strip_builds, builds + 3)
+
+    def test_scrolling_wraps_within_one_tile(self) -> None:
+        layer = ParallaxLayer("layer.png", 150)
+        layer.update(1.0)
+        self.assertAlmostEqual(layer.x, -50)
+
+
+if __name__ == "__main__":
+    unittest.main()
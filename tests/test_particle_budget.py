@@ -0,0 +1,82 @@
+"""Tests for the global particle budget."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from particle_budget import (IDLE_SECONDS, PRIORITY_EXPLOSION, PRIORITY_SMOKE, PRIORITY_SPARKLE,
+                             ParticleBudget)
+
+
+class Dot:
+    def __init__(self, x=10.0, y=10.0, size=4.0, lifetime=1.0):
+        self.x, self.y, self.size, self.lifetime = x, y, size, lifetime
+
+    def update(self, dt):
+        self.lifetime -= dt
+
+
+class ParticleBudgetTests(unittest.TestCase):
+    def test_cap_prefers_higher_priority_emitters(self) -> None:
+        budget = ParticleBudget(4)
+        sparkle = budget.emitter('sparkle', PRIORITY_SPARKLE)
+        smoke = budget.emitter('smoke', PRIORITY_SMOKE)
+        explosion = budget.emitter('explosion', PRIORITY_EXPLOSION)
+        for _ in range(2):
+            sparkle.emit(Dot())
+            smoke.emit(Dot())
+        self.assertTrue(explosion.emit(Dot()))
+        self.assertEqual((len(sparkle), len(smoke)), (1, 2))
+        self.assertFalse(sparkle.emit(Dot()))
+        self.assertTrue(explosion.emit(Dot()))
+        self.assertTrue(explosion.emit(Dot()))
+        self.assertEqual((len(sparkle), len(smoke), len(explosion)), (0, 1, 3))
+        stats = budget.stats()
+        self.assertEqual((stats['live'], stats['dropped'], stats['evicted']), (4, 1, 3))
+
+    def test_update_ages_idle_emitters_and_culls_invisible_particles(self) -> None:
+        budget = ParticleBudget(100)
+        budget.bounds = (200, 100)
+        smoke = budget.emitter('smoke', PRIORITY_SMOKE, time_scale=2.0)
+        smoke.emit(Dot(lifetime=0.5))
+        smoke.emit(Dot(x=1000.0))
+        smoke.emit(Dot(size=0.2))
+        budget.update(0.1)
+        self.assertEqual(len(smoke), 1)
+        self.assertAlmostEqual(smoke.particles[0].lifetime, 0.3)
+        budget.update(0.2)  # Still aged although nothing was emitted
+        self.assertEqual(budget.stats()['live'], 0)
+        self.assertEqual(budget.culled, 2)
+
+    def test_pressure_reclaims_idle_emitters_and_small_particles(self) -> None:
+        budget = ParticleBudget(10)
+        idle = budget.emitter('smoke', PRIORITY_SMOKE)
+        for _ in range(5):
+            idle.emit(Dot(lifetime=10.0))
+        budget.update(IDLE_SECONDS + 0.1)
+        self.assertEqual(len(idle), 5)  # Below the LOD pressure nothing is reclaimed
+        active = budget.emitter('explosion', PRIORITY_EXPLOSION)
+        for size in (1.0, 4.0, 4.0, 4.0):
+            active.emit(Dot(size=size, lifetime=10.0))
+        budget.update(0.01)
+        self.assertEqual((len(idle), len(active)), (0, 3))
+        self.assertEqual((budget.reclaimed, budget.culled), (5, 1))
+
+    def test_lowered_cap_trims_at_the_next_update(self) -> None:
+        budget = ParticleBudget(10)
+        sparkle = budget.emitter('sparkle', PRIORITY_SPARKLE)
+        explosion = budget.emitter('explosion', PRIORITY_EXPLOSION)
+        for _ in range(3):
+            sparkle.emit(Dot())
+            explosion.emit(Dot())
+        budget.set_cap(4)
+        budget.update(0.0)
+        self.assertEqual((len(sparkle), len(explosion)), (1, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Tests for frame profiling and input latency tracking."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from profiling import FrameProfiler, Histogram, LatencyTracker, format_report
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class HistogramTests(unittest.TestCase):
+    def test_buckets_and_percentiles(self) -> None:
+        histogram = Histogram(buckets=(10.0, 20.0))
+        for value in (5.0, 15.0, 15.0, 40.0):
+            histogram.add(value)
+        summary = histogram.summary()
+        self.assertEqual(summary['buckets'], {'<=10': 1, '<=20': 2, '>20': 1})
+        self.assertEqual(summary['p50'], 15.0)
+        self.assertEqual(summary['max'], 40.0)
+
+
+class LatencyTrackerTests(unittest.TestCase):
+    def test_tagged_input_measured_until_flip(self) -> None:
+        clock = FakeClock()
+        latency = LatencyTracker()
+        profiler = FrameProfiler(latency, clock=clock)
+
+        profiler.begin_frame(0.0)
+        clock.now = 0.001
+        latency.begin('click')
+        latency.tag('match_correct')
+        latency.end()
+        latency.begin('click')  # Untagged input: no visible state change
+        latency.end()
+        profiler.mark('events')
+        clock.now = 0.003
+        profiler.mark('update')
+        clock.now = 0.010
+        profiler.mark('draw')
+        clock.now = 0.011
+        profiler.end_frame()
+
+        summary = profiler.summary()['input_latency']
+        self.assertEqual(list(summary), ['click:match_correct'])
+        self.assertAlmostEqual(summary['click:match_correct']['mean'], 10.0)
+        self.assertAlmostEqual(summary['click:match_correct']['phase_means']['draw'], 7.0)
+        self.assertIn('click:match_correct', format_report(profiler.summary()))
+
+    def test_disabled_tracker_ignores_tags(self) -> None:
+        latency = LatencyTracker()
+        latency.begin('key')
+        latency.tag('select')
+        latency.frame_presented(1.0, 2.0, 3.0)
+        self.assertEqual(latency.summary(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""Tests for the frame-time driven quality controller."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from quality import QUALITY_PRESETS, UPGRADE_WINDOWS, QualityController
+
+
+def feed(controller: QualityController, work_ms: float, windows: int = 1):
+    changes = []
+    for _ in range(controller.window * windows):
+        preset = controller.record(work_ms)
+        if preset is not None:
+            changes.append(preset)
+    return changes
+
+
+class QualityControllerTests(unittest.TestCase):
+    def test_overloaded_frames_step_down_one_preset_per_window(self) -> None:
+        controller = QualityController(60, window=10)
+        self.assertEqual(feed(controller, 20.0, windows=2), ["high", "medium"])
+        self.assertEqual(controller.settings, QUALITY_PRESETS["medium"])
+
+    def test_upgrade_waits_for_sustained_headroom(self) -> None:
+        controller = QualityController(60, window=10)
+        feed(controller, 20.0)
+        self.assertEqual(feed(controller, 4.0, windows=UPGRADE_WINDOWS - 1), [])
+        feed(controller, 12.0)  # Between the thresholds: resets the headroom count
+        self.assertEqual(feed(controller, 4.0, windows=UPGRADE_WINDOWS - 1), [])
+        self.assertEqual(feed(controller, 4.0), ["ultra"])
+
+    def test_fixed_preset_never_changes(self) -> None:
+        controller = QualityController(60, "low", window=10)
+        self.assertEqual(feed(controller, 50.0, windows=3), [])
+        self.assertEqual(controller.preset, "low")
+
+    def test_unknown_preset_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            QualityController(60, "cinematic")
+
+
+if __name__ == "__main__":
+    unittest.main()
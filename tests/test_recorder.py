@@ -0,0 +1,123 @@
+"""Tests for the background frame recorder."""
+from __future__ import annotations
+
+import os
+import struct
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+import zlib
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from recorder import FORMAT_PNG, FORMAT_RAW, INDEX_NAME, RAW_STREAM_NAME, FrameRecorder, encode_png
+
+
+def decode_png(data: bytes):
+    """Return ``(width, height, rgb)`` for an unfiltered 8-bit truecolor PNG."""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    offset, chunks = 8, {}
+    while offset < len(data):
+        length, kind = struct.unpack(">I4s", data[offset:offset + 8])
+        chunks[kind] = chunks.get(kind, b"") + data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+    width, height = struct.unpack(">II", chunks[b"IHDR"][:8])
+    rows = zlib.decompress(chunks[b"IDAT"])
+    stride = width * 3 + 1
+    return width, height, b"".join(rows[row * stride + 1:(row + 1) * stride] for row in range(height))
+
+
+def frame_bytes(width: int, height: int, seed: int) -> bytes:
+    return bytes((seed + index) % 256 for index in range(width * height * 3))
+
+
+def read_index(directory: str):
+    with open(os.path.join(directory, INDEX_NAME), encoding="utf-8") as handle:
+        lines = handle.read().splitlines()[1:]
+    return sorted((line.split(",") for line in lines), key=lambda fields: int(fields[0]))
+
+
+class EncodePngTests(unittest.TestCase):
+    def test_round_trip(self) -> None:
+        rgb = frame_bytes(5, 3, 11)
+        self.assertEqual(decode_png(encode_png(5, 3, rgb)), (5, 3, rgb))
+
+    def test_size_mismatch_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            encode_png(4, 4, b"\x00" * 10)
+
+
+class FrameRecorderTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+
+    def test_png_sequence_is_written_with_an_index(self) -> None:
+        recorder = FrameRecorder(self.directory, FORMAT_PNG, workers=2)
+        frames = [frame_bytes(4, 2, seed) for seed in range(5)]
+        for rgb in frames:
+            self.assertTrue(recorder.submit(4, 2, rgb))
+        recorder.close()
+
+        entries = read_index(self.directory)
+        self.assertEqual([int(fields[0]) for fields in entries], list(range(5)))
+        for fields, rgb in zip(entries, frames):
+            with open(os.path.join(self.directory, fields[4]), "rb") as handle:
+                self.assertEqual(decode_png(handle.read()), (4, 2, rgb))
+        self.assertEqual(recorder.stats()["written"], 5)
+
+    def test_raw_stream_offsets_locate_every_frame(self) -> None:
+        recorder = FrameRecorder(self.directory, FORMAT_RAW, workers=3)
+        frames = [frame_bytes(3, 3, seed) for seed in range(6)]
+        for rgb in frames:
+            recorder.submit(3, 3, rgb)
+        recorder.close()
+
+        with open(os.path.join(self.directory, RAW_STREAM_NAME), "rb") as handle:
+            stream = handle.read()
+        self.assertEqual(len(stream), sum(len(rgb) for rgb in frames))
+        for fields in read_index(self.directory):
+            offset, length = int(fields[5]), int(fields[6])
+            self.assertEqual(stream[offset:offset + length], frames[int(fields[0])])
+
+    def test_full_queue_drops_frames_instead_of_blocking(self) -> None:
+        recorder = FrameRecorder(self.directory, FORMAT_RAW, workers=1, queue_size=2)
+        recorder._lock.acquire()  # Stall the worker inside its first write
+        try:
+            results = [recorder.submit(2, 2, frame_bytes(2, 2, seed)) for seed in range(6)]
+            if recorder.full():
+                recorder.drop()
+        finally:
+            recorder._lock.release()
+        recorder.close()
+
+        stats = recorder.stats()
+        self.assertIn(False, results)
+        self.assertEqual(stats["submitted"], stats["written"] + stats["dropped"])
+        self.assertLessEqual(stats["max_queue_depth"], 2)
+        self.assertEqual(len(read_index(self.directory)), stats["written"])
+
+    def test_write_errors_are_counted_and_do_not_stop_the_workers(self) -> None:
+        recorder = FrameRecorder(self.directory, FORMAT_PNG, workers=1)
+        recorder.directory = os.path.join(self.directory, "missing")  # Every frame write now fails
+        for seed in range(3):
+            recorder.submit(2, 2, frame_bytes(2, 2, seed))
+        recorder.close()  # Returns only if the worker survived to take its stop signal
+        self.assertEqual(recorder.stats()["failed"], 3)
+        self.assertEqual(recorder.stats()["written"], 0)
+
+    def test_close_does_not_hang_when_the_workers_are_gone(self) -> None:
+        recorder = FrameRecorder(self.directory, FORMAT_RAW, workers=1, queue_size=2)
+        recorder.frames.put(None)  # The worker exits as if it had crashed
+        recorder._workers[0].join()
+        for seed in range(2):
+            recorder.submit(2, 2, frame_bytes(2, 2, seed))
+        self.assertTrue(recorder.full())
+        recorder.close(timeout=0.05)
+        self.assertEqual(recorder.stats()["dropped"], 2)
+        self.assertEqual(recorder.stats()["written"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Render budget tests: renderer work per frame, counted by the pygame stub."""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+import unittest
+from unittest import mock
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.pygame_stub import counter, install as install_pygame_stub, is_installed
+
+install_pygame_stub()
+
+from headless import load_game_module
+
+game_module = load_game_module()
+
+PLAYING_RENDERS = 4  # Text rendered per steady PLAYING frame, everything else comes from caches
+PLAYING_BLITS = 40
+NIGHT_PLAYING_BLITS = PLAYING_BLITS + 2 * 18  # Two window glows on each of 15 track and 3 selection trains
+
+
+@unittest.skipUnless(is_installed(), "real pygame was imported before the stub")
+class RenderBudgetTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.game = game_module.ModernGame()
+        self.screen = game_module.set_window_mode((game_module.WIDTH, game_module.HEIGHT))
+
+    def tearDown(self) -> None:
+        self.game.shutdown()
+
+    def start_playing(self, trains: int) -> None:
+        game = self.game
+        game.state = game_module.PLAYING
+        game.reset_game()
+        game.game_state.max_trains = trains
+        game.game_state.initialize_trains()
+        game.build_train_views()
+        game.recalculate_layout(game.window_width, game.window_height)
+
+    def frame(self, warmup: int = 2):
+        for _ in range(warmup):  # Fill caches the way the first frames of a session do
+            self.game.update(1 / 60)
+            self.game.draw(self.screen)
+        with counter.frame() as counts:
+            self.game.update(1 / 60)
+            self.game.draw(self.screen)
+        return counts
+
+    def test_steady_playing_frame_with_fifteen_trains(self) -> None:
+        self.start_playing(15)
+        counts = self.frame()
+        self.assertEqual(counts.exceeds(surfaces=0, renders=PLAYING_RENDERS, blits=PLAYING_BLITS), {}, counts)
+        self.assertGreaterEqual(counts.draws['rect'], 15)  # Every track train was drawn
+
+    def test_steady_night_sky_playing_frame(self) -> None:
+        self.start_playing(15)
+        self.game.apply_theme(self.game.themes.index(game_module.DARK_THEME))
+        self.assertTrue(self.game.uses_night_sky)
+        counts = self.frame()
+        self.assertEqual(counts.exceeds(surfaces=0, renders=PLAYING_RENDERS, blits=NIGHT_PLAYING_BLITS), {}, counts)
+        self.assertIs(self.game.star_field.background, self.game.background)  # Stars drawn through the bound sky
+        self.assertGreater(self.game.star_field.drawn_visible, 0)
+
+    def test_hud_layout_is_only_recomputed_when_the_stats_change_width(self) -> None:
+        self.start_playing(10)
+        engine = self.game.layout_engine
+        with mock.patch.object(engine, "compute", wraps=engine.compute) as compute:
+            self.frame()
+            self.assertEqual(compute.call_count, 0)
+            self.game.game_state.score = 10 ** 9  # Wider stats text
+            self.frame(warmup=0)
+            self.assertEqual(compute.call_count, 1)
+        self.assertEqual(self.game.hud_layout_text_width, self.game.hud_text_width())
+        self.assertIsInstance(self.game.hud_two_column, bool)
+        self.assertNotIn('hud_two_column', self.game.layout)
+
+    def test_timeline_entries_do_not_render_every_frame(self) -> None:
+        self.start_playing(10)
+        for index in range(16):
+            self.game.add_message(f"Correct! number {index}", self.game.theme['secondary'])
+        self.game.scheduler.run_all()
+        counts = self.frame()
+        self.assertEqual(counts.exceeds(surfaces=0, renders=PLAYING_RENDERS), {}, counts)
+
+    def test_menu_allocates_nothing_after_the_first_frame(self) -> None:
+        self.assertEqual(self.frame().exceeds(surfaces=0), {})
+
+    def test_deferred_work_is_not_charged_to_the_quality_controller(self) -> None:
+        observed = []
+        self.game.observe_frame = observed.append
+        self.game.scheduler.submit('slow', lambda: time.sleep(0.05), deadline_ms=0)  # Overdue, so it runs at once
+        game_module.run_game_loop(self.game, self.screen, game_module.pygame.time.Clock(), max_frames=2)
+        self.assertEqual(self.game.scheduler.pending, [])
+        self.assertEqual(len(observed), 2)
+        self.assertLess(max(observed), 50)
+
+    def test_flip_closes_a_frame(self) -> None:
+        counter.reset()
+        shown = game_module.run_game_loop(self.game, self.screen, game_module.pygame.time.Clock(), max_frames=3)
+        self.assertEqual(shown, 3)
+        self.assertEqual(len(counter.frames), 3)
+        self.assertGreater(counter.frames[-1].blits, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
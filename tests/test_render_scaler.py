@@ -0,0 +1,43 @@
+"""Tests for RenderScaler, which composes frames below window resolution."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.pygame_stub import install as install_pygame_stub, is_installed
+
+install_pygame_stub()
+
+from headless import load_game_module
+
+game_module = load_game_module()
+RenderScaler = game_module.RenderScaler
+pygame = game_module.pygame
+
+
+@unittest.skipUnless(is_installed(), "real pygame was imported before the stub")
+class RenderScalerTests(unittest.TestCase):
+    def tearDown(self) -> None:
+        game_module.RENDER_SIZE = None
+
+    def test_render_size_respects_minimum_window(self) -> None:
+        scaler = RenderScaler(0.5)
+        self.assertEqual(scaler.resize((1920, 1080)), (1067, 600))
+        self.assertEqual(game_module.scene_size(), (1067, 600))
+        self.assertEqual(scaler.to_render((1919, 1079)), (1066, 599))
+
+    def test_full_scale_draws_to_window(self) -> None:
+        scaler = RenderScaler(1.0)
+        self.assertEqual(scaler.resize((1280, 720)), (1280, 720))
+        screen = pygame.Surface((1280, 720))
+        self.assertIs(scaler.target(screen), screen)
+        self.assertEqual(scaler.to_render((640, 360)), (640, 360))
+        self.assertIsNone(game_module.RENDER_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
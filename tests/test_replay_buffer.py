@@ -0,0 +1,95 @@
+"""Tests for the instant-replay ring buffer."""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from recorder import INDEX_NAME
+from replay_buffer import MAX_STRIDE, ReplayBuffer
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def fill(buffer: ReplayBuffer, clock: FakeClock, frames: int, step: float = 0.125) -> None:
+    for index in range(frames):
+        clock.now = index * step
+        while buffer.full():  # The tests want every frame, so wait for the compressor
+            time.sleep(0.001)
+        buffer.due()
+        buffer.submit(2, 2, bytes([index % 256]) * 12)
+
+
+class ReplayBufferTests(unittest.TestCase):
+    def test_frames_older_than_the_window_are_evicted(self) -> None:
+        clock = FakeClock()
+        buffer = ReplayBuffer(seconds=1.0, max_bytes=1 << 20, budget_ms=1.0, clock=clock)
+        fill(buffer, clock, 30)
+        buffer.close()
+
+        times = [time_ms for _, time_ms, _, _, _ in buffer.snapshot()]
+        self.assertEqual(len(times), 9)  # 2.625 s .. 3.625 s
+        self.assertEqual(times[-1] - times[0], 1000.0)
+        self.assertEqual(buffer.stats()['evicted'], 21)
+
+    def test_memory_cap_bounds_the_ring(self) -> None:
+        clock = FakeClock()
+        buffer = ReplayBuffer(seconds=60.0, max_bytes=400, budget_ms=1.0, clock=clock)
+        fill(buffer, clock, 40)
+        buffer.close()
+
+        self.assertLessEqual(buffer.bytes_held, 400)
+        self.assertEqual(buffer.bytes_held, sum(len(data) for *_, data in buffer.snapshot()))
+        self.assertGreater(buffer.evicted, 0)
+
+    def test_stride_keeps_the_mean_cost_inside_the_budget(self) -> None:
+        buffer = ReplayBuffer(seconds=10.0, max_bytes=1 << 20, budget_ms=1.0)
+        for _ in range(300):
+            captured = buffer.due()
+            buffer.charge(3.0 if captured else 0.0, captured)
+        buffer.close()
+
+        stats = buffer.stats()
+        self.assertEqual(stats['stride'], 3)
+        self.assertLessEqual(stats['mean_cost_ms'], 1.0 + 0.05)
+
+        buffer = ReplayBuffer(seconds=10.0, max_bytes=1 << 20, budget_ms=0.1)
+        buffer.charge(50.0, True)
+        buffer.close()
+        self.assertEqual(buffer.stride, MAX_STRIDE)
+
+    def test_dump_writes_the_ring_in_the_background(self) -> None:
+        clock = FakeClock()
+        buffer = ReplayBuffer(seconds=10.0, max_bytes=1 << 20, budget_ms=1.0, clock=clock)
+        fill(buffer, clock, 5)
+        while len(buffer.snapshot()) < 5:
+            time.sleep(0.001)
+        directory = os.path.join(tempfile.mkdtemp(), "replay")
+        self.assertEqual(buffer.dump(directory), 5)
+        buffer.close()  # Waits for the writer
+
+        with open(os.path.join(directory, INDEX_NAME), encoding="utf-8") as handle:
+            rows = handle.read().splitlines()[1:]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0].split(",")[1], "0.000")  # Times start at the oldest frame
+        self.assertTrue(all(os.path.exists(os.path.join(directory, row.split(",")[4])) for row in rows))
+
+        empty = ReplayBuffer(1.0, 100, 1.0)
+        self.assertEqual(empty.dump(directory), 0)  # Nothing held yet
+        empty.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
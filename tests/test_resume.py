@@ -0,0 +1,100 @@
+"""Save and resume of a ModernGame, driven through the pygame stub."""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.pygame_stub import install as install_pygame_stub, is_installed
+
+install_pygame_stub()
+
+from headless import load_game_module
+
+game_module = load_game_module()
+
+
+@unittest.skipUnless(is_installed(), "real pygame was imported before the stub")
+class ResumeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.path = os.path.join(tempfile.mkdtemp(), "savegame.bin")
+        self.games = []
+
+    def tearDown(self) -> None:
+        for game in self.games:
+            game.shutdown()
+
+    def new_game(self):
+        game = game_module.ModernGame()
+        game.save_path = self.path
+        game.load_progress()
+        self.games.append(game)
+        return game
+
+    def click_start(self, game) -> None:
+        game.handle_click(game.start_button.rect.center)
+
+    def play_and_quit(self) -> object:
+        game = self.new_game()
+        self.click_start(game)
+        for _ in range(4):
+            game.selected_train_index = game.game_state.current_color
+            game.match_train()
+            game.update(1 / 60)
+        self.assertTrue(game.scheduler.pending)  # Timeline entries not logged yet
+        game.shutdown()  # Saves the game in progress
+        self.games.remove(game)
+        return game
+
+    def test_quitting_mid_level_resumes_from_the_menu(self) -> None:
+        game = self.play_and_quit()
+        resumed = self.new_game()
+        self.assertEqual(resumed.start_button.text, "Start Game")
+        self.assertIsNotNone(resumed.saved_game)
+        resumed.handle_click(resumed.layout['resume_hint'].center)
+        self.assertEqual(resumed.state, game_module.PLAYING)
+        for field in ('score', 'level', 'combo_count', 'current_train_index', 'correct_matches'):
+            self.assertEqual(getattr(resumed, field), getattr(game, field), field)
+        self.assertEqual([train.color for train in resumed.track_trains], [train.color for train in game.track_trains])
+        self.assertEqual([train.x for train in resumed.track_trains], [train.x for train in game.track_trains])
+        self.assertEqual([entry['text'] for entry in resumed.timeline_entries],
+                         [entry['text'] for entry in game.timeline_entries])
+        self.assertEqual(len(resumed.timeline_entries), 4)  # Every match message made it into the save
+        self.assertIsNone(resumed.saved_game)
+
+    def test_resume_key_and_start_game_from_a_menu_with_a_save(self) -> None:
+        game = self.play_and_quit()
+        resumed = self.new_game()
+        resumed.handle_keyboard_input(game_module.pygame.event.Event(game_module.pygame.KEYDOWN,
+                                                                      key=game_module.RESUME_KEY))
+        self.assertEqual(resumed.score, game.score)
+
+        fresh = self.new_game()
+        self.assertIsNotNone(fresh.saved_game)
+        self.click_start(fresh)  # Starting over discards the save
+        self.assertEqual((fresh.state, fresh.score), (game_module.PLAYING, 0))
+        self.assertIsNone(fresh.saved_game)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_menu_and_finished_games_leave_no_save(self) -> None:
+        game = self.new_game()
+        game.handle_focus_lost()
+        self.assertFalse(os.path.exists(self.path))  # Nothing to resume from the menu
+
+        self.click_start(game)
+        game.handle_focus_lost()
+        self.assertTrue(os.path.exists(self.path))
+        game.game_state.all_trains_moving = True
+        game.game_state.moving = [False] * len(game.game_state.moving)
+        game.update_trains()
+        self.assertEqual(game.state, game_module.GAME_OVER)
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Tests for the save-game snapshot format."""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from game_state import GameState
+from save_state import HEADER, SAVE_MAGIC, GameSnapshot, read_snapshot, write_snapshot
+
+FIELDS = ('score', 'level', 'train_speed', 'max_trains', 'current_train_index', 'all_trains_moving', 'combo_count',
+          'max_combo', 'correct_matches', 'incorrect_matches', 'game_over', 'frame', 'track_colors', 'track_x',
+          'moving')
+
+
+def played_state(seed: int = 3, matches: int = 12) -> GameState:
+    state = GameState(rng=random.Random(seed))
+    for _ in range(matches):
+        state.step(state.current_color)
+        state.step(None)
+    state.step((state.current_color + 1) % 3)  # One miss resets the combo
+    for _ in range(5):
+        state.step(None)
+    return state
+
+
+def timeline(entries: int = 16):
+    return [(entries - index, (index, 2 * index, 255), f"Correct! Combo x{index} ✓") for index in range(entries)]
+
+
+class GameSnapshotTests(unittest.TestCase):
+    def test_round_trip_restores_every_field(self) -> None:
+        state = played_state()
+        snapshot = GameSnapshot(state, theme_index=2, selected_train_index=1, high_score=40, elapsed_ms=91234,
+                                timeline=timeline())
+        restored_snapshot = GameSnapshot.decode(snapshot.encode())
+        restored = GameState()
+        generation = restored.track_generation
+        restored_snapshot.apply(restored)
+
+        for field in FIELDS:
+            self.assertEqual(getattr(restored, field), getattr(state, field), field)
+        self.assertGreater(restored.track_generation, generation)
+        self.assertEqual((restored_snapshot.theme_index, restored_snapshot.selected_train_index,
+                          restored_snapshot.high_score, restored_snapshot.elapsed_ms), (2, 1, 40, 91234))
+        self.assertEqual(restored_snapshot.timeline, timeline())
+
+    def test_positions_follow_a_different_layout(self) -> None:
+        state = played_state()
+        moved = [index for index, moving in enumerate(state.moving) if moving]
+        snapshot = GameSnapshot.decode(GameSnapshot(state).encode())
+        restored = GameState(train_spacing=120, track_origin_x=10)
+        snapshot.apply(restored)
+        for index in range(len(state.track_colors)):
+            self.assertAlmostEqual(restored.track_x[index] - restored.slot_x(index),
+                                   state.track_x[index] - state.slot_x(index))
+        self.assertTrue(moved)
+
+    def test_a_full_save_is_small_and_fast(self) -> None:
+        state = GameState(settings={'initial_max_trains': 15})
+        snapshot = GameSnapshot(state, timeline=timeline())
+        self.assertLess(len(snapshot.encode()), 1024)
+        started = time.perf_counter()
+        for _ in range(100):
+            GameSnapshot.decode(GameSnapshot(state, timeline=timeline()).encode()).apply(GameState())
+        self.assertLess((time.perf_counter() - started) * 1000.0 / 100, 2.0)
+
+    def test_damaged_saves_are_rejected(self) -> None:
+        data = bytearray(GameSnapshot(played_state(), timeline=timeline(2)).encode())
+        flipped = bytearray(data)
+        flipped[HEADER.size + 3] ^= 0x40
+        future = bytearray(data)
+        future[len(SAVE_MAGIC)] += 1
+        for damaged in (bytes(flipped), bytes(future), b"PNG" + bytes(data[3:]), bytes(data[:20])):
+            with self.assertRaises(ValueError):
+                GameSnapshot.decode(damaged)
+
+    def test_write_replaces_the_save_atomically(self) -> None:
+        path = os.path.join(tempfile.mkdtemp(), "saves", "savegame.bin")
+        self.assertIsNone(read_snapshot(path))
+        write_snapshot(path, GameSnapshot(GameState()))
+        state = played_state()
+        write_snapshot(path, GameSnapshot(state))
+        self.assertEqual(read_snapshot(path).score, state.score)
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["savegame.bin"])
+
+
+if __name__ == "__main__":
+    unittest.main()
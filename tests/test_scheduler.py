@@ -0,0 +1,91 @@
+"""Tests for the frame-budget scheduler."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from scheduler import PRIORITY_HIGH, PRIORITY_LOW, FrameScheduler
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def costly(clock: FakeClock, log: list, name: str, cost_ms: float):
+    def task():
+        log.append(name)
+        clock.now += cost_ms / 1000.0
+    return task
+
+
+class FrameSchedulerTests(unittest.TestCase):
+    def test_tasks_run_by_priority_within_the_slack(self) -> None:
+        clock = FakeClock()
+        scheduler = FrameScheduler(16.0, clock=clock)
+        log = []
+        scheduler.submit('low', costly(clock, log, 'low', 5.0), PRIORITY_LOW)
+        scheduler.submit('high', costly(clock, log, 'high', 5.0), PRIORITY_HIGH)
+        scheduler.submit('high', costly(clock, log, 'high', 5.0), PRIORITY_HIGH)
+        clock.now = 0.004  # Update and draw took 4 ms of a 16 ms frame
+        self.assertEqual(scheduler.run(0.0), 1)  # A second 5 ms task would pass the 14 ms usable budget
+        self.assertEqual(log, ['high'])
+        clock.now = 0.020
+        self.assertEqual(scheduler.run(0.020), 2)
+        self.assertEqual(log, ['high', 'high', 'low'])
+
+    def test_known_cost_waits_for_a_frame_with_room(self) -> None:
+        clock = FakeClock()
+        scheduler = FrameScheduler(16.0, clock=clock)
+        log = []
+        scheduler.submit('wrap', costly(clock, log, 'wrap', 8.0))
+        scheduler.run_all()
+        clock.now = frame_start = 1.0
+        scheduler.submit('wrap', costly(clock, log, 'wrap', 8.0))
+        clock.now += 0.010  # Only 4 ms of slack left before the safety margin
+        self.assertEqual(scheduler.run(frame_start), 0)
+        clock.now = frame_start = 1.016
+        self.assertEqual(scheduler.run(frame_start), 1)
+
+    def test_overdue_tasks_run_without_slack(self) -> None:
+        clock = FakeClock()
+        scheduler = FrameScheduler(16.0, clock=clock)
+        log = []
+        scheduler.submit('layout', costly(clock, log, 'layout', 1.0), deadline_ms=50)
+        for frame in range(3):
+            clock.now = frame * 0.020 + 0.019  # Every frame already over budget
+            scheduler.run(frame * 0.020)
+        self.assertEqual(log, ['layout'])
+        self.assertEqual(scheduler.overdue, 1)
+
+    def test_coalesced_submissions_run_once_with_the_latest_function(self) -> None:
+        clock = FakeClock()
+        scheduler = FrameScheduler(16.0, clock=clock)
+        log = []
+        scheduler.submit('layout', costly(clock, log, 'first', 0.0), PRIORITY_LOW, coalesce=True)
+        scheduler.submit('layout', costly(clock, log, 'second', 0.0), PRIORITY_HIGH, coalesce=True)
+        self.assertEqual(scheduler.run_all(), 1)
+        self.assertEqual(log, ['second'])
+        self.assertEqual(scheduler.stats()['coalesced'], 1)
+
+    def test_named_tasks_can_be_flushed_ahead_of_the_rest(self) -> None:
+        clock = FakeClock()
+        scheduler = FrameScheduler(16.0, clock=clock)
+        log = []
+        scheduler.submit('timeline', costly(clock, log, 'first', 0.0), PRIORITY_LOW)
+        scheduler.submit('layout', costly(clock, log, 'layout', 0.0), PRIORITY_HIGH)
+        scheduler.submit('timeline', costly(clock, log, 'second', 0.0), PRIORITY_HIGH)
+        self.assertEqual(scheduler.run_named('timeline'), 2)
+        self.assertEqual(log, ['first', 'second'])
+        self.assertEqual([task.name for task in scheduler.pending], ['layout'])
+
+
+if __name__ == "__main__":
+    unittest.main()
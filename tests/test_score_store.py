@@ -0,0 +1,59 @@
+"""Tests for the SQLite-backed score store."""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from score_store import ScoreStore
+
+
+class ScoreStoreTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "scores.db")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def record(self, store: ScoreStore, score: int, finished_at: float) -> None:
+        store.record_session(score, 80.0, 3, 2, 12.5, "LIGHT", finished_at=finished_at)
+
+    def test_sessions_persist_across_instances(self) -> None:
+        store = ScoreStore(self.path, leaderboard_size=2)
+        self.assertEqual(store.top_scores(), [])
+        self.record(store, 7, 1.0)
+        self.record(store, 12, 2.0)
+        self.record(store, 9, 3.0)
+        store.close()
+        self.assertEqual(store.written_sessions, 3)
+
+        reopened = ScoreStore(self.path, leaderboard_size=2)
+        try:
+            self.assertEqual([entry['score'] for entry in reopened.top_scores()], [12, 9])
+            self.assertEqual(reopened.high_score(), 12)
+            self.assertEqual(reopened.top_scores(1)[0]['theme'], "LIGHT")
+        finally:
+            reopened.close()
+
+    def test_cache_refreshes_after_flush(self) -> None:
+        store = ScoreStore(self.path)
+        self.record(store, 4, 1.0)
+        store.close()
+        self.assertEqual(store.high_score(), 4)
+
+    def test_unwritable_path_disables_store(self) -> None:
+        store = ScoreStore(os.path.join(self.tmp.name, "missing", "scores.db"))
+        self.assertFalse(store.enabled)
+        self.record(store, 5, 1.0)
+        store.close()
+        self.assertEqual(store.top_scores(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Tests for SoundManager channel groups and voice stealing."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.pygame_stub import install as install_pygame_stub, is_installed
+
+install_pygame_stub()
+
+from headless import load_game_module
+
+game_module = load_game_module()
+SoundManager = game_module.SoundManager
+
+
+@unittest.skipUnless(is_installed(), "real pygame was imported before the stub")
+class SoundManagerTests(unittest.TestCase):
+    def make_manager(self) -> SoundManager:
+        settings = {"frequency": 44100, "buffer_size": 256, "music_channels": 1, "ui_channels": 1,
+                    "gameplay_channels": 2, "voice_limit": 2, "voice_limits": {"correct": 1}}
+        return SoundManager(settings)
+
+    def test_voice_limit_steals_oldest_same_sound(self) -> None:
+        manager = self.make_manager()
+        manager.play("correct")
+        manager.play("wrong")
+        manager.play("correct")
+        channels, voices = manager.groups["gameplay"]
+        self.assertEqual(manager.stolen_voices, 1)
+        self.assertEqual(sorted(voice[1] for voice in voices), ["correct", "wrong"])
+
+    def test_full_group_steals_oldest_voice(self) -> None:
+        manager = self.make_manager()
+        manager.play("wrong")
+        manager.play("level_up")
+        manager.play("victory")
+        _, voices = manager.groups["gameplay"]
+        self.assertEqual(sorted(voice[1] for voice in voices), ["level_up", "victory"])
+        self.assertEqual(manager.groups["ui"][1], [None])
+
+    def test_mute_stops_scheduling_and_silences_music(self) -> None:
+        manager = self.make_manager()
+        manager.toggle_mute()
+        manager.play("click")
+        self.assertEqual(manager.groups["ui"][1], [None])
+        self.assertEqual(manager.groups["music"][0][0].volume, 0.0)
+        self.assertEqual(manager.stats()["play_call_ms"]["count"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
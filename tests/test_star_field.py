@@ -0,0 +1,43 @@
+"""Tests for the night-sky StarField."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from tests.pygame_stub import install as install_pygame_stub, is_installed
+
+install_pygame_stub()
+
+from headless import load_game_module
+
+game_module = load_game_module()
+StarField = game_module.StarField
+
+
+@unittest.skipUnless(is_installed(), "real pygame was imported before the stub")
+class StarFieldTests(unittest.TestCase):
+    def test_stars_stay_inside_the_upper_half(self) -> None:
+        field = StarField(500, 800, 600, seed=4)
+        field.resize(1000, 700)
+        margin = game_module.STAR_SIZE_RANGE[1]
+        self.assertGreaterEqual(min(field.x), margin)
+        self.assertLessEqual(max(field.x), 1000 - margin)
+        self.assertGreaterEqual(min(field.y), margin)
+        self.assertLessEqual(max(field.y), 350)
+
+    def test_twinkle_steps_follow_simulation_time(self) -> None:
+        field = StarField(200, 800, 600, seed=4)
+        before = list(field.levels())
+        self.assertTrue(all(0 <= level < game_module.STAR_TWINKLE_LEVELS for level in before))
+        field.update(0.5)
+        self.assertNotEqual(list(field.levels()), before)
+        brightness = field.brightness(field.levels())
+        self.assertLessEqual(max(brightness), game_module.STAR_BRIGHTNESS_RANGE[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
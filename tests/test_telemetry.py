@@ -0,0 +1,67 @@
+"""Tests for the telemetry ring buffer and JSONL writer."""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from telemetry import RingBuffer, Telemetry
+
+
+class RingBufferTests(unittest.TestCase):
+    def test_full_buffer_drops_and_counts(self) -> None:
+        ring = RingBuffer(2)
+        self.assertTrue(ring.push((0.0, "a", {})))
+        self.assertTrue(ring.push((0.0, "b", {})))
+        self.assertFalse(ring.push((0.0, "c", {})))
+        self.assertEqual(ring.dropped, 1)
+        self.assertEqual([record[1] for record in ring.drain()], ["a", "b"])
+        self.assertTrue(ring.push((0.0, "d", {})))
+        self.assertEqual(len(ring), 1)
+
+
+class TelemetryWriterTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_records_written_as_json_lines(self) -> None:
+        telemetry = Telemetry(self.tmp.name, flush_interval=60)
+        telemetry.emit('match', level=2, score=7)
+        telemetry.emit('resize', width=800, height=600)
+        telemetry.close()
+
+        with open(telemetry.path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record['event'] for record in records], ['match', 'resize'])
+        self.assertEqual(records[0]['score'], 7)
+        self.assertEqual(telemetry.stats()['written'], 2)
+
+    def test_files_rotate_at_size_limit(self) -> None:
+        telemetry = Telemetry(self.tmp.name, max_file_bytes=200, backup_count=2, flush_interval=60)
+        for index in range(20):
+            telemetry.emit('match', index=index)
+        telemetry.close()
+
+        names = sorted(os.listdir(self.tmp.name))
+        self.assertEqual(names, ['telemetry.jsonl', 'telemetry.jsonl.1', 'telemetry.jsonl.2'])
+        self.assertLessEqual(os.path.getsize(telemetry.path), 200)
+
+    def test_disabled_telemetry_ignores_events(self) -> None:
+        telemetry = Telemetry(self.tmp.name, enabled=False)
+        telemetry.emit('match')
+        telemetry.close()
+        self.assertEqual(telemetry.emitted, 0)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
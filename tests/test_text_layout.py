@@ -0,0 +1,56 @@
+"""Tests for word wrapping from cached word widths."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import unittest
+
+project_root = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(project_root))
+
+from text_layout import measurer_for, wrap_text
+
+
+class KerningFont:
+    """Fixed-advance font where "AV" kerns together and widths round down."""
+
+    def size(self, text: str):
+        width = len(text) * 15 // 2 - 3 * text.count("AV")
+        return width, 16
+
+
+def reference_wrap(text: str, font, max_width: int):
+    """The measure-every-candidate algorithm wrap_text must agree with."""
+    words = text.split()
+    lines, current = [], words[0]
+    for word in words[1:]:
+        candidate = f"{current} {word}"
+        if font.size(candidate)[0] <= max_width:
+            current = candidate
+        else:
+            lines.append(current)
+            current = word
+    lines.append(current)
+    return lines
+
+
+class WrapTextTests(unittest.TestCase):
+    def test_matches_full_line_measurement(self) -> None:
+        font = KerningFont()
+        text = "A VAT AV travels A V over the AVA line to VA A station"
+        for max_width in range(8, 200, 3):
+            self.assertEqual(wrap_text(text, font, max_width), reference_wrap(text, font, max_width), max_width)
+
+    def test_words_are_measured_once_per_font(self) -> None:
+        font = KerningFont()
+        text = " ".join(["match the train colors"] * 20)
+        wrap_text(text, font, 120)
+        measurer = measurer_for(font)
+        self.assertEqual(set(measurer.words), {"match", "the", "train", "colors"})
+        before = measurer.measurements
+        wrap_text(text, font, 120)
+        self.assertLess(measurer.measurements - before, 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""Word wrapping from cached word widths.
+
+Measuring a whole candidate line for every word makes wrapping quadratic in
+the line length. `TextMeasurer` instead measures each distinct word once per
+font and each word junction (last glyph, space, first glyph) once, so a line
+width is a running sum. Summed widths can differ from a real measurement
+by kerning and pixel rounding. When an estimate comes within that error of
+the limit, the candidate line is measured for real. The result therefore
+matches the previous measure-every-candidate algorithm exactly.
+
+The module does not import pygame; any object with a ``size(text)`` method
+returning ``(width, height)`` works as a font.
+"""
+from __future__ import annotations
+
+import weakref
+from typing import Dict, List, Tuple
+
+WORD_CACHE_SIZE = 4096  # Distinct words remembered per font
+ROUNDING_SLACK = 2  # Pixels of estimate error allowed per word in a line
+
+_measurers: "weakref.WeakKeyDictionary[object, TextMeasurer]" = weakref.WeakKeyDictionary()
+
+
+class TextMeasurer:
+    """Width cache for one font."""
+
+    def __init__(self, font):
+        self.font = font
+        self.words: Dict[str, int] = {}
+        self.joins: Dict[Tuple[str, str], int] = {}
+        self.measurements = 0  # Calls into the font so far
+
+    def measure(self, text: str) -> int:
+        self.measurements += 1
+        return self.font.size(text)[0]
+
+    def word_width(self, word: str) -> int:
+        width = self.words.get(word)
+        if width is None:
+            if len(self.words) >= WORD_CACHE_SIZE:
+                self.words.clear()
+            width = self.words[word] = self.measure(word)
+        return width
+
+    def join_width(self, left: str, right: str) -> int:
+        """Width a space adds between two words, kerning against both neighbours included."""
+        key = (left[-1], right[0])
+        width = self.joins.get(key)
+        if width is None:
+            first, last = key
+            width = self.joins[key] = self.measure(f"{first} {last}") - self.measure(first) - self.measure(last)
+        return width
+
+
+def measurer_for(font) -> TextMeasurer:
+    """Return the shared measurer of *font*, creating it on first use."""
+    measurer = _measurers.get(font)
+    if measurer is None:
+        measurer = _measurers[font] = TextMeasurer(font)
+    return measurer
+
+
+def wrap_text(text: str, font, max_width: int) -> List[str]:
+    """Wraps *text* into lines that do not exceed *max_width* pixels."""
+    if font is None:
+        raise ValueError("A font instance is required for text wrapping")
+    if max_width <= 0:
+        raise ValueError("Maximum width must be a positive integer")
+
+    if not text:
+        return []
+
+    words = text.split()
+    if not words:
+        return []
+
+    measurer = measurer_for(font)
+    lines: List[str] = []
+    line_words = [words[0]]
+    line_width = measurer.word_width(words[0])
+    estimate_error = ROUNDING_SLACK
+
+    for previous, word in zip(words, words[1:]):
+        width = line_width + measurer.join_width(previous, word) + measurer.word_width(word)
+        estimate_error += ROUNDING_SLACK
+        if abs(width - max_width) <= estimate_error:
+            # Kerning correction: too close to call, measure the real line
+            width = measurer.measure(" ".join(line_words + [word]))
+            estimate_error = 0
+        if width <= max_width:
+            line_words.append(word)
+            line_width = width
+        else:
+            lines.append(" ".join(line_words))
+            line_words = [word]
+            line_width = measurer.word_width(word)
+            estimate_error = ROUNDING_SLACK
+
+    lines.append(" ".join(line_words))
+    return lines